@@ -0,0 +1,132 @@
+"""End-to-end upload pipeline benchmarks, run with pytest-benchmark
+
+Covers hypergraph, sanitization, JSON/vgraph/Arrow dataset construction, compression,
+and uploads in each api version against a local stub server (see stub_server.py),
+on synthetic graphs. Sizes are edge counts, defaulting to 10K, 100K, and 1M:
+
+    pip install pytest-benchmark
+    python -m pytest benchmarks
+    GRAPHISTRY_BENCH_EDGES=10000,1000000,10000000 python -m pytest benchmarks -k arrow
+
+Each run is saved as JSON under .benchmarks/ (see benchmarks/pytest.ini); compare
+releases with `pytest-benchmark compare` or `python -m pytest benchmarks --benchmark-compare`.
+"""
+
+import functools, os
+import numpy as np, pandas as pd, pytest
+import graphistry
+from graphistry.pygraphistry import PyGraphistry
+from stub_server import StubGraphistryServer
+
+
+sizes = [int(n) for n in os.environ.get('GRAPHISTRY_BENCH_EDGES', '10000,100000,1000000').split(',')]
+
+
+# Fewer rounds for larger graphs
+def rounds_for(edges):
+    return 5 if edges <= 100000 else 3 if edges <= 1000000 else 1
+
+
+def run(benchmark, edges, fn):
+    benchmark.extra_info['edges'] = edges
+    return benchmark.pedantic(fn, rounds=rounds_for(edges), iterations=1, warmup_rounds=0)
+
+
+# Keep one size in memory at a time
+@functools.lru_cache(maxsize=1)
+def make_graph(edges, seed=0):
+    """Edges with int ids and float/int/string attributes, and nodes with float/string attributes"""
+    r = np.random.RandomState(seed)
+    nodes = max(edges // 10, 2)
+    es = pd.DataFrame({
+        'src': r.randint(0, nodes, edges),
+        'dst': r.randint(0, nodes, edges),
+        'weight': r.rand(edges),
+        'count': r.randint(0, 1000, edges),
+        'kind': pd.Categorical.from_codes(r.randint(0, 5, edges), ['reply', 'retweet', 'mention', 'like', 'quote']).astype(str)
+    })
+    ns = pd.DataFrame({
+        'id': np.arange(nodes),
+        'score': r.rand(nodes),
+        'type': np.where(np.arange(nodes) % 3 == 0, 'account', 'bot')
+    })
+    return (es, ns)
+
+
+@functools.lru_cache(maxsize=1)
+def make_events(rows, seed=0):
+    r = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'user': np.char.add('u', r.randint(0, max(rows // 10, 1), rows).astype(str)),
+        'host': np.char.add('h', r.randint(0, max(rows // 100, 1), rows).astype(str)),
+        'kind': r.randint(0, 5, rows),
+        'bytes': r.rand(rows)
+    })
+
+
+def plotter():
+    return graphistry.bind(source='src', destination='dst', node='id', edge_weight='weight', point_title='type')
+
+
+@pytest.fixture(scope='module')
+def server():
+    with StubGraphistryServer() as s:
+        yield s
+
+
+@pytest.fixture(params=sizes, ids=lambda n: 'edges=%s' % n)
+def edges(request):
+    return request.param
+
+
+############################################################
+
+
+def test_hypergraph(benchmark, edges):
+    events = make_events(edges)
+    run(benchmark, edges, lambda: graphistry.hypergraph(events, ['user', 'host', 'kind'], verbose=False))
+
+
+def test_sanitize_dataset(benchmark, edges):
+    (es, ns) = make_graph(edges)
+    g = plotter()
+    run(benchmark, edges, lambda: g._sanitize_dataset(es, ns, 'id'))
+
+
+@pytest.mark.parametrize('mode', ['json', 'vgraph', 'arrow'])
+def test_make_dataset(benchmark, edges, mode):
+    (es, ns) = make_graph(edges)
+    g = plotter()
+    run(benchmark, edges, lambda: g._make_dataset(es, ns, 'bench', '', mode))
+
+
+@pytest.mark.parametrize('mode', ['json', 'vgraph'])
+def test_compress(benchmark, edges, mode):
+    (es, ns) = make_graph(edges)
+    dataset = plotter()._make_dataset(es, ns, 'bench', '', mode)
+    payload = dataset if mode == 'json' else dataset['vgraph']
+    out = run(benchmark, edges, lambda: PyGraphistry._get_data_file(payload, mode))
+    benchmark.extra_info['compressed_bytes'] = len(out.getvalue())
+
+
+def test_arrow_buffer(benchmark, edges):
+    (es, ns) = make_graph(edges)
+    uploader = plotter()._make_dataset(es, ns, 'bench', '', 'arrow')
+    out = run(benchmark, edges, lambda: uploader.arrow_to_buffer(uploader.edges))
+    benchmark.extra_info['arrow_bytes'] = len(out)
+
+
+@pytest.mark.parametrize('api', [1, 2, 3])
+def test_upload(benchmark, edges, api, server):
+    (es, ns) = make_graph(edges)
+    if api == 3:
+        graphistry.register(api=3, protocol='http', server=server.address, username='bench', password='bench')
+    else:
+        graphistry.register(api=api, key='bench', protocol='http', server=server.address)
+    PyGraphistry._is_authenticated = False
+    g = plotter().edges(es).nodes(ns)
+
+    server.reset()
+    run(benchmark, edges, lambda: g.plot(render=False, memoize=False))
+    benchmark.extra_info['requests'] = server.requests
+    benchmark.extra_info['bytes_uploaded'] = server.bytes_received
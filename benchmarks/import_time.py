@@ -0,0 +1,73 @@
+"""Benchmark `import graphistry` startup time with `python -X importtime`
+
+Each run imports graphistry in a fresh interpreter. Reports the fastest total,
+the slowest modules by cumulative time in that run, and which optional heavy
+dependencies got imported.
+
+    python benchmarks/import_time.py --repeat 5 --top 15 --json import.json
+"""
+
+import argparse, json, subprocess, sys
+
+# Optional integrations that should only load when used
+lazy_modules = [
+    'neo4j', 'igraph', 'networkx', 'google.protobuf', 'graphistry.vgraph', 'distutils', 'ijson', 'concurrent.futures',
+    'graphistry.tigeristry', 'graphistry.nodexlistry', 'graphistry.spill']
+
+probe = 'import sys, graphistry; print(",".join(m for m in %r if m in sys.modules))' % (lazy_modules,)
+
+
+def parse_importtime(stderr):
+    """Lines of 'import time: self | cumulative | name' => [(name, self_us, cumulative_us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        (self_us, cumulative_us, name) = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(python):
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', probe],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    rows = parse_importtime(proc.stderr)
+    total = sum([cumulative for (name, self_us, cumulative) in rows if name == 'graphistry'])
+    loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return (total, rows, loaded)
+
+
+def run(repeat, top, python=sys.executable):
+    runs = [run_once(python) for i in range(repeat)]
+    (total, rows, loaded) = min(runs, key=lambda r: r[0])
+    slowest = sorted(rows, key=lambda r: -r[2])[:top]
+    return {
+        'python': python,
+        'repeat': repeat,
+        'seconds': total / 1e6,
+        'all_seconds': [r[0] / 1e6 for r in runs],
+        'slowest_modules': [{'module': name, 'self_seconds': s / 1e6, 'cumulative_seconds': c / 1e6} for (name, s, c) in slowest],
+        'lazy_modules_loaded': loaded
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.top)
+    print('import graphistry: %.3fs (best of %s)' % (results['seconds'], args.repeat))
+    for row in results['slowest_modules']:
+        print('  %-45s %8.3fs %8.3fs' % (row['module'], row['self_seconds'], row['cumulative_seconds']))
+    print('optional modules loaded: %s' % (', '.join(results['lazy_modules_loaded']) or 'none'))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Benchmark NetworkX <-> pandas conversion on graphs with mixed, sparse attributes
+
+Compares Plotter.networkx2pandas / pandas2networkx with networkx's own
+to_pandas_edgelist / from_pandas_edgelist on the same graph.
+
+    python benchmarks/networkx_conversion.py --edges 1000000 --repeat 3 --json nx.json
+"""
+
+import argparse, gc, json, random, sys, time
+import networkx as nx
+import graphistry
+
+
+def make_graph(edges, seed=0):
+    """MultiDiGraph with float, string, int, and bool attributes, most of them only on some nodes/edges"""
+    rnd = random.Random(seed)
+    nodes = max(edges // 4, 1)
+    g = nx.MultiDiGraph()
+    for i in range(nodes):
+        attrs = {'label': 'n%d' % i}
+        if i % 3 == 0:
+            attrs['score'] = i * 0.5
+        if i % 7 == 0:
+            attrs['flagged'] = bool(i % 2)
+        g.add_node(i, **attrs)
+    for i in range(edges):
+        attrs = {'weight': rnd.random()}
+        if i % 2:
+            attrs['kind'] = rnd.choice(['reply', 'retweet', 'mention'])
+        if i % 11 == 0:
+            attrs['count'] = i
+        g.add_edge(rnd.randrange(nodes), rnd.randrange(nodes), **attrs)
+    return g
+
+
+def timed(fn, repeat):
+    times = []
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - start)
+    return (min(times), out)
+
+
+def run(edges, repeat):
+    g = make_graph(edges)
+    plotter = graphistry.bind(source='src', destination='dst', node='id')
+
+    results = {'edges': edges, 'nodes': g.number_of_nodes(), 'seconds': {}}
+    seconds = results['seconds']
+
+    (seconds['networkx2pandas'], (es, ns)) = timed(lambda: plotter.networkx2pandas(g), repeat)
+    (seconds['nx.to_pandas_edgelist'], _) = timed(lambda: nx.to_pandas_edgelist(g, 'src', 'dst'), repeat)
+    (seconds['pandas2networkx'], _) = timed(lambda: plotter.pandas2networkx(es, ns, multigraph=True), repeat)
+    (seconds['nx.from_pandas_edgelist'], _) = timed(
+        lambda: nx.from_pandas_edgelist(es, 'src', 'dst', edge_attr=True, create_using=nx.MultiDiGraph()),
+        repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--edges', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(args.edges, args.repeat)
+    for (name, seconds) in results['seconds'].items():
+        print('%-26s %8.3fs' % (name, seconds))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
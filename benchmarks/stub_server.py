@@ -0,0 +1,143 @@
+"""Local stand-in for a Graphistry server, for benchmarking uploads without a network
+
+Implements the endpoints the client uploads through, reading (and discarding)
+request bodies and replying with canned success responses:
+
+* api=1/2: GET /api/check, POST /etl
+* api=3: POST /api-token-auth/, /api-token-refresh/, /api/v2/upload/datasets/,
+  /api/v2/upload/datasets/<id>/<edges|nodes>/<format>, /api/v2/files/, /api/v2/upload/files/<id>
+
+Bodies may be sent with Content-Length or chunked transfer encoding.
+
+    python benchmarks/stub_server.py --port 8080
+    # graphistry.register(api=3, protocol='http', server='localhost:8080', username='u', password='p')
+"""
+
+import argparse, json, re, threading, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubGraphistryHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            size = 0
+            while True:
+                chunk_size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if chunk_size == 0:
+                    self.rfile.readline()
+                    return size
+                self.rfile.read(chunk_size)
+                self.rfile.readline()
+                size += chunk_size
+        length = int(self.headers.get('Content-Length', 0))
+        remaining = length
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+        return length
+
+    def reply(self, obj, status=200):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/api/check':
+            return self.reply({'success': True})
+        self.reply({'success': False, 'msg': 'Unknown path %s' % path}, 404)
+
+    def do_POST(self):
+        size = self.read_body()
+        self.server.record(self.path, size)
+
+        path = self.path.split('?')[0]
+        if path == '/etl':
+            return self.reply({'success': True, 'dataset': 'stub-' + uuid.uuid4().hex[:8], 'viztoken': uuid.uuid4().hex})
+        if path in ['/api-token-auth/', '/api-token-refresh/']:
+            return self.reply({'token': 'stub-token'})
+        if path == '/api-token-verify/':
+            return self.reply({'token': 'stub-token'})
+        if path == '/api/v2/upload/datasets/':
+            return self.reply({'success': True, 'data': {'dataset_id': 'stub-' + uuid.uuid4().hex[:8]}})
+        if path == '/api/v2/files/':
+            return self.reply({'success': True, 'data': {'file_id': 'stub-' + uuid.uuid4().hex[:8]}})
+        if re.match(r'^/api/v2/upload/(datasets/[^/]+/(edges|nodes)/[^/]+|files/[^/]+)$', path):
+            return self.reply({'success': True})
+        self.reply({'success': False, 'msg': 'Unknown path %s' % path}, 404)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubGraphistryServer(ThreadingHTTPServer):
+    """Stub server on a background thread, counting requests and bytes received per path
+
+    **Example**
+        ::
+
+            with StubGraphistryServer() as server:
+                graphistry.register(api=1, key='k', protocol='http', server=server.address)
+                graphistry.edges(es, 's', 'd').plot(render=False)
+                print(server.bytes_received)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), StubGraphistryHandler)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_received = 0
+        self.thread = None
+
+    @property
+    def address(self):
+        return '%s:%s' % self.server_address[:2]
+
+    def record(self, path, size):
+        with self.lock:
+            self.requests += 1
+            self.bytes_received += size
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_received = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args(argv)
+    server = StubGraphistryServer(args.host, args.port)
+    print('Stub Graphistry server on http://%s' % server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,14 +7,28 @@ client_protocol_hostname, protocol, server,
 register, login, refresh, api_token, verify_token,
 store_token_creds_in_memory,
 name, description,
-bind, style, addStyle, edges, nodes, graph, settings,
+bind, style, addStyle, edges, nodes, edges_from_file, nodes_from_file, graph, settings,
 encode_point_color, encode_point_size, encode_point_icon,
 encode_edge_color, encode_edge_icon,
 encode_point_badge, encode_edge_color,
 hypergraph, 
-bolt, cypher,
+bolt, cypher, cypher_many,
 tigergraph, gsql, gsql_endpoint,
 nodexl,
 ArrowUploader,
 PyGraphistry
-)
\ No newline at end of file
+)
+
+# Loaded on first use, keeping `import graphistry` fast
+_lazy_exports = {
+    'LazyTable': 'graphistry.lazy',
+    'PlotProfile': 'graphistry.profiling',
+    'Spill': 'graphistry.spill',
+    'CypherCache': 'graphistry.bolt_util'
+}
+
+def __getattr__(name):
+    if name in _lazy_exports:
+        import importlib
+        return getattr(importlib.import_module(_lazy_exports[name]), name)
+    raise AttributeError("module 'graphistry' has no attribute %r" % name)
@@ -1,7 +1,159 @@
-import io, json, logging, pandas as pd, pyarrow as pa, requests, sys
+import base64, hashlib, io, json, logging, pandas as pd, pyarrow as pa, requests, sys
+
+from .profiling import profiled, stage
+from .progress import upload_body
+from .util import LRUCache
 
 logger = logging.getLogger('ArrowUploader')
 
+
+# (server_base_path, account, table fingerprint) -> server file_id
+# Reused across uploaders so replotting the same table with new encodings skips the data upload
+file_cache = LRUCache(maxsize=32)
+
+
+def token_account(token) -> str:
+    """Account a JWT was issued to, read from its unverified payload, or the whole token when unreadable
+
+    Tokens are refreshed during a session, so their account, not the token itself, identifies whose files are reusable.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        account = claims.get('user_id', claims.get('username'))
+        if not (account is None):
+            return 'user:%s' % account
+    except Exception:
+        pass
+    return 'token:%s' % token
+
+
+def arrow_table_fingerprint(table: pa.Table) -> str:
+    """Fast content hash of an Arrow table's schema and column buffers, without serializing it"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(table.schema.to_string(show_schema_metadata=False).encode('utf8'))
+    h.update(str(table.num_rows).encode('utf8'))
+    for column in table.columns:
+        for chunk in column.chunks:
+            h.update(('%s:%s' % (chunk.offset, len(chunk))).encode('utf8'))
+            for buf in chunk.buffers():
+                if buf is None:
+                    h.update(b'-')
+                else:
+                    h.update(buf)
+    return h.hexdigest()
+
+
+class ChunkSink(object):
+    """Write-only file collecting written buffers until drained
+
+    Record batch bodies arrive as pyarrow Buffers viewing the table's memory, so they are kept as-is
+    rather than copied; only the small metadata writes arrive as bytes.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        (chunks, self.chunks) = (self.chunks, [])
+        return chunks
+
+
+class ArrowFileBody(object):
+    """Read-only file of a table's Arrow IPC file bytes
+
+    Tables under ``stream_threshold`` bytes are serialized once into an Arrow buffer. Larger ones are
+    serialized one record batch of at most ``max_chunksize`` rows at a time as they are read, with
+    batch bodies sent straight from the table's memory instead of a serialized copy. Their length is
+    computed up front by writing to a byte-counting sink, which only sums buffer sizes, so uploads keep
+    their Content-Length.
+    For tables smaller than ``max_chunksize`` rows, the bytes are the same as ArrowUploader.arrow_to_buffer().
+    """
+
+    def __init__(self, table: pa.Table, max_chunksize=1 << 20, stream_threshold=64 << 20):
+        self.table = table
+        self.max_chunksize = max_chunksize
+        self.buffer = None
+        if table.nbytes < stream_threshold:
+            sink = pa.BufferOutputStream()
+            for chunk in self._chunks(sink):
+                pass
+            self.buffer = sink.getvalue()
+            self.nbytes = self.buffer.size
+        else:
+            counter = pa.MockOutputStream()
+            for chunk in self._chunks(counter):
+                pass
+            self.nbytes = counter.size()
+        self.seek(0)
+
+    def _chunks(self, sink=None):
+        if sink is None and not (self.buffer is None):
+            yield self.buffer
+            return
+        sink = sink or ChunkSink()
+        drain = sink.drain if isinstance(sink, ChunkSink) else list
+        writer = pa.RecordBatchFileWriter(pa.PythonFile(sink, mode='w') if isinstance(sink, ChunkSink) else sink, self.table.schema)
+        for batch in self.table.to_batches(max_chunksize=self.max_chunksize):
+            writer.write_batch(batch)
+            yield from drain()
+        writer.close()
+        yield from drain()
+
+    def __len__(self):
+        return self.nbytes
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._pos
+        if not (whence == io.SEEK_SET and offset == 0):
+            raise io.UnsupportedOperation('ArrowFileBody can only rewind to the start')
+        self._generator = self._chunks()
+        self._chunk = memoryview(b'')
+        self._offset = 0
+        self._pos = 0
+        return 0
+
+    def read(self, size=-1):
+        want = None if (size is None or size < 0) else size
+        parts = []
+        while want is None or want > 0:
+            if self._offset >= len(self._chunk):
+                chunk = next(self._generator, None)
+                if chunk is None:
+                    break
+                self._chunk = memoryview(chunk)
+                self._offset = 0
+                continue
+            end = len(self._chunk) if want is None else min(len(self._chunk), self._offset + want)
+            parts.append(self._chunk[self._offset:end])
+            if not (want is None):
+                want -= end - self._offset
+            self._offset = end
+        out = b''.join(parts)
+        self._pos += len(out)
+        return out
+
+
 class ArrowUploader:
     
     @property
@@ -122,6 +274,15 @@ class ArrowUploader:
     def certificate_validation(self, certificate_validation):
         self.__certificate_validation = certificate_validation
 
+    @property
+    def progress(self):
+        """Upload progress reporting: None for uploads over 5MB, True, False, or a callback; see graphistry.progress"""
+        return self.__progress
+
+    @progress.setter
+    def progress(self, progress):
+        self.__progress = progress
+
 
     ########################################################################3
 
@@ -133,7 +294,8 @@ class ArrowUploader:
             node_encodings = None, edge_encodings = None,
             token = None, dataset_id = None,
             metadata = None,
-            certificate_validation = True):
+            certificate_validation = True,
+            progress = None):
         self.__name = name
         self.__description = description
         self.__server_base_path = server_base_path
@@ -146,6 +308,7 @@ class ArrowUploader:
         self.__edge_encodings = edge_encodings
         self.__metadata = metadata
         self.__certificate_validation = certificate_validation
+        self.__progress = progress
     
     def login(self, username, password):
         base_path = self.server_base_path
@@ -200,11 +363,13 @@ class ArrowUploader:
     def create_dataset(self, json):
         tok = self.token 
         
-        res = requests.post(
-            self.server_base_path + '/api/v2/upload/datasets/',
-            verify=self.certificate_validation,
-            headers={'Authorization': f'Bearer {tok}'},
-            json=json)
+        with stage('upload') as s:
+            res = requests.post(
+                self.server_base_path + '/api/v2/upload/datasets/',
+                verify=self.certificate_validation,
+                headers={'Authorization': f'Bearer {tok}'},
+                json=json)
+            s.measure_http(res)
              
         try:            
             out = res.json()
@@ -220,6 +385,7 @@ class ArrowUploader:
         
     #PyArrow's table.getvalues().to_pybytes() fails to hydrate some reason, 
     #  so work around by consolidate into a virtual file and sending that
+    @profiled('encode')
     def arrow_to_buffer(self, table: pa.Table):
         b = io.BytesIO()
         writer = pa.RecordBatchFileWriter(b, table.schema)
@@ -303,7 +469,16 @@ class ArrowUploader:
         return encodings
 
 
-    def post(self):
+    def post(self, as_files=False, memoize=True):
+        """Create a dataset and upload its tables.
+
+        :param as_files: Upload edges/nodes as reusable server files and create the dataset referencing them
+        :param memoize: When as_files, skip uploading tables whose content was already uploaded to this server
+        """
+
+        if as_files:
+            return self.post_as_files(memoize)
+
         self.create_dataset({
             "node_encodings": self.node_encodings,
             "edge_encodings": self.edge_encodings,
@@ -319,6 +494,25 @@ class ArrowUploader:
         
         return self
 
+    def post_as_files(self, memoize=True):
+
+        edge_file_id = self.cached_arrow_file(self.edges, 'edges', memoize)
+        node_file_id = None
+        if not (self.nodes is None):
+            node_file_id = self.cached_arrow_file(self.nodes, 'nodes', memoize)
+
+        self.create_dataset({
+            "node_encodings": self.node_encodings,
+            "edge_encodings": self.edge_encodings,
+            "metadata": self.metadata,
+            "name": self.name,
+            "description": self.description,
+            "edge_files": [ edge_file_id ],
+            "node_files": [ node_file_id ] if not (node_file_id is None) else []
+        })
+
+        return self
+
     ###########################################
 
 
@@ -332,8 +526,15 @@ class ArrowUploader:
             arr = self.nodes
         return self.post_arrow(arr, 'nodes', opts) 
 
+    def arrow_body(self, arr: pa.Table) -> ArrowFileBody:
+        with stage('encode') as s:
+            body = ArrowFileBody(arr)
+            s.measure_in(arr)
+            s.measure_out(body)
+        return body
+
     def post_arrow(self, arr, graph_type, opts=''):
-        buf = self.arrow_to_buffer(arr)
+        buf = self.arrow_body(arr)
 
         dataset_id = self.dataset_id
         tok = self.token
@@ -342,11 +543,14 @@ class ArrowUploader:
         url = f'{base_path}/api/v2/upload/datasets/{dataset_id}/{graph_type}/arrow'
         if len(opts) > 0:
             url = f'{url}?{opts}'
-        out = requests.post(
-            url,
-            verify=self.certificate_validation,
-            headers={'Authorization': f'Bearer {tok}'},
-            data=buf).json()
+        with stage('upload') as s:
+            res = requests.post(
+                url,
+                verify=self.certificate_validation,
+                headers={'Authorization': f'Bearer {tok}'},
+                data=upload_body(buf, self.progress, graph_type))
+            s.measure_http(res)
+        out = res.json()
         
         if not out['success']:
             raise Exception(out)
@@ -354,6 +558,67 @@ class ArrowUploader:
         return out
 
 
+    def create_file(self, file_opts={}) -> str:
+        tok = self.token
+
+        with stage('upload') as s:
+            res = requests.post(
+                self.server_base_path + '/api/v2/files/',
+                verify=self.certificate_validation,
+                headers={'Authorization': f'Bearer {tok}'},
+                json={'file_type': 'arrow', **file_opts})
+            s.measure_http(res)
+
+        try:
+            out = res.json()
+            if not out['success']:
+                raise Exception(out)
+        except Exception as e:
+            logger.error('Failed creating file: %s', res.text, exc_info=True)
+            raise e
+
+        return out['data']['file_id']
+
+    def post_arrow_file(self, arr, file_id, graph_type='file'):
+        buf = self.arrow_body(arr)
+
+        tok = self.token
+        base_path = self.server_base_path
+
+        with stage('upload') as s:
+            res = requests.post(
+                f'{base_path}/api/v2/upload/files/{file_id}',
+                verify=self.certificate_validation,
+                headers={'Authorization': f'Bearer {tok}'},
+                data=upload_body(buf, self.progress, graph_type))
+            s.measure_http(res)
+        out = res.json()
+
+        if not out['success']:
+            raise Exception(out)
+
+        return out
+
+    def cached_arrow_file(self, arr, graph_type, memoize=True) -> str:
+        """Upload table as a server file, or with memoize, reuse the file_id of an identical earlier upload"""
+
+        key = None
+        if memoize:
+            key = (self.server_base_path, token_account(self.token), arrow_table_fingerprint(arr))
+            file_id = file_cache.get(key)
+            if not (file_id is None):
+                logger.debug('Reusing uploaded %s file %s', graph_type, file_id)
+                return file_id
+
+        file_id = self.create_file({'name': f'{self.name} {graph_type}'})
+        self.post_arrow_file(arr, file_id, graph_type)
+
+        if memoize:
+            file_cache.put(key, file_id)
+
+        return file_id
+
+
     ###########################################
 
 
@@ -384,13 +649,15 @@ class ArrowUploader:
         tok = self.token
         base_path = self.server_base_path
 
-        with open(file_path, 'rb') as file:        
-            out = requests.post(
+        with open(file_path, 'rb') as file, stage('upload') as s:
+            res = requests.post(
                 f'{base_path}/api/v2/upload/datasets/{dataset_id}/{graph_type}/{file_type}',
                 verify=self.certificate_validation,
                 headers={'Authorization': f'Bearer {tok}'},
-                data=file.read()).json()
-            if not out['success']:
-                raise Exception(out)
-            
-            return out
\ No newline at end of file
+                data=upload_body(file, self.progress, graph_type))
+            s.measure_http(res)
+        out = res.json()
+        if not out['success']:
+            raise Exception(out)
+
+        return out
\ No newline at end of file
@@ -1,4 +1,4 @@
-import logging, pandas as pd
+import hashlib, json, logging, os, pandas as pd, pyarrow as pa, re, threading, time
 from datetime import datetime
 from .pygraphistry import util
 
@@ -14,12 +14,6 @@ relationship_type_key = u'type'
 
 t0 = datetime.min.time()
 
-try:
-    import neo4j
-    import neotime
-except:
-    pass
-
 
 def to_bolt_driver(driver=None):
     if driver is None:
@@ -28,25 +22,73 @@ def to_bolt_driver(driver=None):
         from neo4j import GraphDatabase, Driver
         if isinstance(driver, Driver):
             return driver
-        return GraphDatabase.driver(**driver)
+        out = GraphDatabase.driver(**driver)
     except ImportError:
         raise BoltSupportModuleNotFound()
+    # Remember what the driver was opened with, as drivers do not expose their credentials
+    out._graphistry_uri = driver.get('uri')
+    out._graphistry_user = auth_user(driver.get('auth'))
+    return out
+
+
+def auth_user(auth):
+    """User name of a (user, password) tuple or neo4j Auth token, or None"""
+    if isinstance(auth, (tuple, list)) and len(auth) > 0:
+        return auth[0]
+    return getattr(auth, 'principal', None)
+
+# Single pass over rows of (key, value) pairs into per-key (row indices, values) columns
+# Later duplicate keys in a row override earlier ones, like merging dicts
+def gather_columns(rows):
+    columns = {}
+    n = 0
+    for row in rows:
+        for key, value in row:
+            column = columns.get(key)
+            if column is None:
+                column = ([], [])
+                columns[key] = column
+            (idxs, vals) = column
+            if len(idxs) > 0 and idxs[-1] == n:
+                vals[-1] = value
+            else:
+                idxs.append(n)
+                vals.append(value)
+        n += 1
+    return (columns, n)
+
+
+# Sparse columns get NaN for missing rows, matching pd.DataFrame(list_of_dicts)
+def columns_to_df(columns, n) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            key: vals if len(idxs) == n else pd.Series(vals, index=idxs, dtype='object' if len(vals) == 0 else None)
+            for key, (idxs, vals) in columns.items()
+        },
+        index=pd.RangeIndex(n))
+
+
+def relationship_to_row(relationship):
+    yield from relationship.items()
+    yield (relationship_id_key, relationship.id)
+    yield (relationship_type_key, relationship.type)
+    yield (start_node_id_key, relationship.start_node.id)
+    yield (end_node_id_key, relationship.end_node.id)
+
+
+def node_to_row(node):
+    labels = [str(label) for label in node.labels]
+    yield from node.items()
+    yield (node_id_key, node.id)
+    yield (node_type_key, ",".join(sorted(labels)))
+    for label in labels:
+        yield (node_label_prefix_key + label, True)
+
 
 #TODO catch additional encodings
 def bolt_graph_to_edges_dataframe(graph):
-    df = pd.DataFrame([
-        util.merge_two_dicts(
-            { key: value for (key, value) in relationship.items() },
-            {
-                relationship_id_key:    relationship.id,
-                relationship_type_key:      relationship.type,           
-                start_node_id_key:          relationship.start_node.id,
-                end_node_id_key:     relationship.end_node.id
-            }
-        )
-        for relationship in graph.relationships
-    ])
-    if len(df) == 0:
+    (columns, n) = gather_columns(relationship_to_row(relationship) for relationship in graph.relationships)
+    if n == 0:
         util.warn('Query returned no edges; may have surprising visual results or need to add missing columns for encodings')
         return pd.DataFrame({
             relationship_id_key: pd.Series([], dtype='int32'),
@@ -54,75 +96,408 @@ def bolt_graph_to_edges_dataframe(graph):
             start_node_id_key: pd.Series([], dtype='int32'),
             end_node_id_key: pd.Series([], dtype='int32')
         })
-    return neo_df_to_pd_df(df)
+    return neo_df_to_pd_df(columns_to_df(columns, n))
 
 
 def bolt_graph_to_nodes_dataframe(graph) -> pd.DataFrame:
-    df = pd.DataFrame([
-        util.merge_two_dicts(
-            { key: value for (key, value) in node.items() },
-            util.merge_two_dicts(
-                { 
-                    node_id_key: node.id, 
-                    node_type_key: ",".join(sorted([str(label) for label in node.labels])) 
-                },
-                { node_label_prefix_key + str(label): True for label in node.labels }))
-        for node in graph.nodes
-    ])
-    if len(df) == 0:
+    (columns, n) = gather_columns(node_to_row(node) for node in graph.nodes)
+    if n == 0:
         util.warn('Query returned no nodes')
         return pd.DataFrame({
             node_id_key: pd.Series([], dtype='int32'),
             node_type_key: pd.Series([], dtype='object')
         })
-    return neo_df_to_pd_df(df)
-
-
-## Knowing a col is all-spatial, flatten into primitive cols
-def flatten_spatial_col(df : pd.DataFrame, col : str) -> pd.DataFrame:
-    out_df = df.copy(deep=False)
-
-    ####
-
-    #TODO: Can we do better than duck typing the spatial fields?
-    try:
-        out_df[f'{col}_x'] = df[col].apply(lambda v: None if v is None else v.x)
-    except:
-        pass
-
+    return neo_df_to_pd_df(columns_to_df(columns, n))
+
+
+def bolt_query_to_dataframes(driver, query, params={}):
+    """Run query in its own session and convert its result graph to (edges, nodes) dataframes
+
+    Called from cypher_many worker threads: the query overlaps with other threads, the conversion holds the GIL.
+    """
+    with driver.session() as session:
+        graph = session.run(query, **params).graph()
+    # Session released back to the driver pool before converting
+    return (bolt_graph_to_edges_dataframe(graph), bolt_graph_to_nodes_dataframe(graph))
+
+
+def union_bolt_dataframes(edges_dfs, nodes_dfs):
+    """Union per-query (edges, nodes) dataframes, deduplicating on relationship and node ids
+
+    A node that only appears as a relationship endpoint in one result may be fully returned by another,
+    so duplicate nodes keep their row with the most non-null values.
+    """
+    edges = pd.concat(edges_dfs, ignore_index=True, sort=False)
+    edges = edges.drop_duplicates(subset=[relationship_id_key]).reset_index(drop=True)
+    nodes = pd.concat(nodes_dfs, ignore_index=True, sort=False)
+    if len(nodes) > 0:
+        richest_first = nodes.notna().sum(axis=1).sort_values(ascending=False, kind='mergesort').index
+        nodes = nodes.loc[richest_first].drop_duplicates(subset=[node_id_key]).sort_index().reset_index(drop=True)
+    return (edges, nodes)
+
+
+def is_list_type(t) -> bool:
+    return pa.types.is_list(t) or pa.types.is_large_list(t) or pa.types.is_fixed_size_list(t)
+
+
+def common_arrow_type(a, b):
+    """Type both a and b convert to: float64 for mixed numbers, merged list/struct types, and strings otherwise"""
+    if a.equals(b) or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if all([pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_boolean(t) for t in [a, b]]):
+        return pa.float64()
+    if is_list_type(a) and is_list_type(b):
+        return pa.list_(common_arrow_type(a.value_type, b.value_type))
+    if pa.types.is_struct(a) and pa.types.is_struct(b):
+        fields = {}
+        for field in list(a) + list(b):
+            fields[field.name] = common_arrow_type(fields[field.name], field.type) if field.name in fields else field.type
+        return pa.struct([pa.field(name, t) for name, t in fields.items()])
+    return pa.string()
+
+
+def cast_arrow_column(column, t):
+    """Cast, falling back to rebuilding values for nested conversions Arrow cannot cast (ex: list to string, struct field changes)"""
     try:
-        out_df[f'{col}_y'] = df[col].apply(lambda v: None if v is None else v.y)
-    except:
-        pass
-
+        return column.cast(t)
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid, pa.ArrowTypeError):
+        values = column.to_pylist()
+        if pa.types.is_string(t):
+            values = [
+                v if (v is None) or isinstance(v, str) else json.dumps(v, default=str) if isinstance(v, (list, dict)) else str(v)
+                for v in values]
+        return pa.array(values, type=t)
+
+
+def unify_arrow_schemas(schemas) -> pa.Schema:
+    """Schema with every column of schemas, in order of appearance, typed to a common type across them"""
+    fields = {}
+    for schema in schemas:
+        for field in schema:
+            fields[field.name] = common_arrow_type(fields[field.name], field.type) if field.name in fields else field.type
+    return pa.schema([pa.field(name, t) for name, t in fields.items()])
+
+
+def cast_arrow_table(table, schema):
+    """Table with the columns of schema, casting those of other types and filling missing ones with nulls"""
+    return pa.Table.from_arrays(
+        [
+            cast_arrow_column(table[field.name], field.type) if field.name in table.column_names else pa.nulls(len(table), field.type)
+            for field in schema
+        ],
+        schema=schema)
+
+
+# Pages can disagree on column types (ex: int vs float once NaNs appear, lists of different types), so cast those to a common type
+def concat_arrow_tables(tables):
+    schema = unify_arrow_schemas([table.schema for table in tables])
+    return pa.Table.from_batches(
+        [
+            batch
+            for table in tables
+            for batch in (table if table.schema.equals(schema) else cast_arrow_table(table, schema)).to_batches()
+        ],
+        schema=schema)
+
+
+# Heterogeneous object columns (ex: mixed temporal and int values) fall back to strings
+def df_to_arrow(df : pd.DataFrame) -> pa.Table:
     try:
-        out_df[f'{col}_z'] = df[col].apply(lambda v: None if v is None else v.z)
-    except:
-        pass
-
+        return pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata({})
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        out_df = df.copy(deep=False)
+        for col in df:
+            if df[col].dtype.name == 'object':
+                try:
+                    pa.array(df[col], from_pandas=True)
+                except (pa.ArrowTypeError, pa.ArrowInvalid):
+                    out_df[col] = df[col].astype(str).where(df[col].notna(), None)
+        return pa.Table.from_pandas(out_df, preserve_index=False).replace_schema_metadata({})
+
+
+def fetch_bolt_page(driver, query, params, skip, limit):
+    with driver.session() as session:
+        result = session.run(query, **params, graphistry_skip=skip, graphistry_limit=limit)
+        count = len(list(result))
+        return (count, result.graph())
+
+
+def paged_cypher_query(query) -> str:
+    """Append SKIP/LIMIT paging parameters to query, refusing queries whose pages would be wrong or non-deterministic
+
+    The last RETURN clause must have an ORDER BY and no SKIP/LIMIT of its own. A trailing ';' is dropped.
+    """
+    paged = query.strip()
+    while paged.endswith(';'):
+        paged = paged[:-1].rstrip()
+    clauses = re.split(r'\bRETURN\b', paged, flags=re.IGNORECASE)
+    if len(clauses) < 2:
+        util.error('Paged cypher queries must end with a RETURN clause: %s' % query)
+    if re.search(r'\b(SKIP|LIMIT)\b', clauses[-1], flags=re.IGNORECASE):
+        util.error('Paged cypher queries must not end with their own SKIP/LIMIT, remove them or do not set page_size: %s' % query)
+    if not re.search(r'\bORDER\s+BY\b', clauses[-1], flags=re.IGNORECASE):
+        util.error('Paged cypher queries must ORDER BY their RETURN clause so pages do not overlap or miss results: %s' % query)
+    return paged + ' SKIP $graphistry_skip LIMIT $graphistry_limit'
+
+
+def bolt_paged_graph_to_arrow(driver, query, params={}, page_size=10000, spill=None):
+    """Run query page by page via SKIP/LIMIT and convert each page's new nodes/relationships into Arrow batches.
+
+    The query must end with a RETURN clause ordered by ORDER BY and without its own SKIP/LIMIT, see paged_cypher_query.
+    Only one result graph is held at a time, and the next page is fetched while the current one converts.
+    Nodes and relationships are deduplicated across pages by id.
+    With a graphistry.Spill, each page's tables are written to memory-mapped files instead of kept in RAM.
+
+    :returns: (edges, nodes) Arrow tables
+    """
+
+    paged_query = paged_cypher_query(query)
+
+    seen_relationships = set()
+    seen_nodes = set()
+    # Relationship endpoints not yet seen with labels/properties, emitted at the end if never filled in
+    placeholder_nodes = {}
+    edge_tables = []
+    node_tables = []
+    keep = spill.append if not (spill is None) else (lambda tables, table: tables.append(table))
+    concat = spill.concat if not (spill is None) else concat_arrow_tables
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        skip = 0
+        pending = executor.submit(fetch_bolt_page, driver, paged_query, params, skip, page_size)
+        while not (pending is None):
+            (count, graph) = pending.result()
+            skip = skip + page_size
+            pending = executor.submit(fetch_bolt_page, driver, paged_query, params, skip, page_size) if count == page_size else None
+
+            relationships = [r for r in graph.relationships if not (r.id in seen_relationships)]
+            seen_relationships.update([r.id for r in relationships])
+            nodes = []
+            for node in graph.nodes:
+                if node.id in seen_nodes:
+                    continue
+                if len(node.labels) == 0 and len(node) == 0:
+                    placeholder_nodes.setdefault(node.id, node)
+                    continue
+                seen_nodes.add(node.id)
+                placeholder_nodes.pop(node.id, None)
+                nodes.append(node)
+
+            if len(relationships) > 0:
+                (columns, n) = gather_columns(relationship_to_row(r) for r in relationships)
+                keep(edge_tables, df_to_arrow(neo_df_to_pd_df(columns_to_df(columns, n))))
+            if len(nodes) > 0:
+                (columns, n) = gather_columns(node_to_row(node) for node in nodes)
+                keep(node_tables, df_to_arrow(neo_df_to_pd_df(columns_to_df(columns, n))))
+            logger.debug('Converted page ending at %s: %s new edges, %s new nodes', skip, len(relationships), len(nodes))
+
+    if len(placeholder_nodes) > 0:
+        (columns, n) = gather_columns(node_to_row(node) for node in placeholder_nodes.values())
+        keep(node_tables, df_to_arrow(neo_df_to_pd_df(columns_to_df(columns, n))))
+
+    if len(edge_tables) == 0:
+        from neo4j.graph import Graph
+        keep(edge_tables, df_to_arrow(bolt_graph_to_edges_dataframe(Graph())))
+    if len(node_tables) == 0:
+        from neo4j.graph import Graph
+        keep(node_tables, df_to_arrow(bolt_graph_to_nodes_dataframe(Graph())))
+
+    return (concat(edge_tables), concat(node_tables))
+
+
+def bolt_driver_key(driver):
+    """Identify the database and user a driver queries as 'user@uri', or None when neither is known
+
+    The uri and user come from the settings graphistry opened the driver with, and otherwise from
+    the driver's address (initial addresses for routing drivers) and pool auth, when the driver has them.
+    """
+    uri = getattr(driver, '_graphistry_uri', None)
+    for attr in ['address', 'initial_addresses']:
+        if uri is None:
+            uri = getattr(driver, attr, None)
+    user = getattr(driver, '_graphistry_user', None)
+    if user is None:
+        user = auth_user(getattr(getattr(getattr(driver, '_pool', None), 'pool_config', None), 'auth', None))
+    if uri is None and user is None:
+        return None
+    return '%s@%s' % ('' if user is None else user, '' if uri is None else uri)
+
+
+class CypherCache(object):
+    """Cache of converted cypher results as (edges, nodes) Arrow tables, keyed by (driver user and address, query, params).
+
+    Drivers with neither a known address nor user are not cached. Entries are stored as Arrow tables, but
+    cypher() returns hits as Pandas dataframes unless paging, the same as uncached results.
+
+    Entries expire ttl seconds after being stored (None for never), and beyond maxsize, the least recently
+    used entries are evicted. When path is set, entries are Feather files in that directory, surviving restarts
+    and shared across processes; otherwise they are kept in memory.
+
+    **Example**
+        ::
+
+            import graphistry
+            cache = graphistry.CypherCache(ttl=60, path='/tmp/cypher_cache')
+            g = graphistry.cypher('MATCH (a)-[r]->(b) RETURN r', cache=cache)
+            print(cache.stats())
+    """
+
+    def __init__(self, ttl=300, maxsize=32, path=None, timer=time.time):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.path = path
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._memory = None
+        # Guards hit/miss counts and disk entries against concurrent cypher() calls
+        self._lock = threading.RLock()
+        if path is None:
+            self._memory = util.LRUCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(driver, query, params={}):
+        """Cache key, or None when the driver cannot be identified"""
+        driver_key = bolt_driver_key(driver)
+        if driver_key is None:
+            return None
+        return (driver_key, query, json.dumps(params, sort_keys=True, default=str))
+
+    def _file_base(self, key):
+        return os.path.join(self.path, hashlib.blake2b(json.dumps(key).encode('utf-8'), digest_size=16).hexdigest())
+
+    def get(self, key):
+        """Return cached (edges, nodes), or None"""
+        with self._lock:
+            if not (self._memory is None):
+                tables = self._memory.get(key)
+            else:
+                tables = self._read(key)
+            if tables is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return tables
+
+    def put(self, key, tables):
+        with self._lock:
+            if not (self._memory is None):
+                self._memory.put(key, tables)
+            else:
+                self._write(key, tables)
+
+    def _read(self, key):
+        import pyarrow.feather
+        base = self._file_base(key)
+        try:
+            (edges, nodes) = [pyarrow.feather.read_table(base + ext, memory_map=True) for ext in ['.edges.feather', '.nodes.feather']]
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        cached_at = float(edges.schema.metadata[b'graphistry_cached_at'])
+        if not (self.ttl is None) and cached_at + self.ttl <= self.timer():
+            self._remove(base)
+            return None
+        # Modification time tracks recency for LRU eviction
+        try:
+            os.utime(base + '.edges.feather')
+        except FileNotFoundError:
+            pass
+        return (edges.replace_schema_metadata({}), nodes)
+
+    def _write(self, key, tables):
+        import pyarrow.feather
+        base = self._file_base(key)
+        (edges, nodes) = tables
+        edges = edges.replace_schema_metadata({b'graphistry_cached_at': str(self.timer()).encode('utf-8')})
+        # Write then rename, so other processes sharing the directory never read a partial file
+        for (table, ext) in [(nodes, '.nodes.feather'), (edges, '.edges.feather')]:
+            tmp = '%s%s.%s.%s.tmp' % (base, ext, os.getpid(), threading.get_ident())
+            pyarrow.feather.write_feather(table, tmp)
+            os.replace(tmp, base + ext)
+        entries = []
+        for f in os.listdir(self.path):
+            if f.endswith('.edges.feather'):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.path, f)), os.path.join(self.path, f)))
+                except FileNotFoundError:
+                    pass
+        entries.sort()
+        for (_, stale) in entries[:max(len(entries) - self.maxsize, 0)]:
+            self._remove(stale[:-len('.edges.feather')])
+
+    def _remove(self, base):
+        for ext in ['.edges.feather', '.nodes.feather']:
+            try:
+                os.remove(base + ext)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            if not (self._memory is None):
+                self._memory.clear()
+            else:
+                for f in os.listdir(self.path):
+                    for ext in ['.edges.feather', '.nodes.feather']:
+                        if f.endswith(ext):
+                            self._remove(os.path.join(self.path, f[:-len(ext)]))
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            size = len(self._memory) if not (self._memory is None) else len([f for f in os.listdir(self.path) if f.endswith('.edges.feather')])
+            return {'hits': self.hits, 'misses': self.misses, 'size': size, 'maxsize': self.maxsize}
+
+
+cypher_cache = CypherCache()
+
+
+spatial_attributes = ['x', 'y', 'z', 'srid', 'longitude', 'latitude']
+
+def is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and v != v)
+
+
+def has_spatial_attribute(v, attr) -> bool:
     try:
-        out_df[f'{col}_srid'] = df[col].apply(lambda v: None if v is None else v.srid)
-    except:
-        pass
+        getattr(v, attr)
+        return True
+    except (AttributeError, IndexError):
+        return False
 
-    try:
-        out_df[f'{col}_longitude'] = df[col].apply(lambda v: None if v is None else v.longitude)
-    except:
-        pass
 
+# None for missing values and values lacking attr
+def spatial_attribute(v, attr):
     try:
-        out_df[f'{col}_latitude'] = df[col].apply(lambda v: None if v is None else v.latitude)
-    except:
-        pass
-
-    ###
+        return getattr(v, attr)
+    except (AttributeError, IndexError):
+        return None
 
-    out_df[col] = df[col].apply(str)
 
-    return out_df
+## Knowing a col is all one spatial type, flatten into primitive cols
+## The attributes come from the first value: later values of the same type lacking one (ex: 2D vs 3D) get None
+def flatten_spatial_col(df : pd.DataFrame, col : str, first) -> pd.DataFrame:
+    out_df = df.copy(deep=False)
 
+    attrs = [attr for attr in spatial_attributes if has_spatial_attribute(first, attr)]
+    columns = {attr: [] for attr in attrs}
+    strs = []
+    for v in df[col].values:
+        for attr in attrs:
+            columns[attr].append(spatial_attribute(v, attr))
+        strs.append(str(v))
 
+    for attr in attrs:
+        out_df[f'{col}_{attr}'] = pd.Series(columns[attr], index=df.index)
+    out_df[col] = pd.Series(strs, index=df.index)
 
+    return out_df
 
 
 #dtype='obj' -> 'a
@@ -142,6 +517,7 @@ def neo_val_to_pd_val(v):
 
     #neo4j 4
     if v_mod == 'neo4j.time':
+        import neo4j.time
         if v.__class__ == neo4j.time.DateTime:
             return v.to_native() #datetime.datetime
         elif v.__class__ ==  neo4j.time.Date:
@@ -162,54 +538,43 @@ def neo_val_to_pd_val(v):
 def stringify_spatial(v):
     if v is None:
         return None
+    import neo4j.spatial
     if isinstance(v, neo4j.spatial.Point):
         ##TODO rep as JSON / dict?
         return str(v)
     return v
 
 
-def get_mod(v):
-    try:
-        return v.__module__
-    except:
-        return None
-
-
 ## if a col has spatials:
 ##   - all: flatten into new primitive cols
 ##   - some: stringify
+## Callers already found a spatial value type in col, so homogeneity is just the distinct non-missing types
 def flatten_spatial(df : pd.DataFrame, col : str) -> pd.DataFrame:
 
-    any_spatial = (df[col].apply(get_mod) == 'neo4j.spatial').any()
-    if not any_spatial:
-        return df
-
-    with_vals = df[col].dropna()
-    if len(with_vals) == 0:
-        return df
+    value_types = set([type(v) for v in df[col].values if not is_missing(v)])
+    if len(value_types) == 1:
+        first = next(v for v in df[col].values if not is_missing(v))
+        return flatten_spatial_col(df, col, first)
 
     out_df = df.copy(deep=False)
-
-    t0 = with_vals[0]
-    try:
-        all_t0 = (with_vals.apply(lambda s: s.__class__) == t0.__class__).all()
-    except:
-        all_t0 = False
-    
-    if all_t0:
-        out_df = flatten_spatial_col(df, col)
-    else:
-        out_df[col] = df[col].apply(stringify_spatial)
-  
+    out_df[col] = df[col].apply(stringify_spatial)
     return out_df
 
 
+neo_modules = set(['neotime', 'neo4j.time', 'neo4j.spatial'])
+
 def neo_df_to_pd_df(df):
     out_df = df.copy(deep=False)
     for col in df:
         if df[col].dtype.name == 'object':
-            out_df[col] = df[col].apply(neo_val_to_pd_val)
-            out_df = flatten_spatial(out_df, col)
+            # Check the modules of distinct value types, much cheaper than converting every value
+            modules = set([getattr(t, '__module__', None) for t in set(map(type, df[col].values))])
+            if len(modules & neo_modules) == 0:
+                continue
+            if 'neotime' in modules or 'neo4j.time' in modules:
+                out_df[col] = df[col].apply(neo_val_to_pd_val)
+            if 'neo4j.spatial' in modules:
+                out_df = flatten_spatial(out_df, col)
     return out_df
 
 
@@ -0,0 +1,81 @@
+import logging, numpy as np, pandas as pd, pyarrow as pa
+from .sampling import series
+
+logger = logging.getLogger(__name__)
+
+
+def node_codes(edges, source, destination, nodes=None, node=None):
+    """Integer codes for node ids, numbering nodes table ids first, then new edge endpoints
+
+    :returns: (codes of nodes table rows, or None without one; source codes and destination codes of edges with both endpoints; ids)
+    """
+    parts = [series(edges, source), series(edges, destination)]
+    if not (nodes is None):
+        parts = [series(nodes, node)] + parts
+    (codes, ids) = pd.factorize(pd.concat(parts, ignore_index=True))
+    k = len(parts[0]) if not (nodes is None) else 0
+    m = len(parts[-1])
+    (s, d) = (codes[k:k + m], codes[k + m:])
+    keep = (s >= 0) & (d >= 0)
+    return (codes[:k] if not (nodes is None) else None, s[keep], d[keep], ids)
+
+
+def degrees(s, d, count):
+    """In-degree, out-degree, and degree of each node code, with self-loops counting toward both"""
+    degree_in = np.bincount(d, minlength=count)
+    degree_out = np.bincount(s, minlength=count)
+    return (degree_in, degree_out, degree_in + degree_out)
+
+
+def components(s, d, count):
+    """Weakly connected component of each node code, numbered from the largest component down
+
+    Union-find over all edges at once: each round, every edge hooks the root of its higher-labeled
+    endpoint onto the lower one, then pointer jumping flattens the trees. Edges are dropped once
+    their endpoints share a root, so rounds shrink quickly.
+    """
+    labels = np.arange(count)
+    rounds = 0
+    while len(s) > 0:
+        (ls, ld) = (labels[s], labels[d])
+        crossing = ls != ld
+        (s, d, ls, ld) = (s[crossing], d[crossing], ls[crossing], ld[crossing])
+        if len(s) == 0:
+            break
+        np.minimum.at(labels, np.maximum(ls, ld), np.minimum(ls, ld))
+        moved = np.flatnonzero(labels != np.arange(count))
+        while len(moved) > 0:
+            parents = labels[moved]
+            grandparents = labels[parents]
+            labels[moved] = grandparents
+            moved = moved[parents != grandparents]
+        rounds += 1
+    logger.debug('Found components of %s nodes in %s rounds', count, rounds)
+
+    (roots, _) = pd.factorize(labels)
+    sizes = np.bincount(roots)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return rank[roots]
+
+
+def with_node_columns(edges, source, destination, nodes, node, compute):
+    """Nodes table with columns compute(s, d, count) -> {name: values per node code}, creating it from edge endpoints if None"""
+    (codes, s, d, ids) = node_codes(edges, source, destination, nodes, node)
+    columns = compute(s, d, len(ids))
+    if nodes is None:
+        nodes = pa.table({node: pa.Array.from_pandas(ids)}) if isinstance(edges, pa.Table) else pd.DataFrame({node: ids})
+        codes = np.arange(len(ids))
+    # Rows with a missing node id get the fill value
+    values = {
+        name: np.append(per_code, fill)[codes]
+        for (name, (per_code, fill)) in columns.items()
+    }
+    if isinstance(nodes, pa.Table):
+        for (name, vals) in values.items():
+            if name in nodes.column_names:
+                nodes = nodes.set_column(nodes.column_names.index(name), name, pa.array(vals))
+            else:
+                nodes = nodes.append_column(name, pa.array(vals))
+        return nodes
+    return nodes.assign(**values)
@@ -56,7 +56,8 @@ def format_entities(events, entity_types, defs, drop_na):
                     defs['NODEID']: col2cat(cat_lookup, col) + defs['DELIM'] + valToSafeStr(v)
                 } 
                 for v in events[col].unique() if not drop_na or (not (v is None) and valToSafeStr(v) != 'nan')] for col in entity_types], [])
-    df = pd.DataFrame(lst).drop_duplicates([defs['NODEID']])
+    df = pd.DataFrame(lst, columns=None if len(lst) else entity_types + [defs['TITLE'], defs['NODETYPE'], defs['NODEID']])\
+        .drop_duplicates([defs['NODEID']])
     df[defs['CATEGORY']] = df[defs['NODETYPE']].apply(lambda col: col2cat(cat_lookup, col))
     return df
 
@@ -77,6 +78,16 @@ DEFS_HYPER = {
 
 
 
+#columns of format_hyperedges/format_direct_edges output, with ends the attribute or src/dst id columns
+def hyperedge_columns(events, defs, drop_edge_attrs, ends):
+    is_using_categories = len(defs['CATEGORIES'].keys()) > 0
+    return list(set(
+        ([x for x in events.columns.tolist() if not x == defs['NODETYPE']] 
+            if not drop_edge_attrs 
+            else [])
+        + [defs['EDGETYPE']] + ends + [defs['EVENTID']]
+        + ([defs['CATEGORY']] if is_using_categories else []) ))
+
 #ex output: pd.DataFrame([{'edgeType': 'state', 'attribID': 'state::CA', 'eventID': 'eventID::0'}])
 def format_hyperedges(events, entity_types, defs, drop_na, drop_edge_attrs):
     is_using_categories = len(defs['CATEGORIES'].keys()) > 0
@@ -99,12 +110,7 @@ def format_hyperedges(events, entity_types, defs, drop_na, drop_edge_attrs):
             subframes.append(raw)
 
     if len(subframes):
-        result_cols = list(set(
-            ([x for x in events.columns.tolist() if not x == defs['NODETYPE']] 
-                if not drop_edge_attrs 
-                else [])
-            + [defs['EDGETYPE'], defs['ATTRIBID'], defs['EVENTID']]
-            + ([defs['CATEGORY']] if is_using_categories else []) ))
+        result_cols = hyperedge_columns(events, defs, drop_edge_attrs, [defs['ATTRIBID']])
         out = pd.concat(subframes, ignore_index=True, sort=False).reset_index(drop=True)[ result_cols ]
         return out
     else:
@@ -146,12 +152,7 @@ def format_direct_edges(events, entity_types, defs, edge_shape, drop_na, drop_ed
                 subframes.append(raw)
 
     if len(subframes):
-        result_cols = list(set(
-            ([x for x in events.columns.tolist() if not x == defs['NODETYPE']] 
-                if not drop_edge_attrs 
-                else [])
-            + [defs['EDGETYPE'], defs['SOURCE'], defs['DESTINATION'], defs['EVENTID']]
-            + ([defs['CATEGORY']] if is_using_categories else []) ))
+        result_cols = hyperedge_columns(events, defs, drop_edge_attrs, [defs['SOURCE'], defs['DESTINATION']])
         out = pd.concat(subframes, ignore_index=True).reset_index(drop=True)[ result_cols ]
         return out
     else:
@@ -166,8 +167,9 @@ def format_hypernodes(events, defs, drop_na):
     event_nodes[defs['TITLE']] = event_nodes[defs['EVENTID']]
     return event_nodes
 
-def hyperbinding(g, defs, entities, event_entities, edges, source, destination):
-    nodes = pd.concat([entities, event_entities], ignore_index=True, sort=False).reset_index(drop=True)
+def hyperbinding(g, defs, entities, event_entities, edges, source, destination, nodes=None):
+    if nodes is None:
+        nodes = pd.concat([entities, event_entities], ignore_index=True, sort=False).reset_index(drop=True)
     return {
         'entities': entities,
         'events': event_entities,
@@ -190,24 +192,93 @@ def flatten_objs_inplace(df, cols):
  
 ###########        
 
+#copy rows, numbering events from offset when there is no EVENTID column
+def prepare_events(raw_events, entity_types, defs, offset=0):
+    events = raw_events.copy().reset_index(drop=True)
+    flatten_objs_inplace(events, entity_types)
+
+    if defs['EVENTID'] in events.columns:
+        events[defs['EVENTID']] = events.apply(
+            lambda r: defs['EVENTID'] + defs['DELIM'] + valToSafeStr(r[defs['EVENTID']]), 
+            axis=1)
+    else:
+        events[defs['EVENTID']] = events.reset_index().apply(
+            lambda r: defs['EVENTID'] + defs['DELIM'] + valToSafeStr(r['index'] + offset),
+            axis=1)
+    events[defs['NODETYPE']] = 'event'
+    return events
+
+#zero-row schema of columns: event columns keep their types, generated ids, titles, and types are strings
+def spilled_schema(events, columns, defs):
+    from .bolt_util import df_to_arrow
+    import pyarrow as pa
+
+    generated = [defs[k] for k in ['TITLE', 'NODETYPE', 'NODEID', 'CATEGORY', 'EDGETYPE', 'ATTRIBID', 'EVENTID', 'SOURCE', 'DESTINATION']]
+    types = df_to_arrow(events.iloc[:0]).schema
+    return pa.schema([
+        pa.field(col, pa.string() if col in generated or not (col in types.names) or pa.types.is_null(types.field(col).type)
+                 else types.field(col).type)
+        for col in columns])
+
+#process events in chunks sized to the spill budget, writing each chunk's nodes and edges to mapped files
+#that share one schema per output, so they concatenate without copying
+def spilled_hypergraph(g, raw_events, entity_types, defs, opts, drop_na, drop_edge_attrs, verbose, direct, spill):
+    expansion = 3 * max(len(entity_types), 1)
+    rows = spill.rows_per_chunk(raw_events, expansion)
+    edge_shape = direct_edgelist_shape(entity_types, opts) if direct else None
+
+    uniques = {col: [] for col in entity_types}
+    edge_tables = []
+    event_tables = []
+    for start in range(0, len(raw_events), rows):
+        events = prepare_events(raw_events.iloc[start:(start + rows)], entity_types, defs, start)
+        for col in entity_types:
+            uniques[col].append(pd.Series(events[col].unique(), dtype=events[col].dtype))
+        edges = format_direct_edges(events, entity_types, defs, edge_shape, drop_na, drop_edge_attrs) if direct \
+            else format_hyperedges(events, entity_types, defs, drop_na, drop_edge_attrs)
+        if len(edges):
+            spill.append(edge_tables, edges)
+        if not direct:
+            spill.append(event_tables, format_hypernodes(events, defs, drop_na))
+        del events, edges
+    logger.debug('Spilled hypergraph of %s events in %s-row chunks: %s', len(raw_events), rows, spill)
+
+    empty = prepare_events(raw_events.iloc[:0], entity_types, defs)
+    entities_df = format_entities(
+        {col: pd.concat(uniques[col], ignore_index=True) if len(uniques[col]) else empty[col] for col in entity_types},
+        entity_types, defs, drop_na)
+    entities = spill.concat(
+        [spill.table(entities_df)] if len(entities_df) else [],
+        spilled_schema(empty, entities_df.columns, defs))
+    ends = [defs['SOURCE'], defs['DESTINATION']] if direct else [defs['ATTRIBID']]
+    edges = spill.concat(edge_tables, spilled_schema(empty, hyperedge_columns(empty, defs, drop_edge_attrs, ends), defs))
+    event_entities = spill.concat(
+        event_tables,
+        None if direct else spilled_schema(empty, format_hypernodes(empty, defs, drop_na).columns, defs))
+    nodes = spill.concat([entities] + (event_tables or [event_entities]))
+    if verbose:
+        print('# links', len(edges))
+        print('# events', len(raw_events))
+        print('# attrib entities', len(entities))
+    return hyperbinding(
+        g, defs, entities, event_entities, edges,
+        defs['SOURCE'] if direct else defs['ATTRIBID'],
+        defs['DESTINATION'] if direct else defs['EVENTID'],
+        nodes)
+
 class Hypergraph(object):        
 
     @staticmethod
-    def hypergraph(g, raw_events, entity_types=None, opts={}, drop_na=True, drop_edge_attrs=False, verbose=True, direct=False):
+    def hypergraph(g, raw_events, entity_types=None, opts={}, drop_na=True, drop_edge_attrs=False, verbose=True, direct=False, spill=None):
         defs = makeDefs(DEFS_HYPER, opts)
         entity_types = screen_entities(raw_events, entity_types, defs)
-        events = raw_events.copy().reset_index(drop=True)
-        flatten_objs_inplace(events, entity_types)
 
-        if defs['EVENTID'] in events.columns:
-            events[defs['EVENTID']] = events.apply(
-                lambda r: defs['EVENTID'] + defs['DELIM'] + valToSafeStr(r[defs['EVENTID']]), 
-                axis=1)
-        else:
-            events[defs['EVENTID']] = events.reset_index().apply(
-                lambda r: defs['EVENTID'] + defs['DELIM'] + valToSafeStr(r['index']),
-                axis=1)
-        events[defs['NODETYPE']] = 'event'
+        from .spill import to_spill
+        spill = to_spill(spill)
+        if not (spill is None):
+            return spilled_hypergraph(g, raw_events, entity_types, defs, opts, drop_na, drop_edge_attrs, verbose, direct, spill)
+
+        events = prepare_events(raw_events, entity_types, defs)
         
         entities = format_entities(events, entity_types, defs, drop_na)
         event_entities = None
@@ -0,0 +1,130 @@
+import logging, os, pandas as pd, pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+maybe_cudf = None
+try:
+    import cudf
+    maybe_cudf = cudf
+except ImportError:
+    1
+
+
+# File extension => pyarrow.dataset format
+file_formats = {
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'ipc', '.arrow': 'ipc', '.ipc': 'ipc',
+    '.csv': 'csv'
+}
+
+
+def file_format(path, format=None):
+    """Dataset format of a file, or of the first recognized file in a directory, unless given"""
+    if not (format is None):
+        return {'feather': 'ipc', 'arrow': 'ipc'}.get(format, format)
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted([os.path.join(root, f) for (root, dirs, files) in os.walk(path) for f in files])
+    for p in paths:
+        ext = os.path.splitext(p)[1].lower()
+        if ext in file_formats:
+            return file_formats[ext]
+    raise ValueError('Could not infer file format of %s, try passing format="parquet", "feather", or "csv"' % path)
+
+
+def read_file(path, format=None, columns=None):
+    """Read a Parquet, Feather/Arrow IPC, or CSV file, or directory of them, as an Arrow table
+
+    Local files are memory-mapped and only the requested columns that exist are read,
+    so uncompressed Feather columns are not copied at all.
+    """
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    filesystem = None if '://' in str(path) else fs.LocalFileSystem(use_mmap=True)
+    dataset = ds.dataset(path, format=file_format(path, format), filesystem=filesystem)
+    if not (columns is None):
+        have = dataset.schema.names
+        columns = [c for c in columns if c in have]
+    return dataset.to_table(columns=columns)
+
+
+def select_columns(table, columns):
+    """Project a Pandas/Arrow/cuDF table to the given columns, skipping ones it does not have"""
+    if table is None or columns is None:
+        return table
+    if isinstance(table, pa.Table):
+        have = table.column_names
+        keep = [c for c in columns if c in have]
+        return table if len(keep) == len(have) else table.select(keep)
+    if isinstance(table, pd.DataFrame) or (not (maybe_cudf is None) and isinstance(table, maybe_cudf.DataFrame)):
+        have = table.columns.tolist()
+        keep = [c for c in columns if c in have]
+        return table if len(keep) == len(have) else table[keep]
+    return table
+
+
+class LazyTable(object):
+    """Deferred nodes/edges table that is only loaded and transformed when plotted.
+
+    Wraps a ``loader(columns)`` callable returning a Pandas/Arrow/cuDF table, where ``columns`` is
+    the list of needed columns, or None for all of them. At plot time, the Plotter passes only the
+    columns referenced by its bindings and encodings, plus any added via ``select()``, so loaders
+    such as ``pd.read_parquet(path, columns=columns)`` can skip unused columns.
+
+    Like Plotter, LazyTable is immutable: ``select()`` and ``pipe()`` return new instances.
+
+    **Example**
+        ::
+
+            import graphistry, pandas as pd
+            es = graphistry.LazyTable(lambda columns: pd.read_parquet('wide.parquet', columns=columns))
+            graphistry.edges(es, 'src', 'dst').bind(edge_color='score').plot()
+    """
+
+    def __init__(self, loader, columns=None, transforms=None):
+        self._loader = loader
+        self._columns = columns
+        self._transforms = transforms or []
+
+    @classmethod
+    def from_file(cls, path, format=None):
+        """LazyTable reading only needed columns of a Parquet, Feather/Arrow IPC, or CSV file or directory, see read_file()"""
+        format = file_format(path, format)
+        return cls(lambda columns: read_file(path, format, columns))
+
+    def __repr__(self):
+        return 'LazyTable(columns=%s, transforms=%s)' % (self._columns, len(self._transforms))
+
+    def select(self, columns):
+        """Also keep these columns when materializing, in addition to the bound ones"""
+        return LazyTable(self._loader, list(dict.fromkeys((self._columns or []) + list(columns))), self._transforms)
+
+    def pipe(self, fn, requires=None, provides=None):
+        """Record a table -> table transform to run after loading
+
+        :param fn: Transform
+        :param requires: Input columns fn reads, letting the loader still prune columns. None means fn may read all columns.
+        :param provides: Columns fn creates, which are therefore not requested from the loader
+        """
+        return LazyTable(self._loader, self._columns, self._transforms + [(fn, requires, provides or [])])
+
+    def materialize(self, columns=None):
+        """Load, transform, and project to the requested plus selected columns; None loads everything"""
+        wanted = None
+        if not (columns is None):
+            wanted = list(dict.fromkeys(list(columns) + (self._columns or [])))
+
+        # Walk transforms backwards to find the source columns they need
+        load_columns = wanted
+        for (fn, requires, provides) in reversed(self._transforms):
+            if load_columns is None or requires is None:
+                load_columns = None
+                break
+            load_columns = list(dict.fromkeys([c for c in load_columns if c not in provides] + list(requires)))
+
+        logger.debug('Materializing lazy table with columns %s', load_columns)
+        table = self._loader(load_columns)
+        for (fn, requires, provides) in self._transforms:
+            table = fn(table)
+        return select_columns(table, wanted)
@@ -1,4 +1,124 @@
-import pandas as pd
+import datetime, hashlib, json, logging, numpy, os, pandas as pd, pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+# NodeXL sheets put column names in their second row
+# Cells stay as stored (dtype=object), so text ids like '007' are not parsed as numbers
+# Module-level so process pools can run it
+def read_nodexl_sheet(xls, sheet, usecols=None):
+    wanted = None if usecols is None else set(usecols)
+    return pd.read_excel(xls, sheet, header=1, dtype=object, usecols=None if wanted is None else (lambda c: c in wanted))
+
+# Transformers expect sheets as originally read, with the names row first
+def with_header_row(df):
+    header = pd.DataFrame([list(df.columns)], columns=df.columns, dtype=object)
+    return pd.concat([header, df], ignore_index=True)
+
+def file_stat_key(path, usecols=None):
+    st = os.stat(path)
+    key = str((os.path.abspath(path), st.st_size, st.st_mtime_ns, None if usecols is None else sorted(usecols)))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+def file_content_key(path, usecols=None):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    h.update(str(None if usecols is None else sorted(usecols)).encode('utf-8'))
+    return h.hexdigest()
+
+# Sheets are cached by workbook content, which is only hashed when the workbook's
+# (path, size, mtime) has no recorded content key yet, such as after an edit or copy
+def file_cache_key(path, cache_dir, usecols=None):
+    stat_path = os.path.join(cache_dir, '%s.key' % file_stat_key(path, usecols))
+    try:
+        with open(stat_path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    key = file_content_key(path, usecols)
+    tmp = '%s.%s.tmp' % (stat_path, os.getpid())
+    with open(tmp, 'w') as f:
+        f.write(key)
+    os.replace(tmp, stat_path)
+    return key
+
+# Object cells of types Arrow cannot mix in one column are cached as strings beside a column of type codes
+cell_codecs = [
+    (type(None), lambda v: None, lambda s: None),
+    (bool, str, lambda s: s == 'True'),
+    (int, str, int),
+    (float, repr, float),
+    (str, str, str),
+    (datetime.datetime, datetime.datetime.isoformat, datetime.datetime.fromisoformat),
+    (pd.Timestamp, pd.Timestamp.isoformat, pd.Timestamp)
+]
+cell_codes = {t: code for (code, (t, _, _)) in enumerate(cell_codecs)}
+cache_metadata_key = b'graphistry.nodexl'
+
+# Sheets are read with dtype=object, so restore object columns, with NaN for missing cells, as a cold read has them
+def read_cached_sheet(cache_path):
+    from pyarrow import feather
+
+    table = feather.read_table(cache_path)
+    metadata = json.loads(table.schema.metadata[cache_metadata_key])
+    df = table.to_pandas(integer_object_nulls=True)
+    for col in metadata['object']:
+        if col in metadata['mixed']:
+            codes = df[metadata['mixed'][col]].values
+            values = df[col].values
+            df[col] = pd.Series([cell_codecs[code][2](v) for (code, v) in zip(codes, values)], index=df.index, dtype=object)
+        df[col] = df[col].astype(object).where(df[col].notna(), numpy.nan)
+    return df.drop(columns=list(metadata['mixed'].values()))
+
+def write_cached_sheet(df, cache_path):
+    from pyarrow import feather
+
+    if not all([isinstance(col, str) for col in df.columns]):
+        logger.debug('Not caching sheet %s, it has non-text column names', cache_path)
+        return
+    (names, arrays) = ([], [])
+    metadata = {'object': [], 'mixed': {}}
+    for (i, col) in enumerate(df.columns):
+        values = df[col]
+        columns = [(col, values)]
+        if values.dtype.name == 'object':
+            metadata['object'].append(col)
+            # Ex: ints with text, or ints with floats, which Arrow would turn into one type
+            if len(set([type(v) for v in values.values if not (v is None or (isinstance(v, float) and numpy.isnan(v)))])) > 1:
+                codes = [cell_codes.get(type(v)) for v in values.values]
+                if None in codes:
+                    logger.debug('Not caching sheet %s, column "%s" has cells of unsupported types', cache_path, col)
+                    return
+                metadata['mixed'][col] = '__cell_types_%s' % i
+                columns = [
+                    (col, pa.array([cell_codecs[code][1](v) for (code, v) in zip(codes, values.values)], pa.string())),
+                    (metadata['mixed'][col], pa.array(codes, pa.int8()))]
+        for (name, column) in columns:
+            names.append(name)
+            arrays.append(column)
+    if len(set(names)) < len(names):
+        logger.debug('Not caching sheet %s, it has duplicate column names', cache_path)
+        return
+    try:
+        arrays = [column if isinstance(column, pa.Array) else pa.array(column, from_pandas=True) for column in arrays]
+        table = pa.Table.from_arrays(arrays, names=names).replace_schema_metadata({cache_metadata_key: json.dumps(metadata)})
+        feather.write_feather(table, cache_path)
+    except (pa.ArrowException, OSError) as e:
+        logger.debug('Not caching sheet %s, could not write it as Feather: %s', cache_path, e)
+
+# Apply a vectorized str Series -> str Series formatter to each distinct value once
+# Missing values are formatted as 'nan', as str() would
+def map_distinct(series, fmt):
+    (codes, uniques) = pd.factorize(series)
+    distinct = pd.Series(list(uniques) + [numpy.nan], dtype=object).astype(str)
+    formatted = fmt(distinct).values
+    return pd.Series(formatted[codes], index=series.index)
+
+# Each space-separated token, including empty ones
+url_token_pattern = r'(?<![^ ])[^ ]*(?![^ ])'
+
 
 class NodeXLGraphistryBase(object):
 
@@ -14,8 +134,10 @@ class NodeXLGraphistryBase(object):
         default_bindings = {
             'edges_df_transformer': NodeXLGraphistryBase.edges_df_transformer_default,
             'edge_bindings': NodeXLGraphistryBase.edge_bindings_default,
+            'edge_columns': NodeXLGraphistryBase.edge_columns_default,
             'nodes_df_transformer': NodeXLGraphistryBase.nodes_df_transformer_default,
-            'node_bindings': NodeXLGraphistryBase.node_bindings_default
+            'node_bindings': NodeXLGraphistryBase.node_bindings_default,
+            'node_columns': NodeXLGraphistryBase.node_columns_default
         }    
         self.source_to_mappings = {
             'default': default_bindings,
@@ -40,29 +162,41 @@ class NodeXLGraphistryBase(object):
 
     @staticmethod
     def link_urls(series):
-        return series.apply(lambda s: ' '.join(['<a href="%s" target="_blank">%s</a>' % (s, s) for s in str(s).split(' ')]))
+        return map_distinct(
+            series,
+            lambda s: s.str.replace(url_token_pattern, r'<a href="\g<0>" target="_blank">\g<0></a>', regex=True))
 
     @staticmethod
     def embed_img(series):
-        return series.apply(lambda s: '<a href="%s" target="_blank"><img src="%s"/></a>' % (s,s) if len(str(s)) > 0 and not str(s) == 'nan' else '')
+        return map_distinct(
+            series,
+            lambda s: ('<a href="' + s + '" target="_blank"><img src="' + s + '"/></a>').where((s.str.len() > 0) & (s != 'nan'), ''))
+
+    # Whether a transformer should render HTML for a column, where None means all columns
+    @staticmethod
+    def renders_html(col, html_columns=None):
+        return html_columns is None or col in html_columns
 
     ####################################################
 
 
     @staticmethod
     def edges_df_transformer_default(edges_df):
-        #FIXME weird pandas bug forcing here vs post, otherwise color col is offset one with last row as null
-        edges_df = edges_df.assign(ColorInt=pd.Series(edges_df['Color'].factorize()[0]).apply(lambda r: r % 12).astype('int32'))
+        # Assign the raw codes so the color column does not realign on the frame index
+        edges_df = edges_df.assign(ColorInt=(edges_df['Color'].factorize()[0] % 12).astype('int32'))
         return edges_df
 
+    # html_columns: when set, only these columns of a transformer's HTML outputs get rendered
     @staticmethod
-    def nodes_df_transformer_default(nodes_df):
+    def nodes_df_transformer_default(nodes_df, html_columns=None):
         ##TODO factor out
-        #FIXME weird pandas bug forcing here vs later, otherwise color col is offset one with last row as null
-        nodes_df = nodes_df.assign(Color2=pd.Series(nodes_df['Vertex Group'].factorize()[0]).apply(lambda r: r % 12).astype('int32'))
+        # Assign the raw codes so the color column does not realign on the frame index
+        nodes_df = nodes_df.assign(Color2=(nodes_df['Vertex Group'].factorize()[0] % 12).astype('int32'))
         nodes_df = nodes_df[1:]
         nodes_df = nodes_df.assign(**{
-            'Custom Menu Item': nodes_df.apply(lambda row: '<a href="%s" target="_blank">%s</a>' % ( row['Custom Menu Item Action'], row['Custom Menu Item Text']), axis=1)
+            'Custom Menu Item':
+                '<a href="' + nodes_df['Custom Menu Item Action'].astype(str) + '" target="_blank">'
+                + nodes_df['Custom Menu Item Text'].astype(str) + '</a>'
         })
         nodes_df = nodes_df.drop(columns=['Custom Menu Item Action', 'Custom Menu Item Text'])
         return nodes_df
@@ -81,16 +215,23 @@ class NodeXLGraphistryBase(object):
         'point_color': 'Color2'
     }
 
+    # Bindings the viz renders as HTML, so the only columns needing HTML under lazy_html
+    html_bindings = ['point_title', 'point_label']
+
+    # Sheet columns read by the transformers, kept when only reading bound columns
+    edge_columns_default = ['Color']
+
+    node_columns_default = ['Vertex Group', 'Custom Menu Item Action', 'Custom Menu Item Text', 'X', 'Y']
+
     ###################################
 
     #xls from pd.ExcelFile(...)
-    def xls_to_edges_df(self, xls, edges_df_transformer = None):
+    def xls_to_edges_df(self, xls, edges_df_transformer = None, sheet_df = None):
         if edges_df_transformer is None:
             edges_df_transformer = NodeXLGraphistryBase.edges_df_transformer_default
-        raw_edges_df = pd.read_excel(xls, 'Edges')
-        edge_header_dict = raw_edges_df[0:1].to_dict()
-        edge_header_mapping = {x: edge_header_dict[x][0] for x in edge_header_dict.keys()}
-        edges_df = raw_edges_df.rename(columns=edge_header_mapping)
+        if sheet_df is None:
+            sheet_df = read_nodexl_sheet(xls, 'Edges')
+        edges_df = with_header_row(sheet_df)
 
         edges_df = edges_df_transformer(edges_df)
 
@@ -111,22 +252,69 @@ class NodeXLGraphistryBase(object):
         g2 = g.nodes(nodes_df).bind(**node_bindings).settings(url_params={'play': 0})
         return g2
         
-    def xls_to_nodes_df(self, xls, nodes_df_transformer = None):
+    def xls_to_nodes_df(self, xls, nodes_df_transformer = None, sheet_df = None, html_columns = None):
         if nodes_df_transformer is None:
             nodes_df_transformer = NodeXLGraphistryBase.nodes_df_transformer_default
-        raw_nodes_df = pd.read_excel(xls, 'Vertices')
-        node_header_dict = raw_nodes_df[0:1].to_dict()
-        node_header_mapping = {x: node_header_dict[x][0] for x in node_header_dict.keys()}
+        if sheet_df is None:
+            sheet_df = read_nodexl_sheet(xls, 'Vertices')
 
         ##x, y are not (yet) official passthrough bindings, but automation happens to pick these up 
-        nodes_df = raw_nodes_df.rename(columns=node_header_mapping).rename(columns={'X': 'x', 'Y': 'y'})
+        nodes_df = with_header_row(sheet_df).rename(columns={'X': 'x', 'Y': 'y'})
 
-        nodes_df = nodes_df_transformer(nodes_df)
+        if html_columns is None:
+            nodes_df = nodes_df_transformer(nodes_df)
+        else:
+            nodes_df = nodes_df_transformer(nodes_df, html_columns=html_columns)
         return nodes_df
 
+    # Local file path, or ExcelFile over one, else None
+    @staticmethod
+    def local_path(xls_or_url):
+        path = xls_or_url if type(xls_or_url) == str else getattr(xls_or_url, 'io', None)
+        return path if type(path) == str and os.path.isfile(path) else None
+
+    # str | ExcelFile * ?[str] * ?[str] * ?bool * ?str => (df, df)
+    def read_sheets(self, xls_or_url, edge_columns = None, node_columns = None, parallel = False, cache_dir = None):
+        """Parse the Edges and Vertices sheets, optionally in parallel processes and via a Feather cache"""
+
+        path = NodeXLGraphistryBase.local_path(xls_or_url)
+        sheets = [('Edges', edge_columns), ('Vertices', node_columns)]
+
+        cache_paths = None
+        if not (cache_dir is None) and not (path is None):
+            os.makedirs(cache_dir, exist_ok=True)
+            cache_paths = [
+                os.path.join(cache_dir, '%s.%s.feather' % (file_cache_key(path, cache_dir, usecols), sheet))
+                for (sheet, usecols) in sheets
+            ]
+            if all([os.path.exists(cache_path) for cache_path in cache_paths]):
+                return tuple([read_cached_sheet(cache_path) for cache_path in cache_paths])
+
+        if parallel and not (path is None):
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(read_nodexl_sheet, path, sheet, usecols) for (sheet, usecols) in sheets]
+                dfs = tuple([f.result() for f in futures])
+        else:
+            xls = pd.ExcelFile(xls_or_url) if type(xls_or_url) == str else xls_or_url
+            dfs = tuple([read_nodexl_sheet(xls, sheet, usecols) for (sheet, usecols) in sheets])
+
+        if not (cache_paths is None):
+            for (df, cache_path) in zip(dfs, cache_paths):
+                write_cached_sheet(df, cache_path)
+
+        return dfs
+
     ##TODO can we infer source?
-    # str * ?(str | dict) * ?bool => graphistry
-    def xls(self, xls_or_url, source='default', verbose=None):
+    # str * ?(str | dict) * ?bool * ?(str | list) * ?str * ?bool * ?bool => graphistry
+    def xls(self, xls_or_url, source='default', verbose=None, columns=None, cache_dir=None, parallel=False, lazy_html=False):
+        """Load a NodeXL workbook
+
+        :param columns: None reads all sheet columns; 'bound' only those used by bindings and transformers, and a list adds these to the bound ones
+        :param cache_dir: Directory for caching parsed sheets as Feather files, keyed by workbook content, which is only rehashed when the workbook's size or modification time changes
+        :param parallel: Parse the two sheets of a local workbook in separate processes, which helps for large workbooks on multicore machines
+        :param lazy_html: Only render link/image HTML for columns bound to point_title or point_label, leaving other columns as raw values. Custom node transformers must then accept an html_columns keyword.
+        """
 
         verbose = self.verbose if verbose is None else verbose        
         p = print if verbose else (lambda x: 1)
@@ -137,14 +325,24 @@ class NodeXLGraphistryBase(object):
             raise Exception('Unknown nodexl source type %s' % str(source))
         bindings = self.source_to_mappings[source] if type(source) == str else source
         
+        (edge_columns, node_columns) = (None, None)
+        if not (columns is None):
+            extra = [] if columns == 'bound' else list(columns)
+            edge_columns = list(bindings['edge_bindings'].values()) + bindings.get('edge_columns', []) + extra
+            node_columns = list(bindings['node_bindings'].values()) + bindings.get('node_columns', []) + extra
+
         p('Fetching...')
-        xls = pd.ExcelFile(xls_or_url) if type(xls_or_url) == str else xls_or_url
+        (edges_sheet_df, nodes_sheet_df) = self.read_sheets(xls_or_url, edge_columns, node_columns, parallel, cache_dir)
 
         p('Formatting edges')
-        edges_df = self.xls_to_edges_df(xls, bindings['edges_df_transformer'])
+        edges_df = self.xls_to_edges_df(None, bindings['edges_df_transformer'], edges_sheet_df)
+
+        html_columns = None
+        if lazy_html:
+            html_columns = [bindings['node_bindings'][b] for b in NodeXLGraphistryBase.html_bindings if b in bindings['node_bindings']]
 
         p('Formatting nodes')
-        nodes_df = self.xls_to_nodes_df(xls, bindings['nodes_df_transformer'])
+        nodes_df = self.xls_to_nodes_df(None, bindings['nodes_df_transformer'], nodes_sheet_df, html_columns)
 
         p('Setting up bindings')
         g1 = self.plot_edges_df(edges_df, bindings['edge_bindings'])
@@ -182,13 +380,15 @@ class NodeXLGraphistry(NodeXLGraphistryBase):
 
                 'twitter': {
                     'nodes_df_transformer': NodeXLGraphistry.twitter_nodes_df_transformer,
+                    'node_columns': NodeXLGraphistryBase.node_columns_default + NodeXLGraphistry.twitter_link_columns + NodeXLGraphistry.twitter_img_columns,
                     'edge_bindings': {
                         **(NodeXLGraphistryBase.edge_bindings_default),
                         'edge_title': 'Relationship'
                     }
                 },
                 'mediawiki': {
-                    'nodes_df_transformer': NodeXLGraphistry.mediawiki_nodes_df_transformer    
+                    'nodes_df_transformer': NodeXLGraphistry.mediawiki_nodes_df_transformer,
+                    'node_columns': NodeXLGraphistryBase.node_columns_default + ['Image File']
                 }
             },
             graphistry_binder,
@@ -209,8 +409,8 @@ class NodeXLGraphistry(NodeXLGraphistryBase):
       return edges_df
 
     @staticmethod
-    def simple_nodes_df_transformer(nodes_df):
-      nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df)
+    def simple_nodes_df_transformer(nodes_df, html_columns=None):
+      nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df, html_columns)
       return nodes_df
 
     #######################################################
@@ -219,14 +419,20 @@ class NodeXLGraphistry(NodeXLGraphistryBase):
     #                                                     #
     #######################################################
 
+    twitter_link_columns = ['Domains in Tweet by Count', 'Domains in Tweet by Salience']
+
+    twitter_img_columns = ['Image File', 'Profile Background Image Url', 'Profile Banner Url']
+
     @staticmethod
-    def twitter_nodes_df_transformer(nodes_df):
-        nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df)
+    def twitter_nodes_df_transformer(nodes_df, html_columns=None):
+        nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df, html_columns)
         return nodes_df.assign(**{
             **{col: NodeXLGraphistryBase.link_urls(nodes_df[col]) 
-              for col in ['Domains in Tweet by Count', 'Domains in Tweet by Salience']},
+              for col in NodeXLGraphistry.twitter_link_columns
+              if col in nodes_df and NodeXLGraphistryBase.renders_html(col, html_columns)},
             **{col: NodeXLGraphistryBase.embed_img(nodes_df[col])
-              for col in ['Image File', 'Profile Background Image Url', 'Profile Banner Url']}
+              for col in NodeXLGraphistry.twitter_img_columns
+              if col in nodes_df and NodeXLGraphistryBase.renders_html(col, html_columns)}
         })
 
     #######################################################
@@ -236,9 +442,9 @@ class NodeXLGraphistry(NodeXLGraphistryBase):
     #######################################################
 
     @staticmethod
-    def mediawiki_nodes_df_transformer(nodes_df):
-        nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df)
+    def mediawiki_nodes_df_transformer(nodes_df, html_columns=None):
+        nodes_df = NodeXLGraphistryBase.nodes_df_transformer_default(nodes_df, html_columns)
         return nodes_df.assign(**{
             **{col: NodeXLGraphistryBase.embed_img(nodes_df[col])
-              for col in ['Image File']}
+              for col in ['Image File'] if NodeXLGraphistryBase.renders_html(col, html_columns)}
         })
@@ -5,14 +5,20 @@ from .util import (error, in_ipython, make_iframe, random_string, warn)
 from .bolt_util import (
     bolt_graph_to_edges_dataframe,
     bolt_graph_to_nodes_dataframe,
+    bolt_paged_graph_to_arrow,
+    bolt_query_to_dataframes,
+    cypher_cache,
+    df_to_arrow,
+    union_bolt_dataframes,
     node_id_key,
     start_node_id_key,
     end_node_id_key,
     to_bolt_driver)
 
 from .arrow_uploader import ArrowUploader
-from .nodexlistry import NodeXLGraphistry
-from .tigeristry import Tigeristry
+from .lazy import LazyTable, select_columns
+from .profiling import PlotProfile, profiled, stage
+from . import compute, sampling
 
 maybe_cudf = None
 try:
@@ -821,11 +827,13 @@ class Plotter(object):
         """Specify edge list data and associated edge attribute values.
 
         :param edges: Edges and their attributes.
-        :type point_size: Pandas dataframe, NetworkX graph, or IGraph graph.
+        :type point_size: Pandas dataframe, Arrow table, LazyTable, NetworkX graph, or IGraph graph.
 
         :returns: Plotter.
         :rtype: Plotter.
 
+        A LazyTable is only loaded on plot(), and then only with the columns used by bindings and encodings.
+
         **Example**
             ::
 
@@ -857,6 +865,258 @@ class Plotter(object):
         return res
 
 
+    def edges_from_file(self, path, source=None, destination=None, format=None):
+        """Use a Parquet, Feather/Arrow IPC, or CSV file, or directory of them, as edges.
+
+        Nothing is read until plot(), which then memory-maps the file and reads only the columns
+        used by bindings and encodings into an Arrow table, without creating a dataframe.
+        With api=3, the table is then streamed to the server in record batches.
+
+        :param path: File or directory path
+        :type path: str
+
+        :param format: 'parquet', 'feather', 'arrow', or 'csv'. By default, inferred from the file extension.
+        :type format: Optional str.
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                graphistry
+                    .edges_from_file('transactions.parquet', 'src', 'dst')
+                    .bind(edge_title='amount')
+                    .plot()
+        """
+        return self.edges(LazyTable.from_file(path, format), source, destination)
+
+
+    def nodes_from_file(self, path, node=None, format=None):
+        """Use a Parquet, Feather/Arrow IPC, or CSV file, or directory of them, as nodes.
+
+        Like edges_from_file(), only the bound columns are read, when plotting.
+
+        :param path: File or directory path
+        :type path: str
+
+        :param format: 'parquet', 'feather', 'arrow', or 'csv'. By default, inferred from the file extension.
+        :type format: Optional str.
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                graphistry
+                    .edges_from_file('transactions.parquet', 'src', 'dst')
+                    .nodes_from_file('accounts.feather', 'id')
+                    .bind(point_title='owner')
+                    .plot()
+        """
+        return self.nodes(LazyTable.from_file(path, format), node)
+
+
+    def sample_edges(self, n=None, frac=None, seed=None):
+        """Keep a uniform random sample of edges, and the nodes they reference.
+
+        Sampling methods shrink graphs too large to plot, keeping bindings and encodings. They run on
+        Pandas dataframes and Arrow tables, loading LazyTables with their bound and selected columns.
+        When nodes are set, only those referenced by the kept edges remain.
+
+        :param n: Number of edges to keep
+        :type n: Optional int.
+
+        :param frac: Fraction of edges to keep, instead of n
+        :type frac: Optional float.
+
+        :param seed: Random seed, for repeatable samples
+        :type seed: Optional int.
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                graphistry.edges(huge_df, 'src', 'dst').sample_edges(n=1000000).plot()
+        """
+        return self._sampled(lambda edges: sampling.uniform_edges(edges, n, frac, seed))
+
+
+    def sample_time_window(self, column, start=None, end=None, last=None):
+        """Keep edges whose column value falls within a time window, and the nodes they reference.
+
+        :param column: Edge column with times, or other ordered values
+        :type column: str
+
+        :param start: Keep edges with values at or after start
+        :param end: Keep edges with values before end
+        :param last: Keep edges within this duration, such as '7 days', of the latest value, instead of start
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                graphistry.edges(logins, 'user', 'host').sample_time_window('time', last='24h').plot()
+        """
+        return self._sampled(lambda edges: sampling.time_window(edges, column, start, end, last), columns=[column])
+
+
+    def sample_top_degree(self, n):
+        """Keep the n nodes with the most edges, and the edges between them.
+
+        :param n: Number of nodes to keep
+        :type n: int
+
+        :returns: Plotter.
+        :rtype: Plotter.
+        """
+        return self._sampled(lambda edges: sampling.top_degree(edges, self._source, self._destination, n), True)
+
+
+    def sample_random_walk(self, n, walkers=None, restart=0.15, seed=None):
+        """Keep the first n nodes reached by random walks, and the edges between them.
+
+        Walks ignore edge direction. Each step, each walker moves to a random neighbor, or with
+        probability restart, jumps to a random node. Compared to sample_edges(), this keeps
+        neighborhoods intact, preserving local structure such as clusters.
+
+        :param n: Number of nodes to keep
+        :type n: int
+
+        :param walkers: Number of walks run in parallel, defaulting to n/1000 and at least 10
+        :type walkers: Optional int.
+
+        :param restart: Probability of jumping to a random node each step
+        :type restart: float
+
+        :param seed: Random seed, for repeatable samples
+        :type seed: Optional int.
+
+        :returns: Plotter.
+        :rtype: Plotter.
+        """
+        return self._sampled(lambda edges: sampling.random_walk(edges, self._source, self._destination, n, walkers, restart, seed), True)
+
+
+    def sample_forest_fire(self, n, p=0.7, seed=None):
+        """Keep the first n nodes burnt by a forest fire, and the edges between them.
+
+        Fires ignore edge direction. A fire starts at a random node and spreads from each newly burnt
+        node to each of its unburnt neighbors with probability p, restarting elsewhere when it dies out.
+        Higher p keeps denser, more connected regions.
+
+        :param n: Number of nodes to keep
+        :type n: int
+
+        :param p: Forward burning probability
+        :type p: float
+
+        :param seed: Random seed, for repeatable samples
+        :type seed: Optional int.
+
+        :returns: Plotter.
+        :rtype: Plotter.
+        """
+        return self._sampled(lambda edges: sampling.forest_fire(edges, self._source, self._destination, n, p, seed), True)
+
+
+    def compute_degrees(self, degree='degree', degree_in='degree_in', degree_out='degree_out'):
+        """Add each node's number of incoming, outgoing, and total edges as node columns.
+
+        Graph statistics methods run in vectorized passes over Pandas dataframes or Arrow tables, loading
+        LazyTables with their bound and selected columns. They add their columns to the nodes table,
+        replacing existing ones, and create the nodes table from the edge endpoints when it is missing.
+        Nodes without edges get 0, and edges with a missing endpoint are skipped.
+
+        :param degree: Column name for total degree, counting self-loops twice
+        :type degree: str
+
+        :param degree_in: Column name for in-degree
+        :type degree_in: str
+
+        :param degree_out: Column name for out-degree
+        :type degree_out: str
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                g = graphistry.edges(es, 'src', 'dst').compute_degrees()
+                g.encode_point_size('degree_in').plot()
+        """
+        def columns(s, d, count):
+            (d_in, d_out, d_all) = compute.degrees(s, d, count)
+            return {degree_in: (d_in, 0), degree_out: (d_out, 0), degree: (d_all, 0)}
+        return self._with_node_columns(columns)
+
+
+    def compute_components(self, component='component'):
+        """Add each node's weakly connected component as a node column.
+
+        Components ignore edge direction and are numbered by size, 0 being the largest. Nodes without
+        edges are their own components, and nodes with a missing id get -1. See compute_degrees() for
+        how tables are handled.
+
+        :param component: Column name for the component number
+        :type component: str
+
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+            ::
+
+                import graphistry
+                g = graphistry.edges(es, 'src', 'dst').compute_components()
+                g.encode_point_color('component', as_categorical=True).plot()
+        """
+        return self._with_node_columns(lambda s, d, count: {component: (compute.components(s, d, count), -1)})
+
+
+    def _with_node_columns(self, columns):
+        if self._edges is None:
+            error('Edges must be set before computing graph statistics.')
+        if self._source is None or self._destination is None:
+            error('Both "source" and "destination" must be bound before computing graph statistics.')
+        if not (self._nodes is None) and self._node is None:
+            error('Node identifier must be bound when using node dataframe.')
+        edges = self._materialize(self._edges, 'edges')
+        nodes = self._materialize(self._nodes, 'nodes') if not (self._nodes is None) else None
+        for table in [edges] + ([nodes] if not (nodes is None) else []):
+            if not isinstance(table, (pandas.DataFrame, pa.Table)):
+                error('Graph statistics require Pandas dataframes or Arrow tables, not %s.' % type(table).__name__)
+        node = self._node or Plotter._defaultNodeId
+        return self.edges(edges).nodes(compute.with_node_columns(edges, self._source, self._destination, nodes, node, columns), node)
+
+
+    # columns: edge columns sample reads beyond the bound ones, loaded along with them from a LazyTable
+    def _sampled(self, sample, needs_endpoints=False, columns=None):
+        if self._edges is None:
+            error('Edges must be set before sampling.')
+        if needs_endpoints and (self._source is None or self._destination is None):
+            error('Both "source" and "destination" must be bound before sampling.')
+        edges = self._materialize(self._edges, 'edges', columns)
+        if not isinstance(edges, (pandas.DataFrame, pa.Table)):
+            error('Sampling requires edges as a Pandas dataframe or Arrow table, not %s.' % type(edges).__name__)
+        res = self.edges(sample(edges))
+        if not (self._nodes is None or self._node is None or self._source is None or self._destination is None):
+            nodes = self._materialize(self._nodes, 'nodes')
+            res = res.nodes(sampling.nodes_of(nodes, self._node, res._edges, self._source, self._destination))
+        return res
+
+
     def graph(self, ig):
         """Specify the node and edge data.
 
@@ -896,7 +1156,7 @@ class Plotter(object):
         return res
 
 
-    def plot(self, graph=None, nodes=None, name=None, description=None, render=None, skip_upload=False):
+    def plot(self, graph=None, nodes=None, name=None, description=None, render=None, skip_upload=False, as_files=False, memoize=True, sanitize=True, columns=None, exclude_columns=None, profile=False, progress=None):
         """Upload data to the Graphistry server and show as an iframe of it.
 
         Uses the currently bound schema structure and visual encodings.
@@ -922,6 +1182,27 @@ class Plotter(object):
         :param skip_upload: Return node/edge/bindings that would have been uploaded. By default, upload happens.
         :type skip_upload: Boolean. 
 
+        :param as_files: In api=3, upload nodes/edges as server files and create the dataset referencing them. Replotting the same data with new encodings then only sends the new encodings.
+        :type as_files: Boolean.
+
+        :param memoize: With as_files, reuse the server file of an identical table uploaded earlier in this session instead of uploading again.
+        :type memoize: Boolean.
+
+        :param sanitize: Clean nodes/edges before upload: True (default) drops rows with missing IDs and infers numeric types of object columns, 'fast' skips the type inference for already-typed frames, and False skips all cleaning except creating a missing nodes table.
+        :type sanitize: Boolean or 'fast'.
+
+        :param columns: Upload only some columns: 'bound' for ones used by bindings and encodings, or a column name or list of additional columns to keep alongside those. By default, all columns are uploaded.
+        :type columns: Optional 'bound', str, or list of str.
+
+        :param exclude_columns: Column name or names to drop before upload. Source, destination, and node ID columns are always kept.
+        :type exclude_columns: Optional str or list of str.
+
+        :param profile: Measure time, bytes, and memory per stage (see PlotProfile): True logs the report to the graphistry.profiling logger at INFO, and a function is called with the report dict.
+        :type profile: Boolean or function.
+
+        :param progress: Report upload progress (bytes sent, rate, ETA): None (default) shows a progress bar, using tqdm when installed, for uploads over 5MB, True for all uploads, and False never. A function is instead called with progress dicts, see graphistry.progress.ProgressReader.
+        :type progress: Optional boolean or function.
+
         **Example: Simple**
             ::
 
@@ -943,6 +1224,13 @@ class Plotter(object):
 
         """
 
+        if profile:
+            with PlotProfile(callback=profile if callable(profile) else None, log=profile is True):
+                return self.plot(graph, nodes, name, description, render, skip_upload, as_files, memoize, sanitize, columns, exclude_columns, progress=progress)
+
+        if not (sanitize in [True, False, 'fast']):
+            error('sanitize must be True, False, or \'fast\', not %s' % repr(sanitize))
+
         if graph is None:
             if self._edges is None:
                 error('Graph/edges must be specified.')
@@ -955,26 +1243,33 @@ class Plotter(object):
 
         self._check_mandatory_bindings(not isinstance(n, type(None)))
 
+        with stage('materialize') as s:
+            g = self._materialize(g, 'edges', columns)
+            n = self._materialize(n, 'nodes', columns)
+            s.measure_out(g, n)
+
         from .pygraphistry import PyGraphistry
         api_version = PyGraphistry.api_version()
         if api_version == 1:
-            dataset = self._plot_dispatch(g, n, name, description, 'json', self._style)
+            dataset = self._plot_dispatch(g, n, name, description, 'json', self._style, sanitize, columns, exclude_columns)
             if skip_upload:
                 return dataset
-            info = PyGraphistry._etl1(dataset)
+            info = PyGraphistry._etl1(dataset, progress)
         elif api_version == 2:
-            dataset = self._plot_dispatch(g, n, name, description, 'vgraph', self._style)
+            dataset = self._plot_dispatch(g, n, name, description, 'vgraph', self._style, sanitize, columns, exclude_columns)
             if skip_upload:
                 return dataset
-            info = PyGraphistry._etl2(dataset)
+            info = PyGraphistry._etl2(dataset, progress)
         elif api_version == 3:
-            PyGraphistry.refresh()
-            dataset = self._plot_dispatch(g, n, name, description, 'arrow', self._style)
+            with stage('auth'):
+                PyGraphistry.refresh()
+            dataset = self._plot_dispatch(g, n, name, description, 'arrow', self._style, sanitize, columns, exclude_columns)
             if skip_upload:
                 return dataset
             #fresh
             dataset.token = PyGraphistry.api_token()
-            dataset.post()
+            dataset.progress = progress
+            dataset.post(as_files=as_files, memoize=memoize)
             info = {
                 'name': dataset.dataset_id,
                 'type': 'arrow',
@@ -1024,10 +1319,25 @@ class Plotter(object):
         eattribs = edges.columns.values.tolist()
         eattribs.remove(self._source)
         eattribs.remove(self._destination)
-        cols = [self._source, self._destination] + eattribs
-        etuples = [tuple(x) for x in edges[cols].values]
-        return igraph.Graph.TupleList(etuples, directed=directed, edge_attrs=eattribs,
-                                      vertex_name_attr=self._node)
+
+        # Number vertices by first appearance as src, dst, src, ..., matching Graph.TupleList
+        # Concat keeps categorical, string, and nullable integer ids, which numpy arrays cannot hold
+        n = len(edges)
+        order = numpy.empty(2 * n, dtype=numpy.int64)
+        order[0::2] = numpy.arange(n)
+        order[1::2] = numpy.arange(n, 2 * n)
+        ids = pandas.concat([edges[self._source], edges[self._destination]], ignore_index=True).take(order)
+        (codes, names) = pandas.factorize(ids)
+        names = names.tolist()
+        if (codes < 0).any():
+            codes[codes < 0] = len(names)
+            names.append(numpy.nan)
+
+        ig = igraph.Graph(n=len(names), edges=list(zip(codes[0::2].tolist(), codes[1::2].tolist())), directed=directed)
+        ig.vs[self._node] = names
+        for attrib in eattribs:
+            ig.es[attrib] = edges[attrib].tolist()
+        return ig
 
 
     def igraph2pandas(self, ig):
@@ -1049,25 +1359,22 @@ class Plotter(object):
                 g.nodes(vs2).bind(point_color='community').plot()
         """
 
-        def get_edgelist(ig):
-            idmap = dict(enumerate(ig.vs[self._node]))
-            for e in ig.es:
-                t = e.tuple
-                yield dict({self._source: idmap[t[0]], self._destination: idmap[t[1]]},
-                            **e.attributes())
-
         self._check_mandatory_bindings(False)
         if self._node is None:
-            ig.vs[Plotter._defaultNodeId] = [v.index for v in ig.vs]
+            ig.vs[Plotter._defaultNodeId] = list(range(ig.vcount()))
             self._node = Plotter._defaultNodeId
         elif self._node not in ig.vs.attributes():
             error('Vertex attribute "%s" bound to "node" does not exist.' % self._node)
 
-        edata = get_edgelist(ig)
-        ndata = [v.attributes() for v in ig.vs]
-        nodes = pandas.DataFrame(ndata, columns=ig.vs.attributes())
-        cols = [self._source, self._destination] + ig.es.attributes()
-        edges = pandas.DataFrame(edata, columns=cols)
+        nodes = pandas.DataFrame({attrib: ig.vs[attrib] for attrib in ig.vs.attributes()}, columns=ig.vs.attributes())
+
+        pairs = numpy.array(ig.get_edgelist(), dtype=numpy.int64).reshape(-1, 2)
+        names = nodes[self._node]
+        edges = pandas.DataFrame({
+            self._source: names.take(pairs[:, 0]).values,
+            self._destination: names.take(pairs[:, 1]).values,
+            **{attrib: ig.es[attrib] for attrib in ig.es.attributes()}
+        }, columns=[self._source, self._destination] + ig.es.attributes())
         return (edges, nodes)
 
 
@@ -1086,21 +1393,165 @@ class Plotter(object):
 
     def networkx2pandas(self, g):
 
-        def get_nodelist(g):
-            for n in g.nodes(data=True):
-                yield dict({self._node: n[0]}, **n[1])
+        # (u, v, attributes) per edge in g.edges(data=True) order, reading the adjacency dicts directly
         def get_edgelist(g):
-            for e in g.edges(data=True):
-                yield dict({self._source: e[0], self._destination: e[1]}, **e[2])
+            adj = getattr(g, '_adj', g.adj)
+            (directed, multi) = (g.is_directed(), g.is_multigraph())
+            seen = set()
+            for (u, nbrs) in adj.items():
+                for (v, data) in nbrs.items():
+                    if directed or not (v in seen):
+                        if multi:
+                            for d in data.values():
+                                yield (u, v, d)
+                        else:
+                            yield (u, v, data)
+                if not directed:
+                    seen.add(u)
+
+        # Rows of (*ids, attributes) => frame of id columns then one column per attribute in order of first appearance
+        # Attributes are appended to per-column row/value lists, and rows missing one are filled with NaN,
+        # or keep their id when the attribute shares an id column's name
+        def rows_to_df(id_columns, rows):
+            ids = [[] for c in id_columns]
+            attribs = {}
+            n = 0
+            for row in rows:
+                for (col, v) in zip(ids, row):
+                    col.append(v)
+                for (k, v) in row[-1].items():
+                    col = attribs.get(k)
+                    if col is None:
+                        col = attribs[k] = ([], [])
+                    col[0].append(n)
+                    col[1].append(v)
+                n += 1
+            cols = dict(zip(id_columns, ids))
+            for (k, (idx, vals)) in attribs.items():
+                if len(idx) == n:
+                    cols[k] = vals
+                else:
+                    filled = pandas.Series(vals, index=idx, dtype=object).reindex(pandas.RangeIndex(n))
+                    if k in cols:
+                        filled = filled.where(filled.index.isin(idx), pandas.Series(cols[k], dtype=object))
+                    cols[k] = filled.infer_objects()
+            return pandas.DataFrame(cols, columns=list(cols.keys()))
 
         self._check_mandatory_bindings(False)
         self.networkx_checkoverlap(g)
         
         self._node = self._node or Plotter._defaultNodeId
-        nodes = pandas.DataFrame(get_nodelist(g))
-        edges = pandas.DataFrame(get_edgelist(g))
+        nodes = rows_to_df([self._node], g.nodes(data=True))
+        edges = rows_to_df([self._source, self._destination], get_edgelist(g))
         return (edges, nodes)
 
+    def pandas2networkx(self, edges, nodes=None, directed=True, multigraph=False):
+        """Convert a pandas edge dataframe, and optionally a node dataframe, to a NetworkX graph.
+
+        Uses current bindings. Other columns become node/edge attributes, skipping missing values so graphs from networkx2pandas round trip.
+        Defaults to a DiGraph, and use multigraph=True to keep parallel edges.
+
+        **Example**
+            ::
+
+                import graphistry, networkx
+                g = graphistry.bind(source='src', destination='dst', node='id')
+
+                es = pandas.DataFrame({'src': [0,1,2], 'dst': [1,2,0], 'w': [1,2,3]})
+
+                ng = g.pandas2networkx(es)
+                networkx.set_node_attributes(ng, networkx.pagerank(ng, weight='w'), 'pagerank')
+                g.bind(point_size='pagerank').plot(ng)
+        """
+
+        import networkx as nx
+
+        # Generate one attribute dict per row, only checking for missing values in columns that have some
+        def columns_to_attributes(df, cols):
+            dense = [c for c in cols if not df[c].hasnans]
+            sparse = [c for c in cols if df[c].hasnans]
+            rows = zip(*[df[c].tolist() for c in dense]) if len(dense) > 0 else ((),) * len(df)
+            if len(sparse) == 0:
+                for row in rows:
+                    yield dict(zip(dense, row))
+            else:
+                sparse_rows = zip(*[df[c].tolist() for c in sparse])
+                present_rows = zip(*[df[c].notna().tolist() for c in sparse])
+                for (row, sparse_row, present_row) in zip(rows, sparse_rows, present_rows):
+                    d = dict(zip(dense, row))
+                    for (c, v, present) in zip(sparse, sparse_row, present_row):
+                        if present:
+                            d[c] = v
+                    yield d
+
+        self._check_mandatory_bindings(False)
+        self._check_bound_attribs(edges, ['source', 'destination'], 'Edge')
+
+        if directed:
+            ng = nx.MultiDiGraph() if multigraph else nx.DiGraph()
+        else:
+            ng = nx.MultiGraph() if multigraph else nx.Graph()
+
+        if not (nodes is None):
+            self._check_bound_attribs(nodes, ['node'], 'Vertex')
+            ncols = [c for c in nodes.columns if not (c == self._node)]
+            ng.add_nodes_from(zip(nodes[self._node].tolist(), columns_to_attributes(nodes, ncols)))
+
+        ecols = [c for c in edges.columns if not (c in [self._source, self._destination])]
+        ng.add_edges_from(zip(
+            edges[self._source].tolist(), edges[self._destination].tolist(),
+            columns_to_attributes(edges, ecols)))
+        return ng
+
+
+    # Columns referenced by bindings and complex encodings
+    def _bound_columns(self, graph_type):
+        au = ArrowUploader()
+        if graph_type == 'edges':
+            bindings = au.g_to_edge_bindings(self)
+            encodings = self._complex_encodings['edge_encodings']
+        else:
+            bindings = au.g_to_node_bindings(self)
+            encodings = self._complex_encodings['node_encodings']
+        attributes = [
+            encoding['attribute']
+            for mode in ['current', 'default']
+            for encoding in encodings[mode].values()
+            if isinstance(encoding, dict) and 'attribute' in encoding
+        ]
+        return list(dict.fromkeys(list(bindings.values()) + attributes))
+
+    # Columns to upload for plot(columns=...), or None for all
+    def _projected_columns(self, graph_type, columns):
+        if columns is None:
+            return None
+        bound = self._bound_columns(graph_type)
+        if columns == 'bound':
+            return bound
+        return list(dict.fromkeys(bound + Plotter._column_list(columns)))
+
+    # A lone column name is one column, not a sequence of characters
+    @staticmethod
+    def _column_list(columns):
+        return [columns] if isinstance(columns, str) else list(columns)
+
+    def _project_columns(self, table, graph_type, columns=None, exclude_columns=None):
+        if table is None:
+            return table
+        table = select_columns(table, self._projected_columns(graph_type, columns))
+        if exclude_columns:
+            exclude_columns = Plotter._column_list(exclude_columns)
+            ids = [self._source, self._destination] if graph_type == 'edges' else [self._node]
+            have = table.column_names if isinstance(table, pa.Table) else table.columns.tolist()
+            table = select_columns(table, [c for c in have if (c not in exclude_columns) or (c in ids)])
+        return table
+
+    # LazyTables default to only loading bound columns
+    def _materialize(self, table, graph_type, columns=None):
+        if isinstance(table, LazyTable):
+            return table.materialize(self._projected_columns(graph_type, columns) or self._bound_columns(graph_type))
+        return table
+
 
     def _check_mandatory_bindings(self, node_required):
         if self._source is None or self._destination is None:
@@ -1117,18 +1568,20 @@ class Plotter(object):
                 error('%s attribute "%s" bound to "%s" does not exist.' % (typ, a, b))
 
 
-    def _plot_dispatch(self, graph, nodes, name, description, mode='json', metadata=None):
+    def _plot_dispatch(self, graph, nodes, name, description, mode='json', metadata=None, sanitize=True, columns=None, exclude_columns=None):
 
         if isinstance(graph, pandas.core.frame.DataFrame) \
             or isinstance(graph, pa.Table) \
             or ( not (maybe_cudf is None) and isinstance(graph, maybe_cudf.DataFrame) ):
-            return self._make_dataset(graph, nodes, name, description, mode, metadata)
+            return self._make_dataset(graph, nodes, name, description, mode, metadata, sanitize, columns, exclude_columns)
 
         try:
             import igraph
             if isinstance(graph, igraph.Graph):
-                (e, n) = self.igraph2pandas(graph)
-                return self._make_dataset(e, n, name, description, mode, metadata)
+                with stage('convert') as s:
+                    (e, n) = self.igraph2pandas(graph)
+                    s.measure_out(e, n)
+                return self._make_dataset(e, n, name, description, mode, metadata, sanitize, columns, exclude_columns)
         except ImportError:
             pass
 
@@ -1138,8 +1591,10 @@ class Plotter(object):
                isinstance(graph, networkx.classes.digraph.DiGraph) or \
                isinstance(graph, networkx.classes.multigraph.MultiGraph) or \
                isinstance(graph, networkx.classes.multidigraph.MultiDiGraph):
-                (e, n) = self.networkx2pandas(graph)
-                return self._make_dataset(e, n, name, description, mode, metadata)
+                with stage('convert') as s:
+                    (e, n) = self.networkx2pandas(graph)
+                    s.measure_out(e, n)
+                return self._make_dataset(e, n, name, description, mode, metadata, sanitize, columns, exclude_columns)
         except ImportError:
             pass
 
@@ -1152,46 +1607,181 @@ class Plotter(object):
     # - dropping nodes with NAs in nodeid
     # - creating a default node table if none was provided.
     # - inferring numeric types of all columns containing numpy objects
-    def _sanitize_dataset(self, edges, nodes, nodeid):
+    # Copies are only made when rows actually get dropped. sanitize='fast' skips
+    # type inference, and sanitize=False additionally skips NA/duplicate dropping.
+    @profiled('sanitize')
+    def _sanitize_dataset(self, edges, nodes, nodeid, sanitize=True):
         self._check_bound_attribs(edges, ['source', 'destination'], 'Edge')
-        elist = edges.reset_index(drop=True) \
-                     .dropna(subset=[self._source, self._destination])
-
-        obj_df = elist.select_dtypes(include=[numpy.object_])
-        elist[obj_df.columns] = obj_df.apply(pandas.to_numeric, errors='ignore')
+        elist = edges
+        if sanitize:
+            elist = Plotter._drop_na_rows(elist, [self._source, self._destination])
+        elist = Plotter._with_range_index(elist)
+        if sanitize == True:
+            Plotter._infer_numeric_inplace(elist)
 
         if nodes is None:
-            nodes = pandas.DataFrame()
-            nodes[nodeid] = pandas.concat([edges[self._source], edges[self._destination]],
-                                           ignore_index=True).drop_duplicates()
+            nodes = pandas.DataFrame({
+                nodeid: pandas.concat([elist[self._source], elist[self._destination]],
+                                      ignore_index=True).drop_duplicates()
+            })
         else:
             self._check_bound_attribs(nodes, ['node'], 'Vertex')
 
-        nlist = nodes.reset_index(drop=True) \
-                     .dropna(subset=[nodeid]) \
-                     .drop_duplicates(subset=[nodeid])
+        nlist = nodes
+        if sanitize:
+            nlist = Plotter._drop_na_rows(nlist, [nodeid])
+            if nlist[nodeid].duplicated().any():
+                nlist = nlist.drop_duplicates(subset=[nodeid])
+        nlist = Plotter._with_range_index(nlist)
+        if sanitize == True:
+            Plotter._infer_numeric_inplace(nlist)
+
+        return (elist, nlist)
 
-        obj_df = nlist.select_dtypes(include=[numpy.object_])
-        nlist[obj_df.columns] = obj_df.apply(pandas.to_numeric, errors='ignore')
+    @staticmethod
+    def _drop_na_rows(df, cols):
+        if df[cols].isna().any(axis=None):
+            return df.dropna(subset=cols)
+        return df
+
+    # Shallow copy so callers can add/replace columns without touching user data
+    @staticmethod
+    def _with_range_index(df):
+        out = df.copy(deep=False)
+        out.index = pandas.RangeIndex(len(out))
+        return out
+
+    # pandas.to_numeric is all-or-nothing per column, so a failing sample proves the
+    # full column would fail too: string columns exit after sample_size values
+    @staticmethod
+    def _infer_numeric_inplace(df, sample_size=100):
+        for col in df.columns[(df.dtypes == numpy.object_).values]:
+            try:
+                pandas.to_numeric(df[col].iloc[:sample_size])
+                df[col] = pandas.to_numeric(df[col])
+            except (ValueError, TypeError):
+                continue
+
+
+    # Arrow counterpart of _sanitize_dataset for api=3, staying columnar by
+    # - validating bindings against the table schemas
+    # - dropping edges with nulls in source or destination
+    # - dropping nodes with null or duplicate ids
+    # - casting source, destination, and node ids to one type, so they match
+    # - creating a default node table if none was provided.
+    # sanitize=False only validates bindings.
+    @profiled('sanitize')
+    def _sanitize_arrow_dataset(self, edges: pa.Table, nodes: pa.Table, sanitize=True):
+        au = ArrowUploader()
+        self._check_bound_arrow_attribs(edges, au.g_to_edge_bindings(self), ['source', 'destination'], 'Edge')
+        if not (nodes is None):
+            self._check_bound_arrow_attribs(nodes, au.g_to_node_bindings(self), ['node'], 'Vertex')
+        if not sanitize:
+            return (edges, nodes)
+
+        elist = Plotter._drop_null_arrow_rows(edges, [self._source, self._destination])
+
+        id_columns = [(elist, self._source), (elist, self._destination)] + ([(nodes, self._node)] if not (nodes is None) else [])
+        id_type = Plotter._common_arrow_id_type([table.schema.field(col).type for (table, col) in id_columns])
+        try:
+            (elist, nodes) = self._cast_arrow_ids(elist, nodes, id_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Widening would lose values (ex: uint64 ids above 2^63 as int64), so compare ids as strings
+            (elist, nodes) = self._cast_arrow_ids(elist, nodes, pa.string())
+
+        if nodes is None:
+            nlist = pa.Table.from_arrays(
+                [Plotter._arrow_unique_ids(elist[self._source], elist[self._destination])],
+                names=[self._node])
+        else:
+            nlist = Plotter._drop_null_arrow_rows(nodes, [self._node])
+            nlist = Plotter._drop_duplicate_arrow_rows(nlist, self._node)
 
         return (elist, nlist)
 
+    def _check_bound_arrow_attribs(self, table: pa.Table, bindings, mandatory, typ):
+        cols = table.column_names
+        for attrib, col in bindings.items():
+            if col in cols:
+                continue
+            if attrib in mandatory:
+                error('%s attribute "%s" bound to "%s" does not exist.' % (typ, attrib, col))
+            else:
+                warn('Attribute "%s" bound to %s does not exist.' % (col, attrib))
+
+    @staticmethod
+    def _drop_null_arrow_rows(table: pa.Table, cols) -> pa.Table:
+        if sum([table[col].null_count for col in cols]) == 0:
+            return table
+        import pyarrow.compute as pc
+        mask = pc.is_valid(table[cols[0]])
+        for col in cols[1:]:
+            mask = pc.and_(mask, pc.is_valid(table[col]))
+        return table.filter(mask)
+
+    # Keep first occurrence of each id
+    @staticmethod
+    def _drop_duplicate_arrow_rows(table: pa.Table, col) -> pa.Table:
+        import pyarrow.compute as pc
+        if pc.count_distinct(table[col]).as_py() == len(table):
+            return table
+        row = '__row__'
+        firsts = table.append_column(row, pa.array(numpy.arange(len(table))))\
+            .group_by(col).aggregate([(row, 'min')])[row + '_min']
+        return table.take(numpy.sort(firsts.to_numpy()))
+
+    # Safe casts, so they raise instead of overflowing or truncating ids
+    def _cast_arrow_ids(self, elist: pa.Table, nodes: pa.Table, typ):
+        elist = Plotter._cast_arrow_columns(elist, [self._source, self._destination], typ)
+        if not (nodes is None):
+            nodes = Plotter._cast_arrow_columns(nodes, [self._node], typ)
+        return (elist, nodes)
+
+    # Widest numeric type when ids are all numeric, else strings
+    @staticmethod
+    def _common_arrow_id_type(types):
+        if all([t.equals(types[0]) for t in types]):
+            return types[0]
+        types = [t.value_type if pa.types.is_dictionary(t) else t for t in types]
+        if all([pa.types.is_unsigned_integer(t) for t in types]):
+            return pa.uint64()
+        if all([pa.types.is_integer(t) for t in types]):
+            return pa.int64()
+        if all([pa.types.is_integer(t) or pa.types.is_floating(t) for t in types]):
+            return pa.float64()
+        if all([pa.types.is_large_string(t) or pa.types.is_string(t) for t in types]) and any([pa.types.is_large_string(t) for t in types]):
+            return pa.large_string()
+        return pa.string()
+
+    @staticmethod
+    def _cast_arrow_columns(table: pa.Table, cols, typ) -> pa.Table:
+        for col in dict.fromkeys(cols):
+            i = table.column_names.index(col)
+            if not table.schema.field(i).type.equals(typ):
+                table = table.set_column(i, col, table[col].cast(typ))
+        return table
+
+    @staticmethod
+    def _arrow_unique_ids(src: pa.ChunkedArray, dst: pa.ChunkedArray) -> pa.Array:
+        import pyarrow.compute as pc
+        return pc.unique(pa.chunked_array(src.chunks + dst.chunks, type=src.type))
+
 
     def _check_dataset_size(self, elist, nlist):
         edge_count = len(elist.index)
         node_count = len(nlist.index)
         graph_size = edge_count + node_count
         if edge_count > 8e6:
-            error('Maximum number of edges (8M) exceeded: %d.' % edge_count)
+            error('Maximum number of edges (8M) exceeded: %d. Reduce it first, such as with sample_edges(n=...) or sample_random_walk(n=...).' % edge_count)
         if node_count > 8e6:
-            error('Maximum number of nodes (8M) exceeded: %d.' % node_count)
+            error('Maximum number of nodes (8M) exceeded: %d. Reduce it first, such as with sample_top_degree(n=...) or sample_forest_fire(n=...).' % node_count)
         if graph_size > 1e6:
-            warn('Large graph: |nodes| + |edges| = %d. Layout/rendering might be slow.' % graph_size)
+            warn('Large graph: |nodes| + |edges| = %d. Layout/rendering might be slow, consider sampling, such as with sample_edges(n=...).' % graph_size)
 
 
     # Bind attributes for ETL1 by creating a copy of the designated column renamed
     # with magic names understood by ETL1 (eg. pointColor, etc)
-    def _bind_attributes_v1(self, edges, nodes):
+    def _bind_attributes_v1(self, edges, nodes, sanitize=True):
         def bind(df, pbname, attrib, default=None):
             bound = getattr(self, attrib)
             if bound:
@@ -1203,7 +1793,7 @@ class Plotter(object):
                 df[pbname] = df[default]
 
         nodeid = self._node or Plotter._defaultNodeId
-        (elist, nlist) = self._sanitize_dataset(edges, nodes, nodeid)
+        (elist, nlist) = self._sanitize_dataset(edges, nodes, nodeid, sanitize)
         self._check_dataset_size(elist, nlist)
 
         bind(elist, 'edgeColor', '_edge_color')
@@ -1228,7 +1818,7 @@ class Plotter(object):
 
     # Bind attributes for ETL2 by an encodings map storing the visual semantic of
     # each bound column.
-    def _bind_attributes_v2(self, edges, nodes):
+    def _bind_attributes_v2(self, edges, nodes, sanitize=True):
         def bind(enc, df, pbname, attrib, default=None):
             bound = getattr(self, attrib)
             if bound:
@@ -1240,7 +1830,7 @@ class Plotter(object):
                 enc[pbname] = {'attributes': [default]}
 
         nodeid = self._node or Plotter._defaultNodeId
-        (elist, nlist) = self._sanitize_dataset(edges, nodes, nodeid)
+        (elist, nlist) = self._sanitize_dataset(edges, nodes, nodeid, sanitize)
         self._check_dataset_size(elist, nlist)
 
         edge_encodings = {
@@ -1308,7 +1898,11 @@ class Plotter(object):
         raise Exception('Unknown type %s: Could not convert data to Arrow' % str(type(table)))
 
 
-    def _make_dataset(self, edges, nodes, name, description, mode, metadata=None):
+    @profiled('encode')
+    def _make_dataset(self, edges, nodes, name, description, mode, metadata=None, sanitize=True, columns=None, exclude_columns=None):
+        edges = self._project_columns(edges, 'edges', columns, exclude_columns)
+        nodes = self._project_columns(nodes, 'nodes', columns, exclude_columns)
+
         try:
             if len(edges) == 0:
                 warn('Graph has no edges, may have rendering issues')
@@ -1330,26 +1924,30 @@ class Plotter(object):
         if mode == 'json':
             edges_df = self._table_to_pandas(edges)
             nodes_df = self._table_to_pandas(nodes)
-            return self._make_json_dataset(edges_df, nodes_df, name)
+            return self._make_json_dataset(edges_df, nodes_df, name, sanitize)
         elif mode == 'vgraph':
             edges_df = self._table_to_pandas(edges)
             nodes_df = self._table_to_pandas(nodes)
-            return self._make_vgraph_dataset(edges_df, nodes_df, name)
+            return self._make_vgraph_dataset(edges_df, nodes_df, name, sanitize)
         elif mode == 'arrow':
             edges_arr = self._table_to_arrow(edges)
             nodes_arr = self._table_to_arrow(nodes)
-            return self._make_arrow_dataset(edges=edges_arr, nodes=nodes_arr, name=name, description=description, metadata=metadata)
+            g = self
+            if sanitize and (nodes_arr is None) and (self._node is None):
+                g = self.bind(node=Plotter._defaultNodeId)
+            (edges_arr, nodes_arr) = g._sanitize_arrow_dataset(edges_arr, nodes_arr, sanitize)
+            return g._make_arrow_dataset(edges=edges_arr, nodes=nodes_arr, name=name, description=description, metadata=metadata)
             #token=None, dataset_id=None, url_params = None)
         else:
             raise ValueError('Unknown mode: ' + mode)
 
 
     # Main helper for creating ETL1 payload
-    def _make_json_dataset(self, edges, nodes, name):
+    def _make_json_dataset(self, edges, nodes, name, sanitize=True):
 
         from .pygraphistry import PyGraphistry
 
-        (elist, nlist) = self._bind_attributes_v1(edges, nodes)
+        (elist, nlist) = self._bind_attributes_v1(edges, nodes, sanitize)
         edict = elist.where((pandas.notnull(elist)), None).to_dict(orient='records')
 
         bindings = {'idField': self._node or Plotter._defaultNodeId,
@@ -1364,10 +1962,10 @@ class Plotter(object):
 
 
     # Main helper for creating ETL2 payload
-    def _make_vgraph_dataset(self, edges, nodes, name):
+    def _make_vgraph_dataset(self, edges, nodes, name, sanitize=True):
         from . import vgraph
 
-        (elist, nlist, encodings) = self._bind_attributes_v2(edges, nodes)
+        (elist, nlist, encodings) = self._bind_attributes_v2(edges, nodes, sanitize)
         nodeid = self._node or Plotter._defaultNodeId
 
         sources = elist[self._source]
@@ -1414,17 +2012,79 @@ class Plotter(object):
         return res
 
 
-    def cypher(self, query, params={}):
+    def cypher(self, query, params={}, page_size=None, cache=None, spill=None):
+
+        from .pygraphistry import PyGraphistry
+
+        res = copy.copy(self)
+        driver = self._bolt_driver or PyGraphistry._config['bolt_driver']
+
+        if cache is True:
+            cache = cypher_cache
+        from .spill import to_spill
+        spill = to_spill(spill)
+        if not (spill is None) and page_size is None:
+            page_size = 10000
+        key = None
+        tables = None
+        if not (cache is None or cache is False):
+            key = cache.key(driver, query, params)
+            if key is None:
+                warn('Not caching cypher results: the bolt driver has no known address or user')
+            else:
+                tables = cache.get(key)
+
+        if not (tables is None):
+            (edges, nodes) = tables
+            # Same result types as without the cache: Arrow when paging, else Pandas
+            if page_size is None:
+                (edges, nodes) = (edges.to_pandas(), nodes.to_pandas())
+        elif not (page_size is None):
+            (edges, nodes) = bolt_paged_graph_to_arrow(driver, query, params, page_size, spill)
+        else:
+            (edges, nodes) = bolt_query_to_dataframes(driver, query, params)
+
+        if not (key is None) and tables is None:
+            if isinstance(edges, pa.Table):
+                cache.put(key, (edges, nodes))
+            else:
+                cache.put(key, (df_to_arrow(edges), df_to_arrow(nodes)))
+
+        return res\
+            .bind(\
+                node=node_id_key,\
+                source=start_node_id_key,\
+                destination=end_node_id_key
+            )\
+            .nodes(nodes)\
+            .edges(edges)
+
+    def cypher_many(self, queries, max_workers=None):
+        """Run cypher queries concurrently and union their graphs into one Plotter
+
+        Each query runs in its own session from the bolt driver's connection pool. Only waiting on the
+        database overlaps: converting each result graph to dataframes is Python work that holds the GIL,
+        so conversions run one at a time, and cypher_many does not speed up queries that return quickly.
+        Edges are deduplicated on relationship id and nodes on node id.
+
+        :param queries: List of query strings or (query, params) pairs
+        :param max_workers: Maximum concurrent queries, defaulting to one per query
+        :returns: Plotter binding `source`, `destination`, and `node`, like cypher()
+        """
 
+        from concurrent.futures import ThreadPoolExecutor
         from .pygraphistry import PyGraphistry
 
         res = copy.copy(self)
         driver = self._bolt_driver or PyGraphistry._config['bolt_driver']
-        with driver.session() as session:
-            bolt_statement = session.run(query, **params)
-            graph = bolt_statement.graph()
-            edges = bolt_graph_to_edges_dataframe(graph)
-            nodes = bolt_graph_to_nodes_dataframe(graph)
+        queries = [(q, {}) if isinstance(q, str) else (q[0], q[1]) for q in queries]
+        if len(queries) == 0:
+            error('cypher_many requires at least one query')
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as executor:
+            results = list(executor.map(lambda q: bolt_query_to_dataframes(driver, q[0], q[1]), queries))
+        (edges, nodes) = union_bolt_dataframes([r[0] for r in results], [r[1] for r in results])
+
         return res\
             .bind(\
                 node=node_id_key,\
@@ -1434,12 +2094,13 @@ class Plotter(object):
             .nodes(nodes)\
             .edges(edges)
 
-    def nodexl(self, xls_or_url, source='default', engine=None, verbose=False):
+    def nodexl(self, xls_or_url, source='default', engine=None, verbose=False, columns=None, cache_dir=None, parallel=False, lazy_html=False):
         
         if not (engine is None):
             print('WARNING: Engine currently ignored, please contact if critical')
         
-        return NodeXLGraphistry(self, engine).xls(xls_or_url, source, verbose)
+        from .nodexlistry import NodeXLGraphistry
+        return NodeXLGraphistry(self, engine).xls(xls_or_url, source, verbose, columns, cache_dir, parallel, lazy_html)
 
 
     def tigergraph(self,
@@ -1450,7 +2111,10 @@ class Plotter(object):
         db = None,
         user = 'tigergraph',
         pwd = 'tigergraph',
-        verbose = False
+        verbose = False,
+        timeout = None,
+        retries = 3,
+        backoff_factor = 0.5
     ):
         """Register Tigergraph connection setting defaults
     
@@ -1470,6 +2134,12 @@ class Plotter(object):
         :type pwd: Optional string.
         :param verbose: Whether to print operations
         :type verbose: Optional bool.         
+        :param timeout: Seconds to wait for a response, None to wait for long-running queries, or a (connect, read) pair. Connecting times out after 10 seconds.
+        :type timeout: Optional number or tuple.
+        :param retries: Retries on connection errors, and for stored query endpoints, 429/5xx responses, with exponential backoff. Interpreted gsql queries, which may write, are never resent once sent.
+        :type retries: Optional integer.
+        :param backoff_factor: Base delay in seconds between retries
+        :type backoff_factor: Optional number.
         :returns: Plotter.
         :rtype: Plotter.
 
@@ -1481,8 +2151,9 @@ class Plotter(object):
                     tg = graphistry.tigergraph(protocol='https', server='acme.com', db='my_db', user='alice', pwd='tigergraph2')                    
 
         """
+        from .tigeristry import Tigeristry
         res = copy.copy(self)
-        res._tigergraph = Tigeristry(self, protocol, server, web_port, api_port, db, user, pwd, verbose)
+        res._tigergraph = Tigeristry(self, protocol, server, web_port, api_port, db, user, pwd, verbose, timeout, retries, backoff_factor)
         return res
 
 
@@ -1527,6 +2198,33 @@ class Plotter(object):
         """
         return self._tigergraph.gsql_endpoint(self, method_name, args, bindings, db, dry_run)
 
+    def gsql_endpoint_many(self, calls, bindings = {}, db = None, max_workers = None):
+        """Invoke several Tigergraph stored procedures concurrently and merge their results into one Plottable
+
+        Calls share the connection pool, timeout, and retry settings from .tigergraph(...).
+        Edges and nodes returned by several calls are kept once.
+
+        :param calls: Stored procedure names, or (name, args) pairs
+        :type calls: List.
+        :param bindings: Mapping defining names of returned 'edges' and/or 'nodes', defaults to @@nodeList and @@edgeList
+        :type bindings: Optional dictionary.
+        :param db: Name of the database, defaults to value set in .tigergraph(...)
+        :type db: Optional string.
+        :param max_workers: Maximum concurrent calls, defaults to all of them
+        :type max_workers: Optional integer.
+        :returns: Plotter.
+        :rtype: Plotter.
+
+        **Example**
+                ::
+
+                    import graphistry
+                    tg = graphistry.tigergraph(db='my_db')
+                    tg.gsql_endpoint_many([('neighbors', {'k': 2}), 'shared_devices', ('transfers', {'days': 30})]).plot()
+
+        """
+        return self._tigergraph.gsql_endpoint_many(self, calls, bindings, db, max_workers)
+
     def gsql(self, query, bindings = {}, dry_run = False):
         """Run Tigergraph query in interpreted mode and return transformed Plottable
     
@@ -0,0 +1,349 @@
+import functools, io, logging, os, threading, time, tracemalloc
+import numpy as np, pandas as pd, pyarrow as pa
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Innermost active PlotProfile of the current thread
+_active = threading.local()
+
+# Per-stage peaks need tracemalloc.reset_peak (Python 3.9+)
+_can_reset_peak = hasattr(tracemalloc, 'reset_peak')
+
+
+def sizeof(obj):
+    """Size in bytes of a payload buffer or sized stream, or shallow in-memory size of a table; None for other values"""
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, memoryview):
+        return obj.nbytes
+    if isinstance(obj, io.BytesIO):
+        with obj.getbuffer() as view:
+            return view.nbytes
+    # Streamed upload bodies, such as ProgressReader and ArrowFileBody, know their length without being read
+    if hasattr(obj, 'read') and hasattr(obj, '__len__'):
+        return len(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=False))
+    if isinstance(obj, (pa.Table, pa.Array, pa.ChunkedArray, np.ndarray)):
+        return int(obj.nbytes)
+    if isinstance(getattr(obj, 'nbytes', None), int):
+        return obj.nbytes
+    return None
+
+
+def _tracing_memory():
+    return _can_reset_peak and tracemalloc.is_tracing()
+
+
+# psutil.Process for platforms without /proc, resolved on first use; False when not installed
+_psutil_process = None
+
+
+def rss_bytes():
+    """Resident set size of this process, including Arrow, NumPy, and other native memory; None when unavailable"""
+    global _psutil_process
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if _psutil_process is None:
+        try:
+            import psutil
+            _psutil_process = psutil.Process()
+        except ImportError:
+            _psutil_process = False
+    return _psutil_process.memory_info().rss if _psutil_process else None
+
+
+class MemorySample(object):
+    """Arrow memory pool allocations and process RSS at one point, for deltas over a stage"""
+
+    def __init__(self):
+        self.arrow = pa.total_allocated_bytes()
+        self.rss = rss_bytes()
+
+    def deltas(self):
+        """(arrow bytes, rss bytes) allocated since this sample, negative when freed"""
+        end = MemorySample()
+        return (end.arrow - self.arrow, None if (self.rss is None or end.rss is None) else end.rss - self.rss)
+
+
+class Stage(object):
+    """Handle for an open stage, for recording how many bytes it consumed and produced"""
+
+    def __init__(self, record):
+        self.record = record
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.memory_base = None
+        self.peak_seen = 0
+
+    def _add(self, key, objs):
+        sizes = [s for s in [sizeof(o) for o in objs] if not (s is None)]
+        if len(sizes) > 0:
+            self.record[key] = (self.record[key] or 0) + sum(sizes)
+
+    def measure_in(self, *objs):
+        self._add('bytes_in', objs)
+
+    def measure_out(self, *objs):
+        self._add('bytes_out', objs)
+
+    def measure_http(self, response):
+        """Record a requests response's request body, including streamed ones, as bytes in and its content as bytes out"""
+        request = getattr(response, 'request', None)
+        self.measure_in(getattr(request, 'body', None))
+        self.measure_out(getattr(response, 'content', None))
+
+
+class NullStage(Stage):
+    """Stage handle used when nothing is profiling, so instrumented code pays no sizing costs"""
+
+    def __init__(self):
+        pass
+
+    def measure_in(self, *objs):
+        pass
+
+    def measure_out(self, *objs):
+        pass
+
+    def measure_http(self, response):
+        pass
+
+
+null_stage = NullStage()
+
+
+@contextmanager
+def stage(name):
+    """Record the enclosed code as a stage of the active PlotProfile, if any
+
+    **Example**
+        ::
+
+            with stage('compress') as s:
+                s.measure_in(raw)
+                out = gzip.compress(raw)
+                s.measure_out(out)
+    """
+    profile = getattr(_active, 'profile', None)
+    if profile is None:
+        yield null_stage
+        return
+    s = profile._start(name)
+    error = None
+    try:
+        yield s
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        profile._stop(s, error)
+
+
+def profiled(name):
+    """Decorator recording each call as a stage, measuring table/buffer arguments as bytes in and results as bytes out"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_active, 'profile', None) is None:
+                return fn(*args, **kwargs)
+            with stage(name) as s:
+                s.measure_in(*args, *kwargs.values())
+                out = fn(*args, **kwargs)
+                s.measure_out(*(out if isinstance(out, tuple) else (out,)))
+                return out
+        return wrapper
+    return decorator
+
+
+class PlotProfile(object):
+    """Per-stage wall time, CPU time, bytes, and peak memory of plot() calls made while active.
+
+    Stages are 'materialize' (loading LazyTables), 'convert' (NetworkX/IGraph to dataframes),
+    'sanitize', 'encode' (building and serializing the upload payload), 'compress', 'auth', and
+    'upload' (each HTTP request, including api=3 Arrow serialization streamed into it). Stage times exclude time spent in nested stages, so they add
+    up to the total minus ``unattributed_seconds``. Bytes in/out are shallow table sizes and
+    buffer lengths consumed and produced by a stage; for 'upload', the request and response bodies.
+
+    Peak memory counts Python and NumPy allocations, and is only recorded when tracing memory:
+    pass ``memory=True``, or call ``tracemalloc.start()`` beforehand. Tracing slows allocation-heavy
+    stages, so leave it off for timing runs. Requires Python 3.9+.
+
+    Tracing misses Arrow and other native buffers, so each stage also records the change in Arrow
+    memory pool allocations (``arrow_delta_bytes``) and in process resident memory (``rss_delta_bytes``,
+    from /proc or psutil when installed) between its start and end, including nested stages.
+    These are net changes rather than peaks, and are always recorded.
+
+    On exit, the report is passed to ``callback``, and with ``log=True``, logged at INFO to the
+    ``graphistry.profiling`` logger with the report dict as the ``graphistry_profile`` record attribute.
+    Use ``plot(profile=True)`` or ``plot(profile=callback)`` to profile a single call.
+
+    **Example**
+        ::
+
+            import graphistry
+            with graphistry.PlotProfile(memory=True) as profile:
+                graphistry.edges(es, 'src', 'dst').plot(render=False)
+            print(profile.summary())
+            metrics.send(profile.report()['totals'])
+    """
+
+    def __init__(self, callback=None, log=False, memory=False):
+        self.callback = callback
+        self.log = log
+        self.memory = memory
+        self.stages = []
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_memory_bytes = None
+        self.arrow_delta_bytes = None
+        self.rss_delta_bytes = None
+        self._open = []
+        self._parent = None
+        self._started_tracing = False
+        self._memory_base = None
+        self._peak_seen = 0
+
+    def __enter__(self):
+        self._parent = getattr(_active, 'profile', None)
+        _active.profile = self
+        if self.memory and _can_reset_peak and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if _tracing_memory():
+            (current, peak) = tracemalloc.get_traced_memory()
+            if not (self._parent is None):
+                self._parent._note_peak(peak)
+            self._memory_base = current
+            tracemalloc.reset_peak()
+        self._memory0 = MemorySample()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_seconds = time.perf_counter() - self._wall0
+        self.cpu_seconds = time.process_time() - self._cpu0
+        (self.arrow_delta_bytes, self.rss_delta_bytes) = self._memory0.deltas()
+        if not (self._memory_base is None) and tracemalloc.is_tracing():
+            absolute = max(self._peak_seen, tracemalloc.get_traced_memory()[1])
+            self.peak_memory_bytes = absolute - self._memory_base
+            if not (self._parent is None):
+                self._parent._note_peak(absolute)
+        if self._started_tracing:
+            tracemalloc.stop()
+        _active.profile = self._parent
+        if not (self._parent is None):
+            self._parent.stages.extend(self.stages)
+        self._emit()
+        return False
+
+    def _note_peak(self, absolute):
+        self._peak_seen = max(self._peak_seen, absolute)
+        for s in self._open:
+            s.peak_seen = max(s.peak_seen, absolute)
+
+    def _start(self, name):
+        record = {
+            'stage': name, 'wall_seconds': None, 'cpu_seconds': None,
+            'bytes_in': None, 'bytes_out': None, 'peak_memory_bytes': None,
+            'arrow_delta_bytes': None, 'rss_delta_bytes': None, 'error': None
+        }
+        self.stages.append(record)
+        s = Stage(record)
+        if _tracing_memory():
+            (current, peak) = tracemalloc.get_traced_memory()
+            self._note_peak(peak)
+            s.memory_base = current
+            tracemalloc.reset_peak()
+        self._open.append(s)
+        s.memory0 = MemorySample()
+        s.wall0 = time.perf_counter()
+        s.cpu0 = time.process_time()
+        return s
+
+    def _stop(self, s, error):
+        wall = time.perf_counter() - s.wall0
+        cpu = time.process_time() - s.cpu0
+        self._open.remove(s)
+        record = s.record
+        (record['arrow_delta_bytes'], record['rss_delta_bytes']) = s.memory0.deltas()
+        if not (s.memory_base is None) and tracemalloc.is_tracing():
+            absolute = max(s.peak_seen, tracemalloc.get_traced_memory()[1])
+            record['peak_memory_bytes'] = absolute - s.memory_base
+            self._note_peak(absolute)
+        if len(self._open) > 0:
+            self._open[-1].child_wall += wall
+            self._open[-1].child_cpu += cpu
+        record['wall_seconds'] = max(wall - s.child_wall, 0.0)
+        record['cpu_seconds'] = max(cpu - s.child_cpu, 0.0)
+        record['error'] = error
+
+    def report(self):
+        """Dict of overall measurements, each stage call in start order, and per-stage totals"""
+        done = [dict(r) for r in self.stages if not (r['wall_seconds'] is None)]
+        totals = {}
+        for r in done:
+            t = totals.setdefault(r['stage'], {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                'bytes_in': None, 'bytes_out': None, 'peak_memory_bytes': None,
+                'arrow_delta_bytes': None, 'rss_delta_bytes': None, 'errors': 0
+            })
+            t['calls'] += 1
+            t['wall_seconds'] += r['wall_seconds']
+            t['cpu_seconds'] += r['cpu_seconds']
+            for k in ['bytes_in', 'bytes_out', 'arrow_delta_bytes', 'rss_delta_bytes']:
+                if not (r[k] is None):
+                    t[k] = (t[k] or 0) + r[k]
+            if not (r['peak_memory_bytes'] is None):
+                t['peak_memory_bytes'] = max(t['peak_memory_bytes'] or 0, r['peak_memory_bytes'])
+            if not (r['error'] is None):
+                t['errors'] += 1
+        unattributed = None
+        if not (self.wall_seconds is None):
+            unattributed = max(self.wall_seconds - sum([r['wall_seconds'] for r in done]), 0.0)
+        return {
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'arrow_delta_bytes': self.arrow_delta_bytes,
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'unattributed_seconds': unattributed,
+            'stages': done,
+            'totals': totals
+        }
+
+    def summary(self, report=None):
+        """Human-readable table of per-stage totals"""
+        report = report or self.report()
+
+        def mb(n):
+            return '-' if n is None else '%.1fMB' % (n / 1e6)
+
+        lines = ['plot profile: %.3fs wall, %.3fs cpu, %s peak, %s arrow, %s rss' % (
+            report['wall_seconds'] or 0.0, report['cpu_seconds'] or 0.0, mb(report['peak_memory_bytes']),
+            mb(report['arrow_delta_bytes']), mb(report['rss_delta_bytes']))]
+        for (name, t) in report['totals'].items():
+            lines.append('  %-12s x%-3s %8.3fs wall %8.3fs cpu  in %9s  out %9s  peak %9s  arrow %9s  rss %9s%s' % (
+                name, t['calls'], t['wall_seconds'], t['cpu_seconds'],
+                mb(t['bytes_in']), mb(t['bytes_out']), mb(t['peak_memory_bytes']),
+                mb(t['arrow_delta_bytes']), mb(t['rss_delta_bytes']),
+                '  (%s failed)' % t['errors'] if t['errors'] > 0 else ''))
+        if not (report['unattributed_seconds'] is None):
+            lines.append('  %-12s      %8.3fs wall' % ('other', report['unattributed_seconds']))
+        return '\n'.join(lines)
+
+    def _emit(self):
+        if not self.log and self.callback is None:
+            return
+        report = self.report()
+        if self.log:
+            logger.info('%s', self.summary(report), extra={'graphistry_profile': report})
+        if not (self.callback is None):
+            self.callback(report)
@@ -0,0 +1,140 @@
+import io, os, sys, time
+
+
+# Uploads at least this large show progress by default
+default_min_bytes = 5 * 1024 * 1024
+
+
+def payload_size(data):
+    """Bytes left to read from a bytes-like, sized file-like, BytesIO, or real file payload"""
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if hasattr(data, '__len__'):
+        return len(data)
+    if isinstance(data, io.BytesIO):
+        return data.getbuffer().nbytes - data.tell()
+    return os.fstat(data.fileno()).st_size - data.tell()
+
+
+class ProgressReader(object):
+    """Read-only file over an upload payload, reporting progress as the HTTP client reads it.
+
+    The payload may be bytes, or a file-like object such as an open file or ArrowFileBody,
+    which is then read incrementally instead of being loaded into memory.
+
+    As a ``requests`` body, the upload keeps its Content-Length while being streamed in blocks.
+    ``callback`` receives a dict with ``name``, ``bytes_sent``, ``total_bytes``, ``elapsed_seconds``,
+    ``bytes_per_second``, ``eta_seconds``, and ``done``: when reading starts, at most every
+    ``interval`` seconds while sending, and once when all bytes were read. A transfer that stops
+    reporting while not done is waiting on the network, not on the server.
+
+    **Example**
+        ::
+
+            import requests
+            from graphistry.progress import ProgressReader
+            requests.post(url, data=ProgressReader(buf, lambda p: print(p['bytes_sent'], p['eta_seconds'])))
+    """
+
+    def __init__(self, data, callback, name='upload', interval=0.1):
+        self.nbytes = payload_size(data)
+        self._source = data if hasattr(data, 'read') else io.BytesIO(data)
+        self._origin = self._source.tell()
+        self.callback = callback
+        self.name = name
+        self.interval = interval
+        self._pos = 0
+        self._start = None
+        self._last = None
+        self._done = False
+
+    def __len__(self):
+        return self.nbytes
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._pos
+        if whence == io.SEEK_SET:
+            offset += self._origin
+        self._pos = self._source.seek(offset, whence) - self._origin
+        self._done = False
+        return self._pos
+
+    def read(self, size=-1):
+        if self._start is None:
+            self._start = time.perf_counter()
+            self._report(self._start)
+        if size is None or size < 0:
+            size = self.nbytes - self._pos
+        chunk = self._source.read(min(size, max(self.nbytes - self._pos, 0)))
+        self._pos += len(chunk)
+        now = time.perf_counter()
+        finished = self._pos >= self.nbytes or len(chunk) == 0
+        if not self._done and (finished or now - self._last >= self.interval):
+            self._done = finished
+            self._report(now)
+        return chunk
+
+    def _report(self, now):
+        self._last = now
+        elapsed = now - self._start
+        rate = self._pos / elapsed if elapsed > 0 else None
+        self.callback({
+            'name': self.name,
+            'bytes_sent': self._pos,
+            'total_bytes': self.nbytes,
+            'elapsed_seconds': elapsed,
+            'bytes_per_second': rate,
+            'eta_seconds': (self.nbytes - self._pos) / rate if rate else None,
+            'done': self._done
+        })
+
+
+def print_progress(desc):
+    """Progress callback printing a line when an upload starts and when it finishes"""
+    def callback(p):
+        if p['bytes_sent'] == 0 and not p['done']:
+            print('%s: %d kB. This may take a while...' % (desc, p['total_bytes'] // 1024))
+        elif p['done']:
+            print('%s: %d kB in %.1fs (%.1f MB/s)' % (
+                desc, p['total_bytes'] // 1024, p['elapsed_seconds'], (p['bytes_per_second'] or 0) / 1e6))
+        else:
+            return
+        sys.stdout.flush()
+    return callback
+
+
+def tqdm_progress(desc):
+    """Progress callback drawing a tqdm bar, as a widget in notebooks, or printing when tqdm is not installed"""
+    try:
+        from tqdm.auto import tqdm
+    except ImportError:
+        return print_progress(desc)
+
+    state = {'bar': None, 'sent': 0}
+
+    def callback(p):
+        if state['bar'] is None:
+            state['bar'] = tqdm(total=p['total_bytes'], desc=desc, unit='B', unit_scale=True, unit_divisor=1024)
+        state['bar'].update(p['bytes_sent'] - state['sent'])
+        state['sent'] = p['bytes_sent']
+        if p['done']:
+            state['bar'].close()
+    return callback
+
+
+def upload_body(data, progress, name):
+    """Wrap an upload payload to report progress per ``plot(progress=...)``, or return it as-is
+
+    :param progress: None shows default progress for payloads over 5MB, True always, False never, and a function is called with each progress dict.
+    """
+    if progress is False:
+        return data
+    if callable(progress):
+        return ProgressReader(data, progress, name)
+    if progress or payload_size(data) >= default_min_bytes:
+        return ProgressReader(data, tqdm_progress('Uploading %s' % name), name)
+    return data
@@ -1,14 +1,16 @@
 """Top-level import of class PyGraphistry as "Graphistry". Used to connect to the Graphistry server and then create a base plotter."""
 import calendar, gzip, io, json, os, numpy, pandas, requests, sched, sys, time, warnings
+from urllib3.filepost import encode_multipart_formdata
 
 from datetime import datetime
-from distutils.util import strtobool
 
 from .arrow_uploader import ArrowUploader
 
 from . import util
 from . import bolt_util
 from .plotter import Plotter
+from .profiling import stage
+from .progress import upload_body
 
 import logging
 logger = logging.getLogger(__name__)
@@ -69,9 +71,29 @@ def _get_initial_config():
 
 
 
-class PyGraphistry(object):
-    _config = _get_initial_config()
-    _tag = util.fingerprint()
+class PyGraphistryMeta(type):
+    """Resolve config and the client fingerprint on first use rather than at import"""
+
+    @property
+    def _config(cls):
+        if cls._resolved_config is None:
+            cls._resolved_config = _get_initial_config()
+        return cls._resolved_config
+
+    @_config.setter
+    def _config(cls, config):
+        cls._resolved_config = config
+
+    @property
+    def _tag(cls):
+        if cls._resolved_tag is None:
+            cls._resolved_tag = util.fingerprint()
+        return cls._resolved_tag
+
+
+class PyGraphistry(object, metaclass=PyGraphistryMeta):
+    _resolved_config = None
+    _resolved_tag = None
     _is_authenticated = False
 
 
@@ -186,7 +208,7 @@ class PyGraphistry(object):
         if value is None:
             return PyGraphistry._config['store_token_creds_in_memory']
         else:
-            v = bool(strtobool(value)) if isinstance(value, str) else value
+            v = bool(util.strtobool(value)) if isinstance(value, str) else value
             PyGraphistry._config['store_token_creds_in_memory'] = v
 
     @staticmethod
@@ -273,7 +295,7 @@ class PyGraphistry(object):
             return PyGraphistry._config['certificate_validation']
 
         # setter
-        v = bool(strtobool(value)) if isinstance(value, str) else value
+        v = bool(util.strtobool(value)) if isinstance(value, str) else value
         if v == False:
             requests.packages.urllib3.disable_warnings()
         PyGraphistry._config['certificate_validation'] = v
@@ -357,7 +379,7 @@ class PyGraphistry(object):
 
 
     @staticmethod
-    def hypergraph(raw_events, entity_types=None, opts={}, drop_na=True, drop_edge_attrs=False, verbose=True, direct=False):
+    def hypergraph(raw_events, entity_types=None, opts={}, drop_na=True, drop_edge_attrs=False, verbose=True, direct=False, spill=None):
         """Transform a dataframe into a hypergraph.
 
         :param Dataframe raw_events: Dataframe to transform
@@ -366,6 +388,7 @@ class PyGraphistry(object):
         :param bool drop_edge_attrs: Whether to include each row's attributes on its edges, defaults to False (include)
         :param bool verbose: Whether to print size information
         :param bool direct: Omit hypernode and instead strongly connect nodes in an event
+        :param spill: Bound memory use for large inputs by transforming chunks of rows and keeping results in memory-mapped temporary files: True, a memory budget such as '4GB', or a graphistry.Spill
 
         Create a graph out of the dataframe, and return the graph components as dataframes, 
         and the renderable result Plotter. It reveals relationships between the rows and between column values.
@@ -399,6 +422,10 @@ class PyGraphistry(object):
         :returns: {'entities': DF, 'events': DF, 'edges': DF, 'nodes': DF, 'graph': Plotter}
         :rtype: Dictionary
 
+        With ``spill``, the components are Arrow tables backed by the spill files rather than dataframes,
+        and edge rows are grouped by chunk rather than by column. Upload them with api=3 to avoid
+        converting them back into dataframes.
+
         **Example**
 
             ::
@@ -409,7 +436,7 @@ class PyGraphistry(object):
 
         """
         from . import hyper
-        return hyper.Hypergraph().hypergraph(PyGraphistry, raw_events, entity_types, opts, drop_na, drop_edge_attrs, verbose, direct)
+        return hyper.Hypergraph().hypergraph(PyGraphistry, raw_events, entity_types, opts, drop_na, drop_edge_attrs, verbose, direct, spill)
 
 
     @staticmethod
@@ -441,11 +468,14 @@ class PyGraphistry(object):
 
 
     @staticmethod
-    def cypher(query, params = {}):
+    def cypher(query, params = {}, page_size = None, cache = None, spill = None):
         """
 
         :param query: a cypher query
         :param params: cypher query arguments
+        :param page_size: When set, fetch results in pages of this many records via SKIP/LIMIT, converting each page to Arrow as the next one downloads. The query's final RETURN must have an ORDER BY and no SKIP/LIMIT of its own.
+        :param cache: When True, reuse converted results of recent identical queries from the default in-memory cache, or from the given graphistry.CypherCache. Cache hits return the same types as uncached calls: Pandas dataframes, or Arrow tables when paging.
+        :param spill: Keep each converted page in a memory-mapped temporary file instead of RAM: True, a memory budget such as '4GB', or a graphistry.Spill. Implies paging, with page_size defaulting to 10000.
         :return: Plotter with data from a cypher query. This call binds `source`, `destination`, and `node`.
 
         Call this to immediately execute a cypher query and store the graph in the resulting Plotter.
@@ -455,24 +485,48 @@ class PyGraphistry(object):
                     import graphistry
                     g = graphistry.bolt({ query='MATCH (a)-[r:PAYMENT]->(b) WHERE r.USD > 7000 AND r.USD < 10000 RETURN r ORDER BY r.USD DESC', params={ "AccountId": 10 })
         """
-        return Plotter().cypher(query, params)
+        return Plotter().cypher(query, params, page_size, cache, spill)
 
 
     @staticmethod
-    def nodexl(xls_or_url, source='default', engine=None, verbose=False):
+    def cypher_many(queries, max_workers = None):
+        """
+
+        :param queries: list of cypher queries, or of (query, params) pairs
+        :param max_workers: maximum number of queries to run concurrently, defaulting to all of them
+        :return: Plotter with the union of the queries' graphs, deduplicated on node and relationship ids. This call binds `source`, `destination`, and `node`.
+
+        Call this to run related cypher queries concurrently over the bolt driver's connection pool and merge their results. Only the database round trips overlap: converting the results to dataframes holds the GIL, so it runs one query at a time.
+
+                ::
+
+                    import graphistry
+                    g = graphistry.cypher_many([
+                        ('MATCH (a:Account)-[r]->(b) WHERE a.id = $id RETURN r', {'id': 10}),
+                        ('MATCH (a:Account)<-[r]-(b) WHERE a.id = $id RETURN r', {'id': 10})])
+        """
+        return Plotter().cypher_many(queries, max_workers)
+
+
+    @staticmethod
+    def nodexl(xls_or_url, source='default', engine=None, verbose=False, columns=None, cache_dir=None, parallel=False, lazy_html=False):
         """
 
         :param xls_or_url: file/http path string to a nodexl-generated xls, or a pandas ExcelFile() object
         :param source: optionally activate binding by string name for a known nodexl data source ('twitter', 'wikimedia')
         :param engine: optionally set a pandas Excel engine
         :param verbose: optionally enable printing progress by overriding to True
+        :param columns: optionally only read sheet columns used by bindings and transformers ('bound'), plus any listed
+        :param cache_dir: optionally cache parsed sheets of local workbooks in this directory as Feather files, keyed by file content, which is only rehashed when the file's size or modification time changes
+        :param parallel: optionally parse the two sheets of a local workbook in separate processes, which helps for large workbooks on multicore machines
+        :param lazy_html: optionally only render link/image HTML for columns bound to point_title or point_label, leaving other columns as raw values
 
         """
 
         if not (engine is None):
             print('WARNING: Engine currently ignored, please contact if critical')
 
-        return Plotter().nodexl(xls_or_url, source, engine, verbose)
+        return Plotter().nodexl(xls_or_url, source, engine, verbose, columns, cache_dir, parallel, lazy_html)
 
 
     @staticmethod
@@ -872,7 +926,10 @@ class PyGraphistry(object):
         db = None,
         user = 'tigergraph',
         pwd = 'tigergraph',
-        verbose = False
+        verbose = False,
+        timeout = None,
+        retries = 3,
+        backoff_factor = 0.5
     ):
         """Register Tigergraph connection setting defaults
     
@@ -892,6 +949,12 @@ class PyGraphistry(object):
         :type pwd: Optional string.
         :param verbose: Whether to print operations
         :type verbose: Optional bool.         
+        :param timeout: Seconds to wait for a response, None to wait for long-running queries, or a (connect, read) pair. Connecting times out after 10 seconds.
+        :type timeout: Optional number or tuple.
+        :param retries: Retries on connection errors, and for stored query endpoints, 429/5xx responses, with exponential backoff. Interpreted gsql queries, which may write, are never resent once sent.
+        :type retries: Optional integer.
+        :param backoff_factor: Base delay in seconds between retries
+        :type backoff_factor: Optional number.
         :returns: Plotter.
         :rtype: Plotter.
 
@@ -904,7 +967,7 @@ class PyGraphistry(object):
 
         """
 
-        return Plotter().tigergraph(protocol, server, web_port, api_port, db, user, pwd, verbose)
+        return Plotter().tigergraph(protocol, server, web_port, api_port, db, user, pwd, verbose, timeout, retries, backoff_factor)
 
 
     @staticmethod
@@ -1101,6 +1164,24 @@ class PyGraphistry(object):
         return Plotter().edges(edges, source, destination)
 
 
+    @staticmethod
+    def edges_from_file(path, source=None, destination=None, format=None):
+        """Use a Parquet, Feather/Arrow IPC, or CSV file or directory as edges, reading only needed columns when plotting.
+
+        See Plotter.edges_from_file.
+        """
+        return Plotter().edges_from_file(path, source, destination, format)
+
+
+    @staticmethod
+    def nodes_from_file(path, node=None, format=None):
+        """Use a Parquet, Feather/Arrow IPC, or CSV file or directory as nodes, reading only needed columns when plotting.
+
+        See Plotter.nodes_from_file.
+        """
+        return Plotter().nodes_from_file(path, node, format)
+
+
     @staticmethod
     def graph(ig):
 
@@ -1152,36 +1233,38 @@ class PyGraphistry(object):
     def _get_data_file(dataset, mode):
         out_file = io.BytesIO()
         if mode == 'json':
-            json_dataset = None
-            try:
-                json_dataset = json.dumps(dataset, ensure_ascii=False, cls=NumpyJSONEncoder)
-            except TypeError:
-                warnings.warn("JSON: Switching from NumpyJSONEncoder to str()")                
-                json_dataset = json.dumps(dataset, default=PyGraphistry._coerce_str)
-
-            with gzip.GzipFile(fileobj=out_file, mode='w', compresslevel=9) as f:
+            with stage('encode') as s:
+                json_dataset = None
+                try:
+                    json_dataset = json.dumps(dataset, ensure_ascii=False, cls=NumpyJSONEncoder)
+                except TypeError:
+                    warnings.warn("JSON: Switching from NumpyJSONEncoder to str()")                
+                    json_dataset = json.dumps(dataset, default=PyGraphistry._coerce_str)
                 if sys.version_info < (3,0) and isinstance(json_dataset, bytes):
-                    f.write(json_dataset)
+                    bin_dataset = json_dataset
                 else:
-                    f.write(json_dataset.encode('utf8'))
+                    bin_dataset = json_dataset.encode('utf8')
+                s.measure_out(bin_dataset)
         elif mode == 'vgraph':
-            bin_dataset = dataset.SerializeToString()
-            with gzip.GzipFile(fileobj=out_file, mode='w', compresslevel=9) as f:
-                f.write(bin_dataset)
+            with stage('encode') as s:
+                bin_dataset = dataset.SerializeToString()
+                s.measure_out(bin_dataset)
         else:
             raise ValueError('Unknown mode:', mode)
 
-        kb_size = len(out_file.getvalue()) // 1024
-        if kb_size >= 5 * 1024:
-            print('Uploading %d kB. This may take a while...' % kb_size)
-            sys.stdout.flush()
+        with stage('compress') as s:
+            s.measure_in(bin_dataset)
+            with gzip.GzipFile(fileobj=out_file, mode='w', compresslevel=9) as f:
+                f.write(bin_dataset)
+            s.measure_out(out_file)
 
         return out_file
 
 
     @staticmethod
-    def _etl1(dataset):
-        PyGraphistry.authenticate()
+    def _etl1(dataset, progress=None):
+        with stage('auth'):
+            PyGraphistry.authenticate()
 
         headers = {'Content-Encoding': 'gzip', 'Content-Type': 'application/json'}
         params = {'usertag': PyGraphistry._tag, 'agent': 'pygraphistry', 'apiversion' : '1',
@@ -1189,10 +1272,12 @@ class PyGraphistry(object):
                   'key': PyGraphistry.api_key()}
 
         out_file = PyGraphistry._get_data_file(dataset, 'json')
-        response = requests.post(PyGraphistry._etl_url(), out_file.getvalue(),
-                                 headers=headers, params=params,
-                                 verify=PyGraphistry._config['certificate_validation'])
-        response.raise_for_status()
+        with stage('upload') as s:
+            response = requests.post(PyGraphistry._etl_url(), upload_body(out_file.getvalue(), progress, 'dataset'),
+                                     headers=headers, params=params,
+                                     verify=PyGraphistry._config['certificate_validation'])
+            s.measure_http(response)
+            response.raise_for_status()
 
         jres = response.json()
         if jres['success'] is not True:
@@ -1202,8 +1287,9 @@ class PyGraphistry(object):
 
 
     @staticmethod
-    def _etl2(dataset):
-        PyGraphistry.authenticate()
+    def _etl2(dataset, progress=None):
+        with stage('auth'):
+            PyGraphistry.authenticate()
 
         vg = dataset['vgraph']
         encodings = dataset['encodings']
@@ -1238,13 +1324,17 @@ class PyGraphistry(object):
             'metadata': ('metadata', metadata_json, 'application/json'),
             'data0': ('data0', out_file.getvalue(), 'application/octet-stream')
         }
+        (body, content_type) = encode_multipart_formdata(parts)
 
         params = {'usertag': PyGraphistry._tag, 'agent': 'pygraphistry', 'apiversion' : '2',
                   'agentversion': sys.modules['graphistry'].__version__,
                   'key': PyGraphistry.api_key()}
-        response = requests.post(PyGraphistry._etl_url(), files=parts, params=params,
-                                 verify=PyGraphistry._config['certificate_validation'])
-        response.raise_for_status()
+        with stage('upload') as s:
+            response = requests.post(PyGraphistry._etl_url(), upload_body(body, progress, 'dataset'),
+                                     headers={'Content-Type': content_type}, params=params,
+                                     verify=PyGraphistry._config['certificate_validation'])
+            s.measure_http(response)
+            response.raise_for_status()
 
         jres = response.json()
         if jres['success'] is not True:
@@ -1300,11 +1390,14 @@ name = PyGraphistry.name
 description = PyGraphistry.description
 edges = PyGraphistry.edges
 nodes = PyGraphistry.nodes
+edges_from_file = PyGraphistry.edges_from_file
+nodes_from_file = PyGraphistry.nodes_from_file
 graph = PyGraphistry.graph
 settings = PyGraphistry.settings
 hypergraph = PyGraphistry.hypergraph
 bolt = PyGraphistry.bolt
 cypher = PyGraphistry.cypher
+cypher_many = PyGraphistry.cypher_many
 nodexl = PyGraphistry.nodexl
 tigergraph = PyGraphistry.tigergraph
 gsql_endpoint = PyGraphistry.gsql_endpoint
@@ -0,0 +1,159 @@
+import logging, numpy as np, pandas as pd, pyarrow as pa
+from .util import error
+
+logger = logging.getLogger(__name__)
+
+
+def series(table, name) -> pd.Series:
+    """Column of a Pandas dataframe or Arrow table as a Pandas series"""
+    if isinstance(table, pa.Table):
+        return table[name].to_pandas()
+    return table[name]
+
+
+def take(table, rows) -> object:
+    """Rows of a Pandas dataframe or Arrow table at the given positions"""
+    if isinstance(table, pa.Table):
+        return table.take(pa.array(rows, type=pa.int64()))
+    return table.take(rows)
+
+
+def endpoints(edges, source, destination):
+    """Integer codes of edge endpoints, as (rows of edges with both endpoints, source codes, destination codes, node count)"""
+    src = series(edges, source)
+    (codes, ids) = pd.factorize(pd.concat([src, series(edges, destination)], ignore_index=True))
+    (s, d) = (codes[:len(src)], codes[len(src):])
+    rows = np.flatnonzero((s >= 0) & (d >= 0))
+    return (rows, s[rows], d[rows], len(ids))
+
+
+def adjacency(s, d, count):
+    """Undirected adjacency of node codes as (offsets, degrees, neighbors), neighbors of i being neighbors[offsets[i]:offsets[i + 1]]"""
+    heads = np.concatenate([s, d]).astype(np.int64)
+    degrees = np.bincount(heads, minlength=count)
+    offsets = np.concatenate([[0], np.cumsum(degrees)])
+    # Sorting (head, tail) pairs packed into one int64 is much faster than an argsort
+    pairs = (heads << 32) | np.concatenate([d, s]).astype(np.int64)
+    pairs.sort()
+    return (offsets, degrees, pairs & 0xffffffff)
+
+
+def neighbors(offsets, degrees, targets, frontier):
+    """All neighbors of each node in frontier, concatenated"""
+    counts = degrees[frontier]
+    shift = np.repeat(offsets[frontier] - np.cumsum(counts) + counts, counts)
+    return targets[shift + np.arange(counts.sum())]
+
+
+def induced(edges, rows, s, d, keep):
+    """Edges whose endpoints are both kept"""
+    return take(edges, rows[keep[s] & keep[d]])
+
+
+def uniform_edges(edges, n=None, frac=None, seed=None):
+    """Uniform random sample of n edges, or a fraction frac of them, in their original order"""
+    total = len(edges)
+    if (n is None) == (frac is None):
+        error('Sample either n edges or a fraction frac of them')
+    if n is None:
+        n = int(round(frac * total))
+    if n >= total:
+        return edges
+    rows = np.random.default_rng(seed).choice(total, max(n, 0), replace=False)
+    return take(edges, np.sort(rows))
+
+
+def time_window(edges, column, start=None, end=None, last=None):
+    """Edges with start <= column < end, or with column within last (ex: '7 days') of its latest value"""
+    values = series(edges, column)
+    if not (last is None):
+        start = values.max() - (pd.Timedelta(last) if isinstance(last, str) else last)
+    keep = np.ones(len(values), dtype=bool)
+    if not (start is None):
+        keep &= (values >= start).to_numpy()
+    if not (end is None):
+        keep &= (values < end).to_numpy()
+    return take(edges, np.flatnonzero(keep))
+
+
+def top_degree(edges, source, destination, n):
+    """Subgraph induced by the n nodes with the most edges"""
+    (rows, s, d, count) = endpoints(edges, source, destination)
+    if n >= count:
+        return edges
+    keep = np.zeros(count, dtype=bool)
+    if n > 0:
+        degrees = np.bincount(s, minlength=count) + np.bincount(d, minlength=count)
+        keep[np.argpartition(-degrees, n - 1)[:n]] = True
+    return induced(edges, rows, s, d, keep)
+
+
+def random_walk(edges, source, destination, n, walkers=None, restart=0.15, seed=None):
+    """Subgraph induced by the first n nodes visited by parallel random walks over undirected edges
+
+    Each step, every walker either jumps to a uniformly random node, with probability restart or when
+    it has no edges, or moves to a uniformly random neighbor.
+    """
+    if not (0 < restart <= 1):
+        error('Random walk restart probability must be in (0, 1]: %s' % restart)
+    (rows, s, d, count) = endpoints(edges, source, destination)
+    if n >= count:
+        return edges
+    rng = np.random.default_rng(seed)
+    (offsets, degrees, targets) = adjacency(s, d, count)
+    walkers = walkers or min(max(n // 1000, 10), max(n, 1))
+
+    visited = np.zeros(count, dtype=bool)
+    seen = 0
+    steps = 0
+    position = rng.integers(0, count, walkers)
+    while seen < n:
+        fresh = pd.unique(position[~visited[position]])[:(n - seen)]
+        visited[fresh] = True
+        seen += len(fresh)
+        jump = (rng.random(walkers) < restart) | (degrees[position] == 0)
+        walk = position[~jump]
+        position[~jump] = targets[offsets[walk] + (rng.random(len(walk)) * degrees[walk]).astype(np.int64)]
+        position[jump] = rng.integers(0, count, jump.sum())
+        steps += 1
+    logger.debug('Random walk sampled %s of %s nodes in %s steps of %s walkers', seen, count, steps, walkers)
+    return induced(edges, rows, s, d, visited)
+
+
+def forest_fire(edges, source, destination, n, p=0.7, seed=None):
+    """Subgraph induced by the first n nodes burnt by a forest fire over undirected edges
+
+    Fires start at random unburnt nodes and spread from each newly burnt node to each of its unburnt
+    neighbors with probability p, restarting elsewhere when they die out.
+    """
+    if not (0 < p <= 1):
+        error('Forest fire burning probability must be in (0, 1]: %s' % p)
+    (rows, s, d, count) = endpoints(edges, source, destination)
+    if n >= count:
+        return edges
+    rng = np.random.default_rng(seed)
+    (offsets, degrees, targets) = adjacency(s, d, count)
+
+    burnt = np.zeros(count, dtype=bool)
+    seen = 0
+    frontier = np.zeros(0, dtype=np.int64)
+    while seen < n:
+        if len(frontier) == 0:
+            candidates = rng.integers(0, count, 64)
+            if burnt[candidates].all():
+                candidates = np.flatnonzero(~burnt)
+            candidates = candidates[~burnt[candidates]][:1]
+        else:
+            candidates = neighbors(offsets, degrees, targets, frontier)
+            candidates = candidates[~burnt[candidates]]
+            candidates = candidates[rng.random(len(candidates)) < p]
+        frontier = pd.unique(candidates)[:(n - seen)]
+        burnt[frontier] = True
+        seen += len(frontier)
+    return induced(edges, rows, s, d, burnt)
+
+
+def nodes_of(nodes, node, edges, source, destination):
+    """Nodes referenced by edges"""
+    ids = pd.concat([series(edges, source), series(edges, destination)], ignore_index=True).unique()
+    return take(nodes, np.flatnonzero(series(nodes, node).isin(ids).to_numpy()))
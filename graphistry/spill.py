@@ -0,0 +1,136 @@
+import logging, os, re, shutil, tempfile, weakref
+import pandas as pd, pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+size_units = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_bytes(size) -> int:
+    """Byte count of an int or a string such as '512MB' or '16GB' (binary units)"""
+    if isinstance(size, str):
+        match = re.match(r'^\s*([0-9]*\.?[0-9]+)\s*([KMGT]?)B?\s*$', size.upper())
+        if match is None:
+            raise ValueError('Could not parse size "%s", try a number of bytes or a string like "4GB"' % size)
+        return int(float(match.group(1)) * size_units[match.group(2)])
+    return int(size)
+
+
+class Spill(object):
+    """Spill intermediate tables to memory-mapped Arrow IPC files, keeping working memory within a budget.
+
+    Large transforms such as ``hypergraph(..., spill=...)`` and paged ``cypher(..., spill=...)`` then process
+    their input in chunks of roughly ``memory_budget`` bytes, write each chunk's results to a file in
+    a temporary directory under ``directory``, and memory-map it back. The returned Arrow tables are
+    backed by those files instead of RAM, so the operating system pages them in and out as needed,
+    and uploading them (api=3) streams straight from the mapped pages. Files are unlinked once
+    mapped and their disk space is released when the tables are garbage collected.
+
+    Point ``directory`` at a disk-backed location if the default temp directory (``TMPDIR``) is a RAM disk.
+
+    :param memory_budget: Approximate bytes of intermediate data to hold in RAM at once, as an int or a string like '2GB'
+    :param directory: Parent directory for spill files, defaulting to the system temp directory
+
+    **Example**
+        ::
+
+            import graphistry
+            hg = graphistry.hypergraph(events, ['src_ip', 'dst_ip', 'user'], spill=graphistry.Spill('4GB', '/mnt/scratch'))
+            hg['graph'].plot()
+    """
+
+    def __init__(self, memory_budget='1GB', directory=None):
+        self.memory_budget = parse_bytes(memory_budget)
+        self.directory = directory
+        self.files = 0
+        self.bytes_written = 0
+        self._path = None
+
+    def __repr__(self):
+        return 'Spill(memory_budget=%s, directory=%s, files=%s, bytes_written=%s)' % (
+            self.memory_budget, self.directory, self.files, self.bytes_written)
+
+    def path(self) -> str:
+        """Temporary directory holding this spill's files, removed when the Spill is garbage collected or on exit"""
+        if self._path is None:
+            self._path = tempfile.mkdtemp(prefix='graphistry-spill-', dir=self.directory)
+            weakref.finalize(self, shutil.rmtree, self._path, True)
+        return self._path
+
+    def rows_per_chunk(self, df: pd.DataFrame, expansion=1) -> int:
+        """Rows of df to process at a time so that intermediates ``expansion`` times its size fit the budget"""
+        if len(df) == 0:
+            return 1
+        sample = df.head(10000)
+        row_bytes = max(float(sample.memory_usage(index=False, deep=True).sum()) / len(sample), 1.0)
+        return max(int(self.memory_budget / (row_bytes * expansion)), 1)
+
+    def table(self, data, schema=None) -> pa.Table:
+        """Write a DataFrame or Arrow table to a spill file and return its memory-mapped contents
+
+        With a schema, the table is cast to it as it is written, filling missing columns with nulls.
+        """
+        from .bolt_util import cast_arrow_table, df_to_arrow
+
+        table = data if isinstance(data, pa.Table) else df_to_arrow(data)
+        if not (schema is None) and not table.schema.equals(schema):
+            table = cast_arrow_table(table, schema)
+        file_path = os.path.join(self.path(), 'spill-%s.arrow' % self.files)
+        with pa.OSFile(file_path, 'wb') as sink:
+            with pa.RecordBatchFileWriter(sink, table.schema) as writer:
+                writer.write_table(table)
+        self.files += 1
+        self.bytes_written += os.path.getsize(file_path)
+
+        out = pa.ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
+        try:
+            os.remove(file_path)
+        except OSError:
+            logger.debug('Could not unlink mapped spill file %s, leaving for cleanup', file_path)
+        return out
+
+    def unify(self, tables) -> list:
+        """Spilled tables sharing one schema, rewriting those whose columns or types differ from it"""
+        from .bolt_util import unify_arrow_schemas
+
+        schema = unify_arrow_schemas([table.schema for table in tables])
+        return [table if table.schema.equals(schema) else self.table(table, schema) for table in tables]
+
+    def append(self, tables: list, data) -> None:
+        """Spill data onto a list of spilled tables, writing it with their schema so concat() never copies
+
+        When data adds columns or needs a wider type (ex: int to float once NaNs appear), the tables
+        already written are rewritten to the new schema, one at a time, so this happens at most a few
+        times per column.
+        """
+        from .bolt_util import df_to_arrow, unify_arrow_schemas
+
+        table = data if isinstance(data, pa.Table) else df_to_arrow(data)
+        if len(tables) == 0:
+            tables.append(self.table(table))
+            return
+        schema = unify_arrow_schemas([tables[0].schema, table.schema])
+        if not tables[0].schema.equals(schema):
+            tables[:] = [self.table(t, schema) for t in tables]
+        tables.append(self.table(table, schema))
+
+    def concat(self, tables, schema=None) -> pa.Table:
+        """Combine spilled tables without copying, after unifying any whose schemas differ
+
+        :param schema: Schema of the empty table returned when there are no tables
+        """
+        if len(tables) == 0:
+            return (pa.schema([]) if schema is None else schema).empty_table()
+        return pa.concat_tables(self.unify(tables))
+
+
+def to_spill(spill):
+    """Resolve a ``spill=`` argument: None/False for no spilling, True for defaults, a budget, or a Spill"""
+    if spill is None or spill is False:
+        return None
+    if spill is True:
+        return Spill()
+    if isinstance(spill, Spill):
+        return spill
+    return Spill(spill)
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import mock, pandas as pd, pytest, unittest
+import base64, io, json, mock, os, pandas as pd, pyarrow as pa, pytest, tempfile, unittest
 
 import graphistry
 from common import NoAuthTestCase
 from graphistry import ArrowUploader
+from graphistry.arrow_uploader import ArrowFileBody
 
 #TODO mock requests for testing actual effectful code
 
@@ -162,4 +163,166 @@ class TestArrowUploader_Comms(unittest.TestCase):
         au = ArrowUploader()
         tok = au.login(username="u", password="p").token
 
-        assert tok == "123"
\ No newline at end of file
+        assert tok == "123"
+
+class StubServer(object):
+    """Records requests.post calls and answers like the dataset/file upload endpoints"""
+
+    def __init__(self):
+        self.urls = []
+        self.datasets = []
+
+    def post(self, url, **kwargs):
+        self.urls.append(url)
+        resp = mock.Mock()
+        if url.endswith('/api/v2/files/'):
+            resp.json = mock.Mock(return_value={'success': True, 'data': {'file_id': 'file%s' % len(self.urls)}})
+        elif url.endswith('/api/v2/upload/datasets/'):
+            self.datasets.append(kwargs['json'])
+            resp.json = mock.Mock(return_value={'success': True, 'data': {'dataset_id': 'ds%s' % len(self.urls)}})
+        else:
+            resp.json = mock.Mock(return_value={'success': True})
+        return resp
+
+    def count(self, fragment):
+        return len([u for u in self.urls if fragment in u])
+
+
+class TestArrowUploader_Memoize(unittest.TestCase):
+
+    def setUp(self):
+        graphistry.arrow_uploader.file_cache.clear()
+
+    def test_fingerprint_content_addressed(self):
+        e1 = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0]}), preserve_index=False)
+        e2 = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0]}), preserve_index=False)
+        e3 = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 1]}), preserve_index=False)
+        fp = graphistry.arrow_uploader.arrow_table_fingerprint
+        assert fp(e1) == fp(e2)
+        assert fp(e1) != fp(e3)
+
+    def test_replot_uploads_once(self):
+        server = StubServer()
+        edges = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0], 'c': [1, 2]}), preserve_index=False)
+        with mock.patch('requests.post', side_effect=server.post):
+            for color in ['red', 'blue']:
+                g = graphistry.edges(edges, 's', 'd').encode_edge_color('c', [color], as_continuous=True)
+                au = ArrowUploader(token='t', edges=edges)
+                au.edge_encodings = au.g_to_edge_encodings(g)
+                au.post(as_files=True)
+        assert server.count('/api/v2/upload/files/') == 1
+        assert server.count('/api/v2/upload/datasets/') == 2
+        assert server.datasets[0]['edge_files'] == server.datasets[1]['edge_files']
+        assert server.datasets[1]['edge_encodings']['complex']['default']['edgeColorEncoding']['colors'] == ['blue']
+        assert graphistry.arrow_uploader.file_cache.hits == 1
+
+    def test_no_memoize(self):
+        server = StubServer()
+        edges = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0]}), preserve_index=False)
+        with mock.patch('requests.post', side_effect=server.post):
+            ArrowUploader(token='t', edges=edges).post(as_files=True, memoize=False)
+            ArrowUploader(token='t', edges=edges).post(as_files=True, memoize=False)
+        assert server.count('/api/v2/upload/files/') == 2
+
+    def test_memo_per_server_and_account(self):
+        server = StubServer()
+        edges = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0]}), preserve_index=False)
+
+        def jwt(claims):
+            return 'h.%s.sig' % base64.urlsafe_b64encode(json.dumps(claims).encode('utf8')).decode('utf8').rstrip('=')
+
+        with mock.patch('requests.post', side_effect=server.post):
+            for (base, token) in [
+                ('http://a', jwt({'user_id': 1, 'exp': 1})),
+                ('http://a', jwt({'user_id': 1, 'exp': 2})),
+                ('http://a', jwt({'user_id': 2, 'exp': 1})),
+                ('http://b', jwt({'user_id': 1, 'exp': 1})),
+                ('http://a', 'opaque')
+            ]:
+                ArrowUploader(server_base_path=base, token=token, edges=edges).post(as_files=True)
+        assert server.count('/api/v2/upload/files/') == 4
+        assert graphistry.arrow_uploader.file_cache.hits == 1
+        assert graphistry.arrow_uploader.token_account('opaque') == 'token:opaque'
+
+    def test_lru_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        cache = graphistry.util.LRUCache(maxsize=50)
+
+        def churn(i):
+            for j in range(2000):
+                cache.put((i, j % 100), j)
+                cache.get((i, (j * 7) % 100))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(churn, range(8)))
+        assert len(cache) == 50
+        assert cache.hits + cache.misses == 8 * 2000
+
+    def test_lru_eviction(self):
+        cache = graphistry.util.LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1
+        cache.put('c', 3)
+        assert 'b' not in cache
+        assert len(cache) == 2
+        assert cache.stats()['hits'] == 1
+
+
+class TestArrowFileBody(unittest.TestCase):
+
+    table = pa.Table.from_pandas(pd.DataFrame({'s': list(range(1000)), 'd': ['x%s' % i for i in range(1000)]}), preserve_index=False)
+
+    def test_same_bytes_as_buffer(self):
+        body = ArrowFileBody(self.table)
+        buf = ArrowUploader().arrow_to_buffer(self.table)
+        assert len(body) == len(buf)
+        assert body.read() == buf
+
+    def test_streams_batches(self):
+        body = ArrowFileBody(self.table, max_chunksize=100, stream_threshold=0)
+        assert body.buffer is None
+        chunks = []
+        while True:
+            chunk = body.read(333)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        data = b''.join(chunks)
+        assert len(data) == len(body) == body.tell()
+        out = pa.ipc.open_file(pa.py_buffer(data))
+        assert out.num_record_batches == 10
+        assert out.read_all().equals(self.table)
+
+    def test_small_tables_encode_once(self):
+        with mock.patch('pyarrow.MockOutputStream') as counter:
+            body = ArrowFileBody(self.table, max_chunksize=100)
+        assert counter.call_count == 0
+        assert isinstance(body.buffer, pa.Buffer) and len(body) == body.buffer.size
+        assert pa.ipc.open_file(pa.py_buffer(body.read())).num_record_batches == 10
+
+    def test_streams_without_copies(self):
+        body = ArrowFileBody(self.table, max_chunksize=100, stream_threshold=0)
+        chunks = list(body._chunks())
+        assert any([isinstance(c, pa.Buffer) and c.size > 0 for c in chunks])
+        assert sum([len(c) for c in chunks]) == len(body)
+
+    def test_rewind(self):
+        body = ArrowFileBody(self.table)
+        first = body.read()
+        assert body.seek(0) == 0
+        assert body.read() == first
+        with self.assertRaises(io.UnsupportedOperation):
+            body.seek(10)
+
+    def test_post_file_streams(self):
+        sent = []
+        def post(url, data=None, **kwargs):
+            sent.append(data.read())
+            return mock.Mock(json=mock.Mock(return_value={'success': True}))
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'edges.csv')
+            with open(path, 'w') as f:
+                f.write('s,d\n0,1\n')
+            with mock.patch('requests.post', side_effect=post):
+                ArrowUploader(token='t', dataset_id='ds').post_edges_file(path)
+        assert sent == [b's,d\n0,1\n']
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import datetime as dt, graphistry, logging, neo4j, numpy, os, pandas as pd, pyarrow as pa, pytest, unittest
+import datetime as dt, graphistry, logging, mock, neo4j, numpy, os, pandas as pd, pyarrow as pa, pytest, threading, unittest
 from common import NoAuthTestCase
 
 from graphistry.bolt_util import (
+    bolt_graph_to_edges_dataframe, bolt_graph_to_nodes_dataframe, bolt_paged_graph_to_arrow,
+    bolt_driver_key, concat_arrow_tables, paged_cypher_query, to_bolt_driver, union_bolt_dataframes, CypherCache,
     neo_df_to_pd_df,
     node_id_key, node_type_key, node_label_prefix_key,
     start_node_id_key, end_node_id_key, relationship_id_key, relationship_type_key
@@ -298,6 +300,374 @@ def test_spatial_heterogeneous():
     with pytest.raises(pa.lib.ArrowTypeError):
         pa.Table.from_pandas(df2)
 
+def test_spatial_leading_missing():
+    df = pd.DataFrame({
+        'c': [None, numpy.nan, neo4j.spatial.CartesianPoint([1,2]), neo4j.spatial.CartesianPoint([3,4,5])],
+        'n': [1, 2, 3, 4]
+    })
+    df2 = neo_df_to_pd_df(df)
+    assert sorted(df2.columns.tolist()) == ['c', 'c_srid', 'c_x', 'c_y', 'n']
+    assert df2['c_x'].tolist()[2:] == [1, 3]
+    assert pd.isna(df2['c_x'][0]) and pd.isna(df2['c_x'][1])
+    assert df2['c'][2] == 'POINT(1 2)'
+    assert df2['n'].tolist() == [1, 2, 3, 4]
+    pa.Table.from_pandas(df2)
+
+def test_spatial_skips_plain_columns():
+    df = pd.DataFrame({'s': ['a', None], 'a': [[1], [2]]})
+    df2 = neo_df_to_pd_df(df)
+    assert df2.columns.tolist() == ['s', 'a']
+    assert df2['s'][0] == 'a' and df2['a'][1] == [2]
+
+def make_bolt_graph():
+    from neo4j.graph import Graph
+    graph = Graph()
+    hydrator = Graph.Hydrator(graph)
+    hydrator.hydrate_node(1, ['A'], {'x': 1, 'd': neo4j.time.Date(2020, 10, 20)})
+    hydrator.hydrate_node(2, ['B', 'C'], {'s': 'abc'})
+    hydrator.hydrate_node(3, [], {'x': 3, 'type': 'shadowed'})
+    hydrator.hydrate_relationship(10, 1, 2, 'KNOWS', {'w': 2, 'type': 'shadowed'})
+    hydrator.hydrate_relationship(11, 2, 3, 'LIKES', {'a': [1, 2]})
+    return graph
+
+def test_bolt_graph_to_edges_dataframe():
+    df = bolt_graph_to_edges_dataframe(make_bolt_graph())
+    assert df.columns.tolist() == ['w', relationship_type_key, relationship_id_key, start_node_id_key, end_node_id_key, 'a']
+    assert df[relationship_type_key].tolist() == ['KNOWS', 'LIKES']
+    assert df[relationship_id_key].tolist() == [10, 11]
+    assert df[start_node_id_key].tolist() == [1, 2]
+    assert df[end_node_id_key].tolist() == [2, 3]
+    assert df['w'].dtype.name == 'float64'
+    assert df['w'][0] == 2 and numpy.isnan(df['w'][1])
+    assert df['a'][1] == [1, 2]
+    pa.Table.from_pandas(df)
+
+def test_bolt_graph_to_nodes_dataframe():
+    df = bolt_graph_to_nodes_dataframe(make_bolt_graph())
+    assert df[node_id_key].tolist() == [1, 2, 3]
+    assert df[node_type_key].tolist() == ['A', 'B,C', '']
+    assert df['x'].tolist()[0] == 1 and df['x'].tolist()[2] == 3
+    assert df['d'].dtype.name == 'datetime64[ns]'
+    assert df['d'][0] == dt.datetime(2020, 10, 20)
+    assert df[node_label_prefix_key + 'A'].tolist()[0] == True
+    assert pd.isna(df[node_label_prefix_key + 'A'][1])
+    assert df[node_label_prefix_key + 'C'].tolist()[1] == True
+
+def test_bolt_graph_empty():
+    from neo4j.graph import Graph
+    with pytest.warns(RuntimeWarning):
+        edges = bolt_graph_to_edges_dataframe(Graph())
+    with pytest.warns(RuntimeWarning):
+        nodes = bolt_graph_to_nodes_dataframe(Graph())
+    assert len(edges) == 0 and start_node_id_key in edges
+    assert len(nodes) == 0 and node_id_key in nodes
+
+class FakePagedDriver(object):
+    """Serves SKIP/LIMIT pages of (node, relationship, node) records, each page in a fresh result graph"""
+
+    def __init__(self, records, nodes):
+        self.records = records
+        self.nodes = nodes
+        self.runs = []
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, graphistry_skip, graphistry_limit, **params):
+        from neo4j.graph import Graph
+        self.runs.append((query, graphistry_skip, graphistry_limit, params))
+        page = self.records[graphistry_skip:graphistry_skip + graphistry_limit]
+        graph = Graph()
+        hydrator = Graph.Hydrator(graph)
+        for (src, rel, dst, props) in page:
+            hydrator.hydrate_node(src, *self.nodes[src])
+            hydrator.hydrate_relationship(rel, src, dst, 'KNOWS', props)
+        class Result(object):
+            def __iter__(self):
+                return iter(page)
+            def graph(self):
+                return graph
+        return Result()
+
+def test_bolt_paged_graph_to_arrow():
+    nodes = {1: (['A'], {'x': 1}), 2: (['B'], {'s': 'abc'}), 3: (['A'], {'x': 3})}
+    records = [(1, 10, 2, {'w': 1}), (2, 11, 3, {'w': 2.5}), (2, 11, 3, {'w': 2.5}), (3, 12, 1, {'v': 'z'}), (1, 13, 3, {})]
+    driver = FakePagedDriver(records, nodes)
+    (edges, nodes_arr) = bolt_paged_graph_to_arrow(driver, 'MATCH (a)-[r]->(b) RETURN a, r ORDER BY id(r)', {'p': 1}, 2)
+    assert [run[1:] for run in driver.runs] == [(0, 2, {'p': 1}), (2, 2, {'p': 1}), (4, 2, {'p': 1})]
+    assert driver.runs[0][0].endswith(' SKIP $graphistry_skip LIMIT $graphistry_limit')
+    assert edges[relationship_id_key].to_pylist() == [10, 11, 12, 13]
+    assert edges[start_node_id_key].to_pylist() == [1, 2, 3, 1]
+    assert edges['w'].type == pa.float64()
+    assert edges['w'].to_pylist() == [1, 2.5, None, None]
+    assert edges['v'].to_pylist() == [None, None, 'z', None]
+    nodes_df = nodes_arr.to_pandas().set_index(node_id_key)
+    assert sorted(nodes_df.index.tolist()) == [1, 2, 3]
+    assert nodes_df.loc[3, 'x'] == 3
+    assert nodes_df.loc[2, 's'] == 'abc'
+
+def test_bolt_paged_graph_spill():
+    nodes = {1: (['A'], {'x': 1}), 2: (['B'], {'s': 'abc'}), 3: (['A'], {'x': 3})}
+    records = [(1, 10, 2, {'w': 1}), (2, 11, 3, {'w': 2.5}), (3, 12, 1, {'v': 'z'})]
+    expected = bolt_paged_graph_to_arrow(FakePagedDriver(records, nodes), 'MATCH (a)-[r]->(b) RETURN a, r ORDER BY id(r)', {}, 1)
+    spill = graphistry.Spill()
+    spilled = bolt_paged_graph_to_arrow(FakePagedDriver(records, nodes), 'MATCH (a)-[r]->(b) RETURN a, r ORDER BY id(r)', {}, 1, spill)
+    # 6 pages, plus rewriting earlier pages once w widens to float and v and s appear
+    assert spill.files == 10
+    assert spilled[0].equals(expected[0]) and spilled[1].equals(expected[1])
+
+def test_bolt_paged_graph_placeholder_nodes():
+    # Node 4 only ever appears as a relationship endpoint, so keeps a placeholder row
+    nodes = {1: (['A'], {'x': 1})}
+    driver = FakePagedDriver([(1, 10, 4, {})], nodes)
+    (edges, nodes_arr) = bolt_paged_graph_to_arrow(driver, 'MATCH (a)-[r]->(b) RETURN a, r ORDER BY id(r)', {}, 10)
+    assert len(driver.runs) == 1
+    assert len(edges) == 1
+    assert sorted(nodes_arr[node_id_key].to_pylist()) == [1, 4]
+
+def test_bolt_paged_graph_empty():
+    driver = FakePagedDriver([], {})
+    with pytest.warns(RuntimeWarning):
+        (edges, nodes_arr) = bolt_paged_graph_to_arrow(driver, 'MATCH (a) RETURN a ORDER BY id(a);', {}, 10)
+    assert len(edges) == 0 and start_node_id_key in edges.column_names
+    assert len(nodes_arr) == 0 and node_id_key in nodes_arr.column_names
+
+def test_concat_arrow_tables_unifies_types():
+    t1 = pa.Table.from_pydict({'a': [1, 2], 'b': ['x', 'y']})
+    t2 = pa.Table.from_pydict({'a': [0.5], 'c': [True], 'b': [3]})
+    out = concat_arrow_tables([t1, t2])
+    assert out.column_names == ['a', 'b', 'c']
+    assert out['a'].type == pa.float64() and out['a'].to_pylist() == [1, 2, 0.5]
+    assert out['b'].to_pylist() == ['x', 'y', '3']
+    assert out['c'].to_pylist() == [None, None, True]
+
+def test_concat_arrow_tables_nested_conflicts():
+    t1 = pa.Table.from_pydict({'l': [[1, 2]], 's': [{'x': 1}], 'm': [[1]]})
+    t2 = pa.Table.from_pydict({'l': [[0.5]], 's': [{'y': 'a'}], 'm': [{'x': 1}]})
+    t3 = pa.Table.from_pydict({'l': [['a']], 's': [None], 'm': ['z']})
+    out = concat_arrow_tables([t1, t2, t3])
+    assert out['l'].type == pa.list_(pa.string()) and out['l'].to_pylist() == [['1', '2'], ['0.5'], ['a']]
+    assert out['s'].to_pylist() == [{'x': 1, 'y': None}, {'x': None, 'y': 'a'}, None]
+    assert out['m'].to_pylist() == ['[1]', '{"x": 1}', 'z']
+
+def test_paged_cypher_query():
+    assert paged_cypher_query('MATCH (a) RETURN a ORDER BY id(a) ;\n') == 'MATCH (a) RETURN a ORDER BY id(a) SKIP $graphistry_skip LIMIT $graphistry_limit'
+    assert paged_cypher_query('MATCH (a) WITH a LIMIT 5 RETURN a order by a.x').endswith('a.x SKIP $graphistry_skip LIMIT $graphistry_limit')
+    for query in ['MATCH (a) RETURN a', 'MATCH (a) RETURN a ORDER BY id(a) LIMIT 5', 'MATCH (a) RETURN a ORDER BY id(a) SKIP 1', 'MATCH (a) SET a.x = 1']:
+        with pytest.raises(ValueError):
+            paged_cypher_query(query)
+
+def test_cypher_page_size():
+    nodes = {1: (['A'], {'x': 1}), 2: (['B'], {'s': 'abc'})}
+    driver = FakePagedDriver([(1, 10, 2, {'w': 1})], nodes)
+    g = graphistry.bind()
+    g._bolt_driver = driver
+    g = g.cypher('MATCH (a)-[r]->(b) RETURN a, r, b ORDER BY id(r)', page_size=5)
+    assert isinstance(g._edges, pa.Table) and isinstance(g._nodes, pa.Table)
+    assert g._source == start_node_id_key and g._destination == end_node_id_key and g._node == node_id_key
+    assert len(g._edges) == 1 and len(g._nodes) == 2
+
+class FakeQueryDriver(object):
+    """Serves a result graph per query; optional barrier checks queries run concurrently"""
+
+    def __init__(self, results, nodes, barrier=None, address='localhost:7687'):
+        self.results = results
+        self.nodes = nodes
+        self.barrier = barrier
+        self.address = address
+        self.runs = []
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, **params):
+        from neo4j.graph import Graph
+        self.runs.append((query, params))
+        if not (self.barrier is None):
+            self.barrier.wait()
+        graph = Graph()
+        hydrator = Graph.Hydrator(graph)
+        for (src, rel, dst, props) in self.results[query]:
+            for node_id in [src, dst]:
+                if node_id in self.nodes:
+                    hydrator.hydrate_node(node_id, *self.nodes[node_id])
+            hydrator.hydrate_relationship(rel, src, dst, 'KNOWS', props)
+        class Result(object):
+            def graph(self):
+                return graph
+        return Result()
+
+def test_cypher_many():
+    import threading
+    nodes = {1: (['A'], {'x': 1}), 2: (['B'], {'s': 'abc'}), 3: (['A'], {'x': 3})}
+    results = {
+        'q1': [(1, 10, 2, {'w': 1}), (2, 11, 3, {'w': 2})],
+        'q2': [(2, 11, 3, {'w': 2}), (3, 12, 4, {'v': 'z'})]
+    }
+    driver = FakeQueryDriver(results, nodes, threading.Barrier(2, timeout=10))
+    g = graphistry.bind()
+    g._bolt_driver = driver
+    g2 = g.cypher_many(['q1', ('q2', {'p': 1})])
+    assert sorted(driver.runs) == [('q1', {}), ('q2', {'p': 1})]
+    assert g2._source == start_node_id_key and g2._destination == end_node_id_key and g2._node == node_id_key
+    assert sorted(g2._edges[relationship_id_key].tolist()) == [10, 11, 12]
+    assert sorted(g2._nodes[node_id_key].tolist()) == [1, 2, 3, 4]
+    assert g2._nodes.set_index(node_id_key).loc[3, 'x'] == 3
+
+def test_union_bolt_dataframes_prefers_full_nodes():
+    placeholder = pd.DataFrame({node_id_key: [1], node_type_key: ['']})
+    full = pd.DataFrame({node_id_key: [2, 1], node_type_key: ['B', 'A'], 'x': [None, 5]})
+    edges = pd.DataFrame({relationship_id_key: [10], start_node_id_key: [1], end_node_id_key: [2]})
+    (edges2, nodes2) = union_bolt_dataframes([edges, edges], [placeholder, full])
+    assert len(edges2) == 1
+    assert nodes2.set_index(node_id_key).loc[1, node_type_key] == 'A'
+    assert nodes2.set_index(node_id_key).loc[1, 'x'] == 5
+    assert len(nodes2) == 2
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def cached_cypher(driver, query, params, cache):
+    g = graphistry.bind()
+    g._bolt_driver = driver
+    return g.cypher(query, params, cache=cache)
+
+def test_cypher_cache_memory():
+    timer = FakeTimer()
+    cache = CypherCache(ttl=60, timer=timer)
+    driver = FakeQueryDriver({'q1': [(1, 10, 2, {'w': 1})]}, {1: (['A'], {'x': 1})})
+    g1 = cached_cypher(driver, 'q1', {'a': 1, 'b': [1, 2]}, cache)
+    g2 = cached_cypher(driver, 'q1', {'b': [1, 2], 'a': 1}, cache)
+    assert len(driver.runs) == 1
+    assert isinstance(g1._edges, pd.DataFrame) and isinstance(g2._nodes, pd.DataFrame)
+    pd.testing.assert_frame_equal(g1._edges, g2._edges)
+    pd.testing.assert_frame_equal(g1._nodes, g2._nodes)
+    assert g2._source == start_node_id_key
+    cached_cypher(driver, 'q1', {'a': 2, 'b': [1, 2]}, cache)
+    assert len(driver.runs) == 2
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'size': 2, 'maxsize': 32}
+    timer.now += 61
+    cached_cypher(driver, 'q1', {'a': 1, 'b': [1, 2]}, cache)
+    assert len(driver.runs) == 3
+
+def test_cypher_cache_per_driver():
+    cache = CypherCache()
+    results = {'q1': [(1, 10, 2, {})]}
+    driver1 = FakeQueryDriver(results, {})
+    driver2 = FakeQueryDriver(results, {})
+    driver1.address = 'db1:7687'
+    driver2.address = 'db2:7687'
+    cached_cypher(driver1, 'q1', {}, cache)
+    cached_cypher(driver2, 'q1', {}, cache)
+    assert len(driver1.runs) == 1 and len(driver2.runs) == 1
+    assert cache.stats()['misses'] == 2
+
+    # Same database, different users
+    driver2.address = 'db1:7687'
+    driver2._graphistry_user = 'other'
+    cached_cypher(driver2, 'q1', {}, cache)
+    assert len(driver2.runs) == 2
+
+def test_cypher_cache_unknown_driver():
+    cache = CypherCache()
+    driver = FakeQueryDriver({'q1': [(1, 10, 2, {})]}, {}, address=None)
+    assert bolt_driver_key(driver) is None and CypherCache.key(driver, 'q1') is None
+    with pytest.warns(RuntimeWarning):
+        cached_cypher(driver, 'q1', {}, cache)
+    with pytest.warns(RuntimeWarning):
+        cached_cypher(driver, 'q1', {}, cache)
+    assert len(driver.runs) == 2 and cache.stats()['size'] == 0
+
+def test_cypher_cache_paged_arrow():
+    cache = CypherCache()
+    driver = FakePagedDriver([(1, 10, 2, {'w': 1})], {1: (['A'], {'x': 1})})
+    driver.address = 'localhost:7687'
+    g = graphistry.bind()
+    g._bolt_driver = driver
+    g1 = g.cypher('MATCH (a)-[r]->(b) RETURN r ORDER BY id(r)', page_size=5, cache=cache)
+    g2 = g.cypher('MATCH (a)-[r]->(b) RETURN r ORDER BY id(r)', page_size=5, cache=cache)
+    assert cache.stats()['hits'] == 1
+    assert isinstance(g1._edges, pa.Table) and g2._edges.equals(g1._edges)
+
+def test_to_bolt_driver_key():
+    with mock.patch('neo4j.GraphDatabase.driver') as make_driver:
+        make_driver.return_value = mock.MagicMock(spec=neo4j.Driver)
+        driver = to_bolt_driver({'uri': 'bolt://db:7687', 'auth': ('alice', 'pw')})
+    assert bolt_driver_key(driver) == 'alice@bolt://db:7687'
+
+def test_cypher_cache_disk_threads(tmp_path):
+    cache = CypherCache(maxsize=4, path=str(tmp_path))
+    tables = (pa.table({'a': list(range(1000))}), pa.table({'b': [1]}))
+    def work(i):
+        for j in range(20):
+            cache.put(('k', str((i + j) % 6), '{}'), tables)
+            got = cache.get(('k', str((i * j) % 6), '{}'))
+            assert got is None or got[0].equals(tables[0])
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 80 and stats['size'] <= 4
+
+def test_cypher_cache_disk(tmp_path):
+    timer = FakeTimer()
+    path = str(tmp_path / 'cache')
+    cache = CypherCache(ttl=60, maxsize=2, path=path, timer=timer)
+    driver = FakeQueryDriver({q: [(1, 10, 2, {'w': 1})] for q in ['q1', 'q2', 'q3']}, {1: (['A'], {'x': 1})})
+    g1 = cached_cypher(driver, 'q1', {}, cache)
+
+    # Fresh instance over same directory, as after a restart
+    cache2 = CypherCache(ttl=60, maxsize=2, path=path, timer=timer)
+    g2 = cached_cypher(driver, 'q1', {}, cache2)
+    assert len(driver.runs) == 1
+    assert g2._edges.equals(g1._edges) and g2._nodes.equals(g1._nodes)
+    assert cache2.stats() == {'hits': 1, 'misses': 0, 'size': 1, 'maxsize': 2}
+
+    timer.now += 61
+    cached_cypher(driver, 'q1', {}, cache2)
+    assert len(driver.runs) == 2
+
+    # q1 least recently used, so evicted once q2 and q3 arrive
+    [q1_file] = [f for f in os.listdir(path) if f.endswith('.edges.feather')]
+    os.utime(os.path.join(path, q1_file), (0, 0))
+    cached_cypher(driver, 'q2', {}, cache2)
+    cached_cypher(driver, 'q3', {}, cache2)
+    assert cache2.stats()['size'] == 2
+    assert not os.path.exists(os.path.join(path, q1_file))
+    cached_cypher(driver, 'q3', {}, cache2)
+    assert len(driver.runs) == 4
+    cache2.clear()
+    assert cache2.stats() == {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2}
+
+def test_lru_cache_ttl():
+    timer = FakeTimer()
+    cache = graphistry.util.LRUCache(maxsize=2, ttl=10, timer=timer)
+    cache.put('a', 1)
+    timer.now += 5
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    timer.now += 6
+    assert cache.get('a') is None and not ('a' in cache)
+    assert cache.get('b') == 2
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 1, 'maxsize': 2}
+
 @pytest.mark.skipif(not ('WITH_NEO4J' in os.environ) or os.environ['WITH_NEO4J'] != '1', reason='No WITH_NEO4J=1')
 class Test_Neo4jConnector:
 
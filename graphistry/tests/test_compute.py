@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import networkx as nx, numpy as np, pandas as pd, pyarrow as pa, unittest
+
+import graphistry
+from graphistry import compute
+
+
+edges = pd.DataFrame({
+    'src': ['a', 'b', 'c', 'c', 'e', 'e', 'x'],
+    'dst': ['b', 'c', 'a', 'a', 'f', 'e', None]})
+nodes = pd.DataFrame({'id': ['z', 'a', 'b', 'c', 'e', 'f', 'a', None], 'degree': [-1] * 8})
+
+
+class TestCompute(unittest.TestCase):
+
+    def test_node_codes(self):
+        (codes, s, d, ids) = compute.node_codes(edges, 'src', 'dst', nodes, 'id')
+        assert list(ids) == ['z', 'a', 'b', 'c', 'e', 'f', 'x']
+        assert codes.tolist() == [0, 1, 2, 3, 4, 5, 1, -1]
+        assert s.tolist() == [1, 2, 3, 3, 4, 4] and d.tolist() == [2, 3, 1, 1, 5, 4]
+        (codes, s, d, ids) = compute.node_codes(edges, 'src', 'dst')
+        assert codes is None and list(ids) == ['a', 'b', 'c', 'e', 'x', 'f']
+        (codes, s, d, ids) = compute.node_codes(edges[:0], 'src', 'dst', nodes, 'id')
+        assert codes.tolist() == [0, 1, 2, 3, 4, 5, 1, -1] and len(s) == len(d) == 0
+
+    def test_components_match_networkx(self):
+        rng = np.random.default_rng(0)
+        for (m, n) in [(50, 100), (300, 100), (0, 5)]:
+            (s, d) = (rng.integers(0, n, m), rng.integers(0, n, m))
+            labels = compute.components(s, d, n)
+            g = nx.Graph()
+            g.add_nodes_from(range(n))
+            g.add_edges_from(zip(s, d))
+            expected = sorted(nx.connected_components(g), key=len, reverse=True)
+            assert labels.max() + 1 == len(expected)
+            for c in expected:
+                assert len(set(labels[list(c)])) == 1
+            assert np.bincount(labels).tolist() == [len(c) for c in expected]
+
+    def test_components_chain(self):
+        order = np.random.default_rng(1).permutation(10000)
+        labels = compute.components(order[:-1], order[1:], 10000)
+        assert (labels == 0).all()
+
+
+class TestPlotterCompute(unittest.TestCase):
+
+    def test_degrees(self):
+        g = graphistry.edges(edges, 'src', 'dst').nodes(nodes, 'id').compute_degrees()
+        assert g._nodes['id'].tolist()[:7] == nodes['id'].tolist()[:7]
+        assert g._nodes['degree_in'].tolist() == [0, 2, 1, 1, 1, 1, 2, 0]
+        assert g._nodes['degree_out'].tolist() == [0, 1, 1, 2, 2, 0, 1, 0]
+        assert g._nodes['degree'].tolist() == [0, 3, 2, 3, 3, 1, 3, 0]
+        assert nodes['degree'].tolist() == [-1] * 8
+
+        nxg = nx.from_pandas_edgelist(edges.dropna(), 'src', 'dst', create_using=nx.MultiDiGraph)
+        for (n, d) in nxg.degree():
+            assert g._nodes.set_index('id').loc[n, 'degree'].max() == d
+
+    def test_empty_edges(self):
+        g = graphistry.edges(edges[:0], 'src', 'dst').nodes(nodes, 'id').compute_degrees().compute_components()
+        assert g._nodes['degree'].tolist() == [0] * 8
+        assert g._nodes['component'].tolist() == [0, 1, 2, 3, 4, 5, 1, -1]
+        assert len(graphistry.edges(edges[:0], 'src', 'dst').compute_degrees()._nodes) == 0
+
+    def test_components_create_nodes(self):
+        for table in [edges, pa.Table.from_pandas(edges, preserve_index=False)]:
+            g = graphistry.edges(table, 'src', 'dst').compute_components()
+            assert type(g._nodes) == type(table) and g._node == graphistry.plotter.Plotter._defaultNodeId
+            out = g._nodes.to_pandas() if isinstance(table, pa.Table) else g._nodes
+            assert dict(zip(out[g._node], out['component'])) == {'a': 0, 'b': 0, 'c': 0, 'e': 1, 'f': 1, 'x': 2}
+
+    def test_arrow_nodes(self):
+        g = graphistry.edges(edges, 'src', 'dst')\
+            .nodes(pa.Table.from_pandas(nodes, preserve_index=False), 'id')\
+            .compute_degrees().compute_components('cc')
+        assert g._nodes.column_names == ['id', 'degree', 'degree_in', 'degree_out', 'cc']
+        assert g._nodes['degree'].to_pylist() == [0, 3, 2, 3, 3, 1, 3, 0]
+        assert g._nodes['cc'].to_pylist() == [2, 0, 0, 0, 1, 1, 0, -1]
+
+    def test_lazy_and_errors(self):
+        es = graphistry.LazyTable(lambda columns: edges[columns] if columns else edges)
+        g = graphistry.edges(es, 'src', 'dst').compute_degrees()
+        assert isinstance(g._edges, pd.DataFrame) and len(g._nodes) == 6
+        with self.assertRaises(ValueError):
+            graphistry.bind().compute_degrees()
+        with self.assertRaises(ValueError):
+            graphistry.bind().edges(edges).compute_components()
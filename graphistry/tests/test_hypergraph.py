@@ -264,3 +264,59 @@ class TestHypergraphPlain(NoAuthTestCase):
         edges_err = pa.Table.from_pandas(hg['graph']._edges)
         assert len(hg['graph']._edges) == 9
         assert len(edges_err) == 9
+
+
+def assertSpilledEqual(df, arr):
+    """ Assert that a spilled Arrow table has the same rows as a dataframe, ignoring row and column order"""
+
+    def norm(frame):
+        out = frame.astype(str).replace({'None': 'nan', 'NaT': 'nan'})
+        return out.sort_values(sorted(out.columns)).reset_index(drop=True)
+    assertFrameEqual(norm(df), norm(arr.to_pandas()))
+
+
+class TestHypergraphSpill(NoAuthTestCase):
+
+    def check(self, df, **kwargs):
+        spill = graphistry.Spill(100)
+        h1 = graphistry.hypergraph(df, verbose=False, **kwargs)
+        h2 = graphistry.hypergraph(df, verbose=False, spill=spill, **kwargs)
+        assert spill.files > 3
+        for k in ['entities', 'events', 'edges', 'nodes']:
+            assert isinstance(h2[k], pa.Table)
+            if len(h1[k]) > 0:
+                assertSpilledEqual(h1[k], h2[k])
+        assert h2['graph']._edges is h2['edges'] and h2['graph']._nodes is h2['nodes']
+        return h2
+
+    def test_hyperedges(self):
+        self.check(triangleNodes)
+        self.check(hyper_df, opts={'CATEGORIES': {'n': ['aa', 'bb', 'cc']}})
+
+    def test_hyperedges_direct(self):
+        h = self.check(hyper_df, direct=True)
+        assert len(h['events']) == 0
+
+    def test_drop_na(self):
+        df = pd.DataFrame({'a': ['a', None, 'c'], 'i': [1, 2, None]})
+        self.check(df)
+        self.check(df, drop_na=False)
+        self.check(df, drop_edge_attrs=True)
+
+    def test_hyper_evil(self):
+        self.check(squareEvil)
+
+    def test_empty_schema(self):
+        df = pd.DataFrame({'a': [None, None], 'i': [1.0, None]})
+        for events in [df, df.iloc[:0]]:
+            h = graphistry.hypergraph(events, ['a'], verbose=False, spill=graphistry.Spill(100))
+            assert len(h['edges']) == 0 and len(h['entities']) == 0
+            assert sorted(h['edges'].column_names) == ['EventID', 'a', 'attribID', 'edgeType', 'i']
+            assert h['edges'].schema.field('attribID').type == pa.string()
+            assert h['edges'].schema.field('i').type == pa.float64()
+            assert sorted(h['entities'].column_names) == ['a', 'category', 'nodeID', 'nodeTitle', 'type']
+            assert set(h['events'].column_names) == set(h['nodes'].column_names) == {
+                'a', 'i', 'EventID', 'type', 'category', 'nodeID', 'nodeTitle'}
+            assert len(h['nodes']) == len(events)
+        h = graphistry.hypergraph(df, ['a'], verbose=False, direct=True, spill=graphistry.Spill(100))
+        assert sorted(h['edges'].column_names) == ['EventID', 'a', 'dst', 'edgeType', 'i', 'src']
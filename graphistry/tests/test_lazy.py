@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import graphistry, os, pandas as pd, pyarrow as pa, pyarrow.csv, pyarrow.feather, pyarrow.parquet, tempfile, unittest
+
+from common import NoAuthTestCase
+from graphistry import LazyTable
+from graphistry.lazy import file_format, read_file
+
+
+wide = pd.DataFrame({
+    'src': ['a', 'b', 'c'],
+    'dst': ['b', 'c', 'a'],
+    **{'c%s' % i: [i, i, i] for i in range(20)}
+})
+
+
+class RecordingLoader(object):
+
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+
+    def __call__(self, columns):
+        self.calls.append(columns)
+        return self.df if columns is None else self.df[columns]
+
+
+class TestLazyTable(unittest.TestCase):
+
+    def test_materialize_all(self):
+        loader = RecordingLoader(wide)
+        assert LazyTable(loader).materialize().shape == wide.shape
+        assert loader.calls == [None]
+
+    def test_materialize_pruned(self):
+        loader = RecordingLoader(wide)
+        out = LazyTable(loader).select(['c3']).materialize(['src', 'dst'])
+        assert out.columns.tolist() == ['src', 'dst', 'c3']
+        assert loader.calls == [['src', 'dst', 'c3']]
+
+    def test_pipe_requires(self):
+        loader = RecordingLoader(wide)
+        lazy = LazyTable(loader).pipe(lambda df: df.assign(s=df['c1'] + df['c2']), requires=['c1', 'c2'], provides=['s'])
+        out = lazy.materialize(['src', 'dst', 's'])
+        assert out.columns.tolist() == ['src', 'dst', 's']
+        assert out['s'].tolist() == [3, 3, 3]
+        assert loader.calls == [['src', 'dst', 'c1', 'c2']]
+
+    def test_pipe_unknown_requires_loads_all(self):
+        loader = RecordingLoader(wide)
+        out = LazyTable(loader).pipe(lambda df: df[df['c0'] == 0]).materialize(['src', 'dst'])
+        assert out.columns.tolist() == ['src', 'dst']
+        assert loader.calls == [None]
+
+    def test_arrow(self):
+        out = LazyTable(lambda columns: pa.Table.from_pandas(wide, preserve_index=False)).materialize(['src', 'dst'])
+        assert out.column_names == ['src', 'dst']
+
+    def test_immutable(self):
+        lazy = LazyTable(RecordingLoader(wide))
+        lazy.select(['c1']).pipe(lambda df: df)
+        assert lazy._columns is None
+        assert lazy._transforms == []
+
+
+class TestLazyPlotter(NoAuthTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        graphistry.pygraphistry.PyGraphistry._is_authenticated = True
+        graphistry.pygraphistry.PyGraphistry.store_token_creds_in_memory(True)
+        graphistry.pygraphistry.PyGraphistry.relogin = lambda: True
+        graphistry.register(api=3)
+
+    def test_deferred_until_plot(self):
+        loader = RecordingLoader(wide)
+        g = graphistry.edges(LazyTable(loader), 'src', 'dst').bind(edge_title='c1').encode_edge_color('c2', ['red'], as_categorical=True)
+        assert loader.calls == []
+        ds = g.plot(skip_upload=True)
+        assert loader.calls == [['src', 'dst', 'c1', 'c2']]
+        assert ds.edges.column_names == ['src', 'dst', 'c1', 'c2']
+
+    def test_lazy_nodes(self):
+        nodes = pd.DataFrame({'id': ['a', 'b', 'c'], 'x': [1, 2, 3], 'y': [4, 5, 6]})
+        g = graphistry.edges(wide, 'src', 'dst').nodes(LazyTable(RecordingLoader(nodes)), 'id').bind(point_title='x')
+        ds = g.plot(skip_upload=True)
+        assert ds.nodes.column_names == ['id', 'x']
+        assert len(ds.edges.column_names) == len(wide.columns)
+
+    def test_edges_from_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            pa.parquet.write_table(pa.Table.from_pandas(wide, preserve_index=False), os.path.join(d, 'edges.parquet'))
+            pa.feather.write_feather(pd.DataFrame({'id': ['a', 'b', 'c'], 'x': [1, 2, 3], 'y': [4, 5, 6]}), os.path.join(d, 'nodes.feather'))
+            g = (graphistry
+                .edges_from_file(os.path.join(d, 'edges.parquet'), 'src', 'dst')
+                .nodes_from_file(os.path.join(d, 'nodes.feather'), 'id')
+                .bind(edge_title='c1', point_title='x'))
+            ds = g.plot(skip_upload=True)
+            assert ds.edges.column_names == ['src', 'dst', 'c1']
+            assert ds.edges.column('c1').to_pylist() == [1, 1, 1]
+            assert ds.nodes.column_names == ['id', 'x']
+
+
+class TestReadFile(unittest.TestCase):
+
+    def test_formats(self):
+        table = pa.Table.from_pandas(wide, preserve_index=False)
+        with tempfile.TemporaryDirectory() as d:
+            pa.parquet.write_table(table, os.path.join(d, 'e.parquet'))
+            pa.feather.write_feather(table, os.path.join(d, 'e.feather'), compression='uncompressed')
+            pa.csv.write_csv(table, os.path.join(d, 'e.csv'))
+            for name in ['e.parquet', 'e.feather', 'e.csv']:
+                out = read_file(os.path.join(d, name), columns=['src', 'c3', 'missing'])
+                assert out.column_names == ['src', 'c3']
+                assert out.to_pandas().equals(wide[['src', 'c3']])
+            assert read_file(os.path.join(d, 'e.feather')).num_columns == len(wide.columns)
+
+    def test_directory(self):
+        table = pa.Table.from_pandas(wide, preserve_index=False)
+        with tempfile.TemporaryDirectory() as d:
+            pa.parquet.write_table(table, os.path.join(d, 'part-0.parquet'))
+            pa.parquet.write_table(table, os.path.join(d, 'part-1.parquet'))
+            assert file_format(d) == 'parquet'
+            assert read_file(d, columns=['dst']).num_rows == 2 * len(wide)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            file_format('edges.txt')
+        assert file_format('edges.txt', 'feather') == 'ipc'
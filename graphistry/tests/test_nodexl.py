@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
-import unittest
+import datetime, mock, numpy, os, shutil, tempfile, unittest
 import pandas as pd
 import graphistry
+from graphistry.nodexlistry import NodeXLGraphistry, NodeXLGraphistryBase, read_cached_sheet, write_cached_sheet
 from common import NoAuthTestCase
 
 class TestNodexlBindings(NoAuthTestCase):
@@ -34,3 +35,102 @@ class TestNodexlBindings(NoAuthTestCase):
         assert g._nodes['Color2'].dtype.name == 'int32'
         assert g._edges['ColorInt'].dtype.name == 'int32'
         assert g._edge_title == 'Relationship'
+
+    def test_from_xls_bound_columns(self):
+        xls = 'graphistry/tests/data/NodeXLWorkbook-220237-twitter.xlsx'
+        g_all = graphistry.nodexl(xls, 'twitter')
+        g = graphistry.nodexl(xls, 'twitter', columns='bound')
+        assert len(g._edges.columns) < len(g_all._edges.columns)
+        assert len(g._nodes.columns) < len(g_all._nodes.columns)
+        for col in g._nodes.columns:
+            assert g._nodes[col].equals(g_all._nodes[col])
+        for col in ['Vertex 1', 'Vertex 2', 'ColorInt', 'Relationship']:
+            assert g._edges[col].equals(g_all._edges[col])
+
+    def test_from_xls_parallel(self):
+        xls = 'graphistry/tests/data/NodeXLWorkbook-220237-twitter.xlsx'
+        g = graphistry.nodexl(xls, 'twitter', parallel=True)
+        g2 = graphistry.nodexl(xls, 'twitter', parallel=False)
+        pd.testing.assert_frame_equal(g._edges, g2._edges)
+        pd.testing.assert_frame_equal(g._nodes, g2._nodes)
+
+    def test_from_xls_cache_dir(self):
+        xls = 'graphistry/tests/data/NodeXLWorkbook-220237-twitter.xlsx'
+        with tempfile.TemporaryDirectory() as cache_dir:
+            g = graphistry.nodexl(xls, columns='bound', cache_dir=cache_dir)
+            self.assertEqual(len([f for f in os.listdir(cache_dir) if f.endswith('.feather')]), 2)
+            with mock.patch('graphistry.nodexlistry.read_nodexl_sheet') as read_sheet:
+                with mock.patch('graphistry.nodexlistry.file_content_key') as content_key:
+                    g2 = graphistry.nodexl(xls, columns='bound', cache_dir=cache_dir)
+                    content_key.assert_not_called()
+                read_sheet.assert_not_called()
+
+            # A touched copy is rehashed, and matches the cached content
+            copy = os.path.join(cache_dir, 'copy.xlsx')
+            shutil.copyfile(xls, copy)
+            with mock.patch('graphistry.nodexlistry.read_nodexl_sheet') as read_sheet:
+                g3 = graphistry.nodexl(copy, columns='bound', cache_dir=cache_dir)
+                read_sheet.assert_not_called()
+            pd.testing.assert_frame_equal(g2._edges, g3._edges)
+        pd.testing.assert_frame_equal(g._edges, g2._edges)
+        pd.testing.assert_frame_equal(g._nodes, g2._nodes)
+
+    def test_cached_sheets_match_cold_reads(self):
+        xls = 'graphistry/tests/data/NodeXLWorkbook-220237-twitter.xlsx'
+        base = NodeXLGraphistryBase()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = base.read_sheets(xls, cache_dir=cache_dir)
+            with mock.patch('graphistry.nodexlistry.read_nodexl_sheet') as read_sheet:
+                warm = base.read_sheets(xls, cache_dir=cache_dir)
+                read_sheet.assert_not_called()
+        for (a, b) in zip(cold, warm):
+            pd.testing.assert_frame_equal(a, b)
+            for col in a.columns:
+                assert [type(v) for v in a[col].values] == [type(v) for v in b[col].values]
+
+    def test_cached_sheet_mixed_cells(self):
+        df = pd.DataFrame({
+            'id': ['007', 5, 2.5, numpy.nan, True, datetime.datetime(2020, 1, 2, 3, 4), pd.Timestamp('2021-01-01')],
+            'n': [1, numpy.nan, 3, 4, 5, 6, 7]}, dtype=object)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, 'sheet.feather')
+            write_cached_sheet(df, path)
+            out = read_cached_sheet(path)
+            with self.assertLogs('graphistry.nodexlistry', level='DEBUG'):
+                write_cached_sheet(pd.DataFrame({'x': [{'a': 1}, 'b']}), os.path.join(cache_dir, 'skipped.feather'))
+            assert not os.path.exists(os.path.join(cache_dir, 'skipped.feather'))
+        pd.testing.assert_frame_equal(out, df)
+        assert [type(v) for v in out['id'].values] == [type(v) for v in df['id'].values]
+        assert [type(v) for v in out['n'].values] == [int, float, int, int, int, int, int]
+
+    def test_from_xls_lazy_html(self):
+        xls = 'graphistry/tests/data/NodeXLWorkbook-220237-twitter.xlsx'
+        g = graphistry.nodexl(xls, 'twitter')
+        g2 = graphistry.nodexl(xls, 'twitter', lazy_html=True)
+        assert g._nodes['Image File'].str.startswith('<a href=').any()
+        assert not g2._nodes['Image File'].astype(str).str.startswith('<a href=').any()
+        html_columns = NodeXLGraphistry.twitter_img_columns + NodeXLGraphistry.twitter_link_columns
+        pd.testing.assert_frame_equal(g._nodes.drop(columns=html_columns), g2._nodes.drop(columns=html_columns))
+
+
+class TestNodexlHtml(unittest.TestCase):
+
+    def test_link_urls(self):
+        s = pd.Series(['a.com 2 b.org', 'a.com 2 b.org', 'x  y', numpy.nan], index=[3, 4, 5, 6])
+        out = NodeXLGraphistryBase.link_urls(s)
+        assert out.index.tolist() == [3, 4, 5, 6]
+        assert out.tolist() == [
+            '<a href="a.com" target="_blank">a.com</a> <a href="2" target="_blank">2</a> <a href="b.org" target="_blank">b.org</a>',
+            '<a href="a.com" target="_blank">a.com</a> <a href="2" target="_blank">2</a> <a href="b.org" target="_blank">b.org</a>',
+            '<a href="x" target="_blank">x</a> <a href="" target="_blank"></a> <a href="y" target="_blank">y</a>',
+            '<a href="nan" target="_blank">nan</a>'
+        ]
+
+    def test_embed_img(self):
+        s = pd.Series(['http://a/b.png', '', numpy.nan, 'http://a/b.png'])
+        assert NodeXLGraphistryBase.embed_img(s).tolist() == [
+            '<a href="http://a/b.png" target="_blank"><img src="http://a/b.png"/></a>',
+            '',
+            '',
+            '<a href="http://a/b.png" target="_blank"><img src="http://a/b.png"/></a>'
+        ]
@@ -311,6 +311,31 @@ class TestPlotterConversions(NoAuthTestCase):
         assertFrameEqual(e, triangleEdges[['src', 'dst']])
         assertFrameEqual(n, triangleNodes[['id']])
 
+    @pytest.mark.xfail(raises=ModuleNotFoundError)
+    def test_pandas2igraph_attributes(self):
+        edges = pd.DataFrame({'src': ['c', 'a', 'c'], 'dst': ['a', 'b', 'b'], 'w': [0.5, 1.5, 2.5], 'kind': ['x', 'y', 'z']})
+        plotter = graphistry.bind(source='src', destination='dst', node='id')
+        ig = plotter.pandas2igraph(edges)
+        self.assertEqual(ig.vs['id'], ['c', 'a', 'b'])
+        self.assertEqual(ig.get_edgelist(), [(0, 1), (1, 2), (0, 2)])
+        self.assertEqual(ig.es['w'], [0.5, 1.5, 2.5])
+        (e, n) = plotter.igraph2pandas(ig)
+        assertFrameEqual(e, edges)
+        assertFrameEqual(n, pd.DataFrame({'id': ['c', 'a', 'b']}))
+
+    @pytest.mark.xfail(raises=ModuleNotFoundError)
+    def test_pandas2igraph_extension_dtypes(self):
+        plotter = graphistry.bind(source='src', destination='dst', node='id')
+        for dtype in ['category', 'string']:
+            edges = pd.DataFrame({'src': ['c', 'a', 'c'], 'dst': ['a', 'b', None]}, dtype=dtype)
+            ig = plotter.pandas2igraph(edges)
+            self.assertEqual(ig.vs['id'][:3], ['c', 'a', 'b'])
+            self.assertEqual(ig.get_edgelist(), [(0, 1), (1, 2), (0, 3)])
+        edges = pd.DataFrame({'src': pd.array([3, 1, 3], dtype='Int64'), 'dst': pd.array([1, 2, 2], dtype='Int64')})
+        ig = plotter.pandas2igraph(edges)
+        self.assertEqual(ig.vs['id'], [3, 1, 2])
+        self.assertEqual(ig.get_edgelist(), [(0, 1), (1, 2), (0, 2)])
+
     @pytest.mark.xfail(raises=ModuleNotFoundError)
     def test_networkx2igraph(self):
         import networkx as nx
@@ -337,6 +362,135 @@ class TestPlotterConversions(NoAuthTestCase):
         assertFrameEqual(e, edges)
         assertFrameEqual(n, nodes)
 
+    def test_networkx2pandas_mixed_attributes(self):
+        import networkx as nx
+        ng = nx.MultiGraph()
+        ng.add_node('a', size=2)
+        ng.add_node('b', label='B')
+        ng.add_edge('a', 'b', w=0.5)
+        ng.add_edge('a', 'b', kind='x', pos=(1, 2))
+        ng.add_edge('b', 'b', src='override')
+        (e, n) = graphistry.bind(source='src', destination='dst', node='id').networkx2pandas(ng)
+
+        assert e.columns.tolist() == ['src', 'dst', 'w', 'kind', 'pos']
+        assert e['src'].tolist() == ['a', 'a', 'override']
+        assert e['dst'].tolist() == ['b', 'b', 'b']
+        assert e['w'].dtype.name == 'float64'
+        assert e['kind'].tolist()[1] == 'x' and e['kind'].isna().tolist() == [True, False, True]
+        assert e['pos'].tolist()[1] == (1, 2)
+        assert n.columns.tolist() == ['id', 'size', 'label']
+        assert n['size'].tolist()[0] == 2 and n['size'].isna().tolist() == [False, True]
+
+    def test_pandas2networkx(self):
+        import networkx as nx
+        edges = pd.DataFrame({'src': [0, 1, 1], 'dst': [1, 2, 2], 'w': [1.0, None, 3.0], 'kind': ['x', 'y', 'z']})
+        nodes = pd.DataFrame({'id': [0, 1, 2, 3], 'label': ['a', 'b', None, 'd']})
+        g = graphistry.bind(source='src', destination='dst', node='id')
+
+        ng = g.pandas2networkx(edges, nodes)
+        assert isinstance(ng, nx.DiGraph) and not ng.is_multigraph()
+        assert dict(ng.nodes(data=True)) == {0: {'label': 'a'}, 1: {'label': 'b'}, 2: {}, 3: {'label': 'd'}}
+        assert ng.number_of_edges() == 2
+        assert ng.edges[1, 2] == {'kind': 'z', 'w': 3.0}
+
+        mg = g.pandas2networkx(edges, directed=False, multigraph=True)
+        assert isinstance(mg, nx.MultiGraph) and not mg.is_directed()
+        assert mg.number_of_edges() == 3
+        (e2, n2) = g.networkx2pandas(mg)
+        assertFrameEqual(e2, edges)
+
+
+class TestPlotterSanitize(NoAuthTestCase):
+
+    def test_sanitize_default(self):
+        edges = pd.DataFrame({'src': ['a', None, 'c'], 'dst': ['b', 'c', 'a'], 'n': ['1', '2', '3'], 's': ['x', '1', 'z']}, index=[5, 6, 7])
+        g = graphistry.bind(source='src', destination='dst')
+        (e, n) = g._sanitize_dataset(edges, None, 'id')
+        assert len(e) == 2
+        assert e.index.tolist() == [0, 1]
+        assert e['n'].dtype.name == 'int64'
+        assert e['s'].dtype.name == 'object'
+        assert sorted(n['id'].tolist()) == ['a', 'b', 'c']
+        assert edges['n'].dtype.name == 'object'
+        assert len(edges) == 3
+
+    def test_sanitize_late_non_numeric(self):
+        edges = pd.DataFrame({'src': list(range(300)), 'dst': list(range(300)), 'v': [str(x) for x in range(299)] + ['z']})
+        (e, n) = graphistry.bind(source='src', destination='dst')._sanitize_dataset(edges, None, 'id')
+        assert e['v'].dtype.name == 'object'
+
+    def test_sanitize_fast(self):
+        edges = pd.DataFrame({'src': ['a', None], 'dst': ['b', 'c'], 'n': ['1', '2']})
+        nodes = pd.DataFrame({'id': ['a', 'b', 'b', 'c'], 'm': ['1', '2', '2', '3']})
+        g = graphistry.bind(source='src', destination='dst', node='id')
+        (e, n) = g._sanitize_dataset(edges, nodes, 'id', 'fast')
+        assert len(e) == 1
+        assert e['n'].dtype.name == 'object'
+        assert len(n) == 3
+        assert n['m'].dtype.name == 'object'
+
+    def test_sanitize_off(self):
+        edges = pd.DataFrame({'src': ['a', 'b'], 'dst': ['b', 'c'], 'n': ['1', '2']})
+        g = graphistry.bind(source='src', destination='dst')
+        (e, n) = g._sanitize_dataset(edges, None, 'id', False)
+        assert e['n'].dtype.name == 'object'
+        assert sorted(n['id'].tolist()) == ['a', 'b', 'c']
+        e['added'] = 1
+        assert not ('added' in edges)
+
+    def test_sanitize_invalid(self):
+        edges = pd.DataFrame({'src': ['a'], 'dst': ['b']})
+        for sanitize in ['full', 'False', None]:
+            with self.assertRaises(ValueError):
+                graphistry.edges(edges, 'src', 'dst').plot(skip_upload=True, sanitize=sanitize)
+
+
+wideEdges = pd.DataFrame({'src': ['a', 'b'], 'dst': ['b', 'a'], 'w': [1, 2], 'c': [3, 4], 'x': [5, 6], 'y': [7, 8]})
+wideNodes = pd.DataFrame({'id': ['a', 'b'], 't': ['A', 'B'], 'z': [0, 1]})
+
+
+class TestPlotterColumns(NoAuthTestCase):
+
+    def plotter(self):
+        return graphistry\
+            .edges(wideEdges, 'src', 'dst').nodes(wideNodes, 'id')\
+            .bind(edge_weight='w', point_title='t')\
+            .encode_edge_color('c')
+
+    def test_api1(self):
+        graphistry.register(api=1)
+        ds = self.plotter().plot(skip_upload=True, columns='bound')
+        assert set(ds['graph'][0].keys()) == set(['src', 'dst', 'w', 'c', 'edgeWeight', 'edgeColor'])
+        assert set(ds['labels'][0].keys()) == set(['id', 't', 'pointTitle'])
+
+    def test_api2(self):
+        graphistry.register(api=2)
+        ds = self.plotter().plot(skip_upload=True, columns=['x'])
+        assert set(ds['attributes']['edges'].keys()) == set(['w', 'c', 'x'])
+        assert set(ds['attributes']['nodes'].keys()) == set(['id', 't'])
+
+    def test_api3(self):
+        graphistry.pygraphistry.PyGraphistry.store_token_creds_in_memory(True)
+        graphistry.pygraphistry.PyGraphistry.relogin = lambda: True
+        graphistry.register(api=3)
+        ds = self.plotter().plot(skip_upload=True, columns='bound')
+        assert ds.edges.column_names == ['src', 'dst', 'c', 'w']
+        assert ds.nodes.column_names == ['id', 't']
+        ds2 = self.plotter().plot(skip_upload=True, exclude_columns=['x', 'src', 'z'])
+        assert ds2.edges.column_names == ['src', 'dst', 'w', 'c', 'y']
+        assert ds2.nodes.column_names == ['id', 't']
+        ds3 = self.plotter().plot(skip_upload=True)
+        assert ds3.edges.column_names == wideEdges.columns.tolist()
+
+    def test_single_column_names(self):
+        graphistry.pygraphistry.PyGraphistry.store_token_creds_in_memory(True)
+        graphistry.pygraphistry.PyGraphistry.relogin = lambda: True
+        graphistry.register(api=3)
+        ds = self.plotter().plot(skip_upload=True, columns='x', exclude_columns='y')
+        assert ds.edges.column_names == ['src', 'dst', 'c', 'w', 'x']
+        ds2 = self.plotter().plot(skip_upload=True, exclude_columns='wcx')
+        assert ds2.edges.column_names == wideEdges.columns.tolist()
+
 
 class TestPlotterNameBindings(NoAuthTestCase):
 
@@ -401,6 +555,63 @@ class TestPlotterArrowConversions(NoAuthTestCase):
         ds = g.plot(skip_upload=True)
         assert isinstance(ds.edges, pa.Table)
 
+    def test_api3_sanitize_drops_nulls_and_makes_nodes(self):
+        e = pa.table({'s': ['a', None, 'b'], 'd': ['b', 'c', 'a'], 'v': [1, 2, 3]})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges.num_rows == 2
+        assert ds.edges['v'].to_pylist() == [1, 3]
+        assert sorted(ds.nodes[graphistry.plotter.Plotter._defaultNodeId].to_pylist()) == ['a', 'b']
+        assert ds.node_encodings['bindings']['node'] == graphistry.plotter.Plotter._defaultNodeId
+
+    def test_api3_sanitize_nodes(self):
+        e = pa.table({'s': [0, 1], 'd': [1, 0]})
+        n = pa.table({'n': [0, 1, 1, None], 'x': ['a', 'b', 'c', 'd']})
+        ds = graphistry.edges(e, 's', 'd').nodes(n, 'n').plot(skip_upload=True)
+        assert ds.nodes['n'].to_pylist() == [0, 1]
+        assert ds.nodes['x'].to_pylist() == ['a', 'b']
+
+    def test_api3_sanitize_mixed_id_types(self):
+        e = pa.table({'s': [0, 1], 'd': ['1', 'x']})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert sorted(ds.nodes[graphistry.plotter.Plotter._defaultNodeId].to_pylist()) == ['0', '1', 'x']
+        assert ds.edges['s'].to_pylist() == ['0', '1'] and ds.edges['d'].type == pa.string()
+
+    def test_api3_sanitize_common_id_type(self):
+        e = pa.table({'s': pa.array([0, 1], pa.int32()), 'd': pa.array([1, 2], pa.int64())})
+        n = pa.table({'n': pa.array([0.0, 1.0, 2.0]), 'x': ['a', 'b', 'c']})
+        ds = graphistry.edges(e, 's', 'd').nodes(n, 'n').plot(skip_upload=True)
+        assert ds.edges['s'].type == ds.edges['d'].type == ds.nodes['n'].type == pa.float64()
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges['s'].type == ds.nodes[graphistry.plotter.Plotter._defaultNodeId].type == pa.int64()
+
+    def test_api3_sanitize_wide_ids(self):
+        big = 2 ** 63 + 5
+        e = pa.table({'s': pa.array([big, 1], pa.uint64()), 'd': pa.array([1, 2], pa.int64())})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges['s'].to_pylist() == [str(big), '1'] and ds.edges['d'].type == pa.string()
+        e = pa.table({'s': pa.array([3, 1], pa.uint64()), 'd': pa.array([1, 2], pa.int64())})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges['s'].type == pa.int64() and ds.edges['s'].to_pylist() == [3, 1]
+        e = pa.table({'s': pa.array([big, 1], pa.uint64()), 'd': pa.array([1, 2], pa.uint8())})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges['s'].type == pa.uint64() and ds.edges['s'].to_pylist() == [big, 1]
+        e = pa.table({'s': pa.array([2 ** 60 + 1, 1], pa.int64()), 'd': pa.array([1.0, 2.0])})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True)
+        assert ds.edges['s'].to_pylist() == [str(2 ** 60 + 1), '1']
+
+    def test_api3_sanitize_off(self):
+        e = pa.table({'s': ['a', None], 'd': ['b', 'c']})
+        ds = graphistry.edges(e, 's', 'd').plot(skip_upload=True, sanitize=False)
+        assert ds.edges.num_rows == 2
+        assert ds.nodes is None
+
+    def test_api3_validate_bindings(self):
+        e = pa.table({'s': ['a'], 'd': ['b']})
+        with pytest.raises(ValueError):
+            graphistry.edges(e, 's', 'zz').plot(skip_upload=True)
+        with pytest.warns(RuntimeWarning):
+            graphistry.edges(e, 's', 'd').bind(edge_color='zz').plot(skip_upload=True)
+
 
 class TestPlotterStylesArrow(NoAuthTestCase):
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+import gzip, logging, mock, numpy, pandas as pd, pyarrow as pa, time, tracemalloc, unittest
+
+import graphistry
+from common import NoAuthTestCase
+from graphistry.profiling import PlotProfile, null_stage, profiled, rss_bytes, sizeof, stage
+
+
+edges = pd.DataFrame({'src': ['a', 'b', 'c'], 'dst': ['b', 'c', 'a'], 'w': [1.0, 2.0, 3.0]})
+
+
+class Fake_Response(object):
+    content = b'{"success": true}'
+    def __init__(self, body=None):
+        self.request = mock.Mock(body=body)
+    def raise_for_status(self):
+        pass
+    def json(self):
+        return {'success': True, 'dataset': 'fakedatasetname', 'viztoken': 'faketoken'}
+
+
+class TestPlotProfile(unittest.TestCase):
+
+    def test_inactive(self):
+        with stage('encode') as s:
+            assert s is null_stage
+            s.measure_in(b'abc')
+        assert profiled('encode')(lambda x: x + 1)(1) == 2
+
+    def test_nested_stages_exclusive(self):
+        with PlotProfile() as p:
+            with stage('encode') as s:
+                s.measure_in(b'a' * 10)
+                time.sleep(0.05)
+                with stage('compress') as c:
+                    time.sleep(0.1)
+                    c.measure_out(b'b' * 3)
+                s.measure_out(b'c' * 5)
+        report = p.report()
+        assert [r['stage'] for r in report['stages']] == ['encode', 'compress']
+        (encode, compress) = report['stages']
+        assert 0.04 < encode['wall_seconds'] < 0.09
+        assert compress['wall_seconds'] >= 0.09
+        assert (encode['bytes_in'], encode['bytes_out'], compress['bytes_in'], compress['bytes_out']) == (10, 5, None, 3)
+        assert report['totals']['encode']['calls'] == 1
+        assert report['wall_seconds'] >= encode['wall_seconds'] + compress['wall_seconds']
+        assert report['unattributed_seconds'] < 0.05
+
+    def test_streamed_http_body(self):
+        from graphistry.arrow_uploader import ArrowFileBody
+        from graphistry.progress import ProgressReader
+        body = ArrowFileBody(pa.table({'x': list(range(1000))}))
+        with PlotProfile() as p:
+            with stage('upload') as s:
+                s.measure_http(Fake_Response(ProgressReader(body, lambda progress: None)))
+            with stage('upload') as s:
+                s.measure_http(Fake_Response(body))
+        (first, second) = p.report()['stages']
+        assert first['bytes_in'] == second['bytes_in'] == len(body) > 0
+        assert first['bytes_out'] == len(Fake_Response.content)
+
+    def test_errors_recorded(self):
+        with PlotProfile() as p:
+            try:
+                with stage('upload'):
+                    raise IOError('boom')
+            except IOError:
+                pass
+        assert p.report()['stages'][0]['error'] == 'OSError'
+        assert p.report()['totals']['upload']['errors'] == 1
+
+    def test_decorator_measures_tables(self):
+        df = pd.DataFrame({'x': [1, 2, 3]})
+        with PlotProfile() as p:
+            profiled('sanitize')(lambda a, b: (a, b))(df, pa.Table.from_pandas(df, preserve_index=False))
+        r = p.report()['stages'][0]
+        assert r['bytes_in'] == r['bytes_out'] == sizeof(df) + 24
+        assert sizeof('not a buffer') is None
+
+    def test_memory(self):
+        with PlotProfile(memory=True) as p:
+            with stage('encode'):
+                x = bytearray(5 * 1000 * 1000)
+                del x
+        assert not tracemalloc.is_tracing()
+        assert p.report()['stages'][0]['peak_memory_bytes'] >= 5 * 1000 * 1000
+        assert p.report()['peak_memory_bytes'] >= 5 * 1000 * 1000
+
+    def test_native_memory(self):
+        with PlotProfile() as p:
+            with stage('encode'):
+                buf = pa.allocate_buffer(8 * 1000 * 1000)
+                # Above glibc's largest mmap threshold, so always fresh pages
+                arr = numpy.ones(40 * 1000 * 1000, dtype=numpy.uint8)
+            with stage('upload'):
+                del buf
+        (encode, upload) = p.report()['stages']
+        assert encode['arrow_delta_bytes'] >= 8 * 1000 * 1000
+        assert upload['arrow_delta_bytes'] <= -8 * 1000 * 1000
+        assert encode['rss_delta_bytes'] >= 40 * 1000 * 1000
+        assert p.report()['totals']['encode']['rss_delta_bytes'] == encode['rss_delta_bytes']
+        assert 'arrow' in p.summary()
+        assert rss_bytes() > 0 and len(arr) > 0
+
+    def test_nested_profiles(self):
+        with PlotProfile() as outer:
+            with stage('auth'):
+                pass
+            with PlotProfile() as inner:
+                with stage('upload'):
+                    pass
+        assert [r['stage'] for r in inner.report()['stages']] == ['upload']
+        assert [r['stage'] for r in outer.report()['stages']] == ['auth', 'upload']
+
+
+@mock.patch('requests.post', side_effect=lambda url, data=None, **kwargs: Fake_Response(data))
+class TestPlotProfilePlot(NoAuthTestCase):
+
+    def setUp(self):
+        graphistry.register(api=1)
+
+    def test_plot_callback(self, mock_post):
+        reports = []
+        graphistry.edges(edges, 'src', 'dst').plot(render=False, profile=reports.append)
+        assert len(reports) == 1
+        totals = reports[0]['totals']
+        assert set(totals.keys()) == set(['materialize', 'encode', 'sanitize', 'auth', 'compress', 'upload'])
+        sent = mock_post.call_args[0][1]
+        assert totals['upload']['bytes_in'] == totals['compress']['bytes_out'] == len(sent)
+        assert totals['compress']['bytes_in'] == len(gzip.decompress(sent))
+
+    def test_plot_log(self, mock_post):
+        with self.assertLogs('graphistry.profiling', level=logging.INFO) as logs:
+            graphistry.edges(edges, 'src', 'dst').plot(render=False, profile=True)
+        assert 'upload' in logs.output[0]
+        assert 'stages' in logs.records[0].graphistry_profile
+
+    def test_plot_unprofiled(self, mock_post):
+        with mock.patch('graphistry.plotter.PlotProfile') as mock_profile:
+            graphistry.edges(edges, 'src', 'dst').plot(render=False)
+        assert not mock_profile.called
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import io, mock, pandas as pd, pyarrow as pa, sys, unittest
+
+import graphistry
+from graphistry import ArrowUploader
+from graphistry.progress import ProgressReader, print_progress, tqdm_progress, upload_body
+
+
+class TestProgressReader(unittest.TestCase):
+
+    def test_reads_and_reports(self):
+        events = []
+        data = bytes(range(256)) * 100
+        reader = ProgressReader(data, events.append, 'edges', interval=0)
+        assert len(reader) == len(data)
+        chunks = []
+        while True:
+            chunk = reader.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b''.join(chunks) == data
+        sent = [e['bytes_sent'] for e in events]
+        assert sent == sorted(sent) and sent[0] == 0 and sent[-1] == len(data)
+        assert [e['done'] for e in events].count(True) == 1 and events[-1]['done']
+        assert events[-1]['name'] == 'edges' and events[-1]['total_bytes'] == len(data)
+        assert events[-1]['eta_seconds'] == 0
+
+    def test_throttled(self):
+        events = []
+        reader = ProgressReader(b'x' * 100000, events.append, interval=60)
+        while reader.read(10):
+            pass
+        assert [(e['bytes_sent'], e['done']) for e in events] == [(0, False), (100000, True)]
+
+    def test_seek_rewinds(self):
+        events = []
+        reader = ProgressReader(io.BytesIO(b'abcdef'), events.append)
+        assert reader.read() == b'abcdef'
+        assert reader.seek(0) == 0 and reader.tell() == 0
+        assert reader.read() == b'abcdef'
+        assert [e['done'] for e in events].count(True) == 2
+
+
+class TestUploadBody(unittest.TestCase):
+
+    def test_default_only_large(self):
+        small = b'x' * 100
+        assert upload_body(small, None, 'edges') is small
+        assert upload_body(small, False, 'edges') is small
+        assert isinstance(upload_body(small, True, 'edges'), ProgressReader)
+        assert isinstance(upload_body(b'x' * (6 * 1024 * 1024), None, 'edges'), ProgressReader)
+        assert upload_body(b'x' * (6 * 1024 * 1024), False, 'edges') == b'x' * (6 * 1024 * 1024)
+
+    def test_callback(self):
+        events = []
+        reader = upload_body(b'abc', events.append, 'nodes')
+        reader.read()
+        assert events[-1]['name'] == 'nodes' and events[-1]['done']
+
+    def test_print_progress(self):
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            reader = ProgressReader(b'x' * 4096, print_progress('Uploading edges'))
+            reader.read()
+        lines = out.getvalue().splitlines()
+        assert lines[0] == 'Uploading edges: 4 kB. This may take a while...'
+        assert lines[1].startswith('Uploading edges: 4 kB in ')
+
+    def test_tqdm_progress(self):
+        bar = mock.Mock()
+        tqdm = mock.Mock(tqdm=mock.Mock(return_value=bar))
+        with mock.patch.dict(sys.modules, {'tqdm': mock.Mock(auto=tqdm), 'tqdm.auto': tqdm}):
+            reader = ProgressReader(b'x' * 100, tqdm_progress('Uploading edges'), interval=0)
+            while reader.read(30):
+                pass
+        assert tqdm.tqdm.call_args[1]['total'] == 100
+        assert sum([c[0][0] for c in bar.update.call_args_list]) == 100
+        assert bar.close.called
+
+
+class TestArrowUploaderProgress(unittest.TestCase):
+
+    def test_post_streams_with_progress(self):
+        events = []
+        bodies = []
+
+        def post(url, data=None, **kwargs):
+            resp = mock.Mock()
+            if url.endswith('/api/v2/upload/datasets/'):
+                resp.json = mock.Mock(return_value={'success': True, 'data': {'dataset_id': 'ds'}})
+            else:
+                assert isinstance(data, ProgressReader)
+                bodies.append(data.read())
+                resp.json = mock.Mock(return_value={'success': True})
+            return resp
+
+        edges = pa.Table.from_pandas(pd.DataFrame({'s': [0, 1], 'd': [1, 0]}), preserve_index=False)
+        au = ArrowUploader(token='t', edges=edges, progress=events.append)
+        with mock.patch('requests.post', side_effect=post):
+            au.post()
+        assert bodies == [au.arrow_to_buffer(edges)]
+        assert events[-1]['name'] == 'edges' and events[-1]['done']
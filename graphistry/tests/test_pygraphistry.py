@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import mock, pandas as pd, pytest, unittest
+import mock, pandas as pd, pytest, subprocess, sys, unittest
 
 import graphistry
 from common import NoAuthTestCase
@@ -8,6 +8,22 @@ from graphistry import PyGraphistry
 
 #TODO mock requests for testing actual effectful code
 
+class TestPyGraphistry_Import(unittest.TestCase):
+    def test_import_defers_optional_modules(self):
+        probe = '; '.join([
+            'import sys, graphistry',
+            'from graphistry.pygraphistry import PyGraphistry',
+            'assert PyGraphistry._resolved_config is None and PyGraphistry._resolved_tag is None',
+            'print(sorted(m for m in ["neo4j", "igraph", "networkx", "google.protobuf", "graphistry.vgraph"] if m in sys.modules))'
+        ])
+        out = subprocess.check_output([sys.executable, '-c', probe], universal_newlines=True)
+        assert out.strip() == '[]'
+
+    def test_config_resolves_on_use(self):
+        assert PyGraphistry._config['hostname'] is not None
+        assert PyGraphistry._tag.endswith(graphistry.__version__)
+
+
 class TestPyGraphistry_Auth(unittest.TestCase):
     def test_defaults(self):
         assert PyGraphistry.store_token_creds_in_memory() == True
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np, pandas as pd, pyarrow as pa, unittest
+
+import graphistry
+from graphistry import sampling
+
+
+# Two triangles joined by an edge, a hub with 4 leaves, and an edge with a missing endpoint
+edges = pd.DataFrame({
+    'src': ['a', 'b', 'c', 'd', 'e', 'f', 'h', 'h', 'h', 'h', 'x'],
+    'dst': ['b', 'c', 'a', 'e', 'f', 'd', 'i', 'j', 'k', 'l', None],
+    'w': list(range(11)),
+    't': pd.date_range('2020-01-01', periods=11, freq='D')})
+edges.loc[11] = ['c', 'd', 11, pd.Timestamp('2020-01-12')]
+nodes = pd.DataFrame({'id': list('abcdefhijklxz'), 'v': range(13)})
+
+
+def pairs(table):
+    df = table.to_pandas() if isinstance(table, pa.Table) else table
+    return sorted(zip(df['src'], df['dst']))
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_adjacency(self):
+        (rows, s, d, count) = sampling.endpoints(edges, 'src', 'dst')
+        assert count == 12 and len(rows) == 11 and not (10 in rows)
+        (offsets, degrees, targets) = sampling.adjacency(s, d, count)
+        assert offsets[-1] == 22 and degrees.sum() == 22
+        for node in range(count):
+            expected = sorted(list(d[s == node]) + list(s[d == node]))
+            assert sorted(targets[offsets[node]:offsets[node + 1]]) == expected
+            assert sorted(sampling.neighbors(offsets, degrees, targets, np.array([node]))) == expected
+        assert len(sampling.neighbors(offsets, degrees, targets, np.array([0, 2, 0]))) == 2 * degrees[0] + degrees[2]
+
+    def test_uniform(self):
+        for table in [edges, pa.Table.from_pandas(edges, preserve_index=False)]:
+            out = sampling.uniform_edges(table, n=5, seed=1)
+            assert type(out) == type(table) and len(out) == 5
+            assert sampling.series(out, 'w').is_monotonic_increasing
+            assert pairs(out) == pairs(sampling.uniform_edges(table, n=5, seed=1))
+            assert len(sampling.uniform_edges(table, frac=0.5)) == 6
+            assert sampling.uniform_edges(table, n=100) is table
+        with self.assertRaises(ValueError):
+            sampling.uniform_edges(edges)
+
+    def test_time_window(self):
+        assert sampling.time_window(edges, 't', '2020-01-03', '2020-01-06')['w'].tolist() == [2, 3, 4]
+        assert sampling.time_window(edges, 't', last='2 days')['w'].tolist() == [9, 10, 11]
+        arrow = sampling.time_window(pa.Table.from_pandas(edges, preserve_index=False), 'w', start=10)
+        assert arrow['w'].to_pylist() == [10, 11]
+
+    def test_top_degree(self):
+        assert pairs(sampling.top_degree(edges, 'src', 'dst', 1)) == []
+        assert pairs(sampling.top_degree(edges, 'src', 'dst', 3)) == [('c', 'd')]
+        assert sampling.top_degree(edges, 'src', 'dst', 20) is edges
+
+    def test_walk_and_fire(self):
+        for sample in [sampling.random_walk, sampling.forest_fire]:
+            for table in [edges, pa.Table.from_pandas(edges, preserve_index=False)]:
+                out = sample(table, 'src', 'dst', 6, seed=0)
+                assert type(out) == type(table)
+                kept = set([v for pair in pairs(out) for v in pair])
+                assert len(kept) <= 6 and len(out) > 0
+                assert all([pair in pairs(edges) for pair in pairs(out)])
+                assert pairs(out) == pairs(sample(table, 'src', 'dst', 6, seed=0))
+            assert sample(edges, 'src', 'dst', 13) is edges
+        with self.assertRaises(ValueError):
+            sampling.random_walk(edges, 'src', 'dst', 3, restart=0)
+
+    def test_fire_spreads(self):
+        chain = pd.DataFrame({'src': range(1000), 'dst': range(1, 1001)})
+        out = sampling.forest_fire(chain, 'src', 'dst', 100, p=1, seed=3)
+        assert len(out) == 99 and out['src'].max() - out['src'].min() == 98
+
+
+class TestPlotterSampling(unittest.TestCase):
+
+    def test_bindings_and_nodes(self):
+        g = graphistry.edges(edges, 'src', 'dst').nodes(nodes, 'id').bind(edge_weight='w', point_title='v')
+        for s in [g.sample_edges(n=3, seed=0), g.sample_top_degree(3), g.sample_random_walk(4, seed=0),
+                  g.sample_forest_fire(4, seed=0), g.sample_time_window('t', end='2020-01-03')]:
+            assert (s._source, s._destination, s._node, s._edge_weight, s._point_title) == ('src', 'dst', 'id', 'w', 'v')
+            assert set(s._nodes['id']) == set(s._edges['src']) | set(s._edges['dst'])
+        assert len(g._edges) == 12 and len(g._nodes) == 13
+
+    def test_arrow_and_lazy(self):
+        es = graphistry.LazyTable(lambda columns: pa.Table.from_pandas(edges, preserve_index=False).select(columns))
+        g = graphistry.edges(es, 'src', 'dst').bind(edge_weight='w').sample_top_degree(3)
+        assert isinstance(g._edges, pa.Table) and g._edges.column_names == ['src', 'dst', 'w']
+        assert g._nodes is None
+
+    def test_lazy_time_window(self):
+        es = graphistry.LazyTable(lambda columns: pa.Table.from_pandas(edges, preserve_index=False).select(columns))
+        g = graphistry.edges(es, 'src', 'dst').sample_time_window('t', last='1D')
+        assert g._edges.column_names == ['src', 'dst', 't']
+        assert g._edges['src'].to_pylist() == ['x', 'c']
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            graphistry.bind().sample_edges(n=1)
+        with self.assertRaises(ValueError):
+            graphistry.bind().edges(edges).sample_random_walk(3)
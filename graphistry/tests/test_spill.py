@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import gc, os, pandas as pd, pyarrow as pa, unittest
+
+from graphistry.spill import Spill, parse_bytes, to_spill
+
+
+class TestSpill(unittest.TestCase):
+
+    def test_parse_bytes(self):
+        assert parse_bytes(1000) == 1000
+        assert parse_bytes('1000') == 1000
+        assert parse_bytes('4GB') == 4 * 1024 ** 3
+        assert parse_bytes('1.5 mb') == 1536 * 1024
+        assert parse_bytes('2K') == 2048
+        with self.assertRaises(ValueError):
+            parse_bytes('lots')
+
+    def test_to_spill(self):
+        assert to_spill(None) is None and to_spill(False) is None
+        assert to_spill(True).memory_budget == parse_bytes('1GB')
+        assert to_spill('2MB').memory_budget == 2 * 1024 ** 2
+        spill = Spill()
+        assert to_spill(spill) is spill
+
+    def test_table_mapped(self):
+        spill = Spill()
+        df = pd.DataFrame({'x': range(1000), 's': ['a', 'b'] * 500})
+        out = spill.table(df)
+        assert out.equals(pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata({}))
+        assert spill.files == 1 and spill.bytes_written > out.nbytes
+        assert os.listdir(spill.path()) == []
+        assert spill.concat([out, spill.table(out)]).num_rows == 2000
+
+    def test_append_unifies_schema(self):
+        spill = Spill()
+        tables = []
+        spill.append(tables, pd.DataFrame({'x': [1, 2], 's': ['a', 'b']}))
+        spill.append(tables, pd.DataFrame({'x': [3, 4]}))
+        assert tables[1].schema.equals(tables[0].schema) and tables[1]['s'].null_count == 2
+        spill.append(tables, pd.DataFrame({'x': [0.5, None], 't': ['c', 'd']}))
+        assert [t.schema.equals(tables[0].schema) for t in tables] == [True] * 3
+        assert tables[0].schema.field('x').type == pa.float64() and tables[0].column_names == ['x', 's', 't']
+        out = spill.concat(tables)
+        assert out['x'].to_pylist() == [1, 2, 3, 4, 0.5, None]
+        assert out['x'].chunk(0).buffers()[1].address == tables[0]['x'].chunk(0).buffers()[1].address
+
+    def test_concat_empty(self):
+        schema = pa.schema([('x', pa.int64()), ('s', pa.string())])
+        out = Spill().concat([], schema)
+        assert out.num_rows == 0 and out.schema.equals(schema)
+        assert Spill().concat([]).num_columns == 0
+
+    def test_directory_cleanup(self):
+        parent = os.path.dirname(Spill().path())
+        spill = Spill(directory=parent)
+        spill.table(pd.DataFrame({'x': [1]}))
+        path = spill.path()
+        assert os.path.dirname(path) == parent and os.path.isdir(path)
+        del spill
+        gc.collect()
+        assert not os.path.exists(path)
+
+    def test_rows_per_chunk(self):
+        df = pd.DataFrame({'x': range(1000)})
+        assert Spill(80000).rows_per_chunk(df) == 10000
+        assert Spill(80000).rows_per_chunk(df, 10) == 1000
+        assert Spill(1).rows_per_chunk(df) == 1
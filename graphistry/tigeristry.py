@@ -1,9 +1,271 @@
-import requests
+import json, requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote, urlencode
+from urllib3.util.retry import Retry
+
+# Optional: incremental parsing of large responses, imported on first use
+def import_ijson():
+    try:
+        import ijson
+        return ijson
+    except ImportError:
+        return None
 
 def merge_dicts(x, y):
     return dict(list(x.items()) + list(y.items()))
 
+# [{..., 'attributes': {...}}] or RecordColumns -> df with attributes flattened into columns
+# Attributes named like a top-level field are kept as 'attributes.<name>'
+def records_to_df(records):
+    if not isinstance(records, RecordColumns):
+        records = RecordColumns().extend(records)
+    return records.to_df()
+
+class ChunkReader(object):
+    """File-like reader over an iterator of byte chunks that can replay what it has read so far once"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.pending = b''
+        self.offset = 0
+        self.recorded = []
+        self.recording = True
+
+    def read(self, size=-1):
+        out = []
+        n = 0
+        while size < 0 or n < size:
+            if self.offset >= len(self.pending):
+                (self.pending, self.offset) = (next(self.chunks, b''), 0)
+                if len(self.pending) == 0:
+                    break
+            end = len(self.pending) if size < 0 else min(len(self.pending), self.offset + size - n)
+            out.append(self.pending[self.offset:end])
+            n += end - self.offset
+            self.offset = end
+        data = b''.join(out)
+        if self.recording:
+            self.recorded.append(data)
+        return data
+
+    def rewind(self):
+        (self.pending, self.offset) = (b''.join(self.recorded) + self.pending[self.offset:], 0)
+        self.recorded = []
+        self.recording = False
+
+
+json_starts = set(['start_map', 'start_array'])
+json_ends = set(['end_map', 'end_array'])
+
+# JSON value starting with (event, value), consuming the rest of its ijson events; skipped values are not built
+def read_json_value(events, event, value, build=True):
+    if not (event in json_starts):
+        return value
+    builder = None
+    if build:
+        from ijson import ObjectBuilder
+        builder = ObjectBuilder()
+    depth = 0
+    while True:
+        if build:
+            builder.event(event, value)
+        depth += 1 if event in json_starts else -1 if event in json_ends else 0
+        if depth == 0:
+            return builder.value if build else None
+        (_, event, value) = next(events)
+
+class RecordColumns(object):
+    """A JSON list of records gathered field by field into per-column (row indices, values) lists
+
+    Records come from ijson events via read(), or already parsed via extend(). Fields of each record's
+    'attributes' go in their own columns, prefixed with 'attributes.' when they clash with a top-level field,
+    and no dict is built per record.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.attributes = {}
+        self.n = 0
+
+    def set(self, columns, name, value):
+        column = columns.get(name)
+        if column is None:
+            column = ([], [])
+            columns[name] = column
+        (idxs, vals) = column
+        # Later duplicate keys override earlier ones, like json.loads
+        if len(idxs) > 0 and idxs[-1] == self.n:
+            vals[-1] = value
+        else:
+            idxs.append(self.n)
+            vals.append(value)
+
+    # Consume events through the end of the list, after its start_array
+    def read(self, events):
+        for (_, event, value) in events:
+            if event == 'end_array':
+                return self
+            if event != 'start_map':
+                # Like pd.DataFrame([1, 2])
+                self.set(self.columns, 0, read_json_value(events, event, value))
+                self.n += 1
+                continue
+            for (_, event, field) in events:
+                if event == 'end_map':
+                    break
+                (_, event, value) = next(events)
+                if field == 'attributes':
+                    if event == 'start_map':
+                        for (_, event, name) in events:
+                            if event == 'end_map':
+                                break
+                            (_, event, value) = next(events)
+                            self.set(self.attributes, name, read_json_value(events, event, value))
+                    else:
+                        read_json_value(events, event, value, build=False)
+                else:
+                    self.set(self.columns, field, read_json_value(events, event, value))
+            self.n += 1
+        return self
+
+    def extend(self, records):
+        for record in records:
+            if not isinstance(record, dict):
+                self.set(self.columns, 0, record)
+                self.n += 1
+                continue
+            for (field, value) in record.items():
+                if field != 'attributes':
+                    self.set(self.columns, field, value)
+                elif isinstance(value, dict):
+                    for (name, v) in value.items():
+                        self.set(self.attributes, name, v)
+            self.n += 1
+        return self
+
+    # Missing values and dtypes as pd.DataFrame(records) infers them
+    def frame(self, columns):
+        return pd.DataFrame(
+            {
+                name: pd.Series(vals) if len(idxs) == self.n else pd.Series(vals, index=idxs).reindex(range(self.n))
+                for (name, (idxs, vals)) in columns.items()
+            },
+            index=range(self.n)).infer_objects()
+
+    def to_df(self):
+        columns = dict(self.columns)
+        for (name, column) in self.attributes.items():
+            columns['attributes.' + str(name) if name in self.columns else name] = column
+        return self.frame(columns)
+
+
+# Parse a TigerGraph response from byte chunks without building the whole JSON tree:
+# the first list under each of keys is read into RecordColumns, and everything else is skipped.
+# The header (error, message) is read first; responses without results, or with results
+# before the error field, fall back to a full parse.
+def stream_json_results(chunks, keys):
+    import ijson
+    reader = ChunkReader(chunks)
+
+    header = {}
+    has_results = False
+    for (prefix, event, value) in ijson.parse(reader, use_float=True):
+        if prefix in ['error', 'message'] and not (event in ['start_map', 'start_array', 'map_key']):
+            header[prefix] = value
+        elif prefix == 'results' and event == 'start_array':
+            has_results = True
+            break
+    reader.rewind()
+
+    if not has_results or not ('error' in header):
+        return json.loads(reader.read())
+
+    results = []
+    found = set()
+    events = ijson.parse(reader, use_float=True)
+    for (prefix, event, value) in events:
+        if prefix == 'results' and event == 'start_array':
+            break
+    for (_, event, value) in events:
+        if event == 'end_array':
+            break
+        if event != 'start_map':
+            read_json_value(events, event, value, build=False)
+            continue
+        kept = {}
+        for (_, event, key) in events:
+            if event == 'end_map':
+                break
+            (_, event, value) = next(events)
+            if key in keys and not (key in found) and event == 'start_array':
+                kept[key] = RecordColumns().read(events)
+            else:
+                read_json_value(events, event, value, build=False)
+        if len(kept) > 0:
+            found.update(kept.keys())
+            results.append(kept)
+
+    return merge_dicts(header, {'results': results})
+
+retry_statuses = [429, 500, 502, 503, 504]
+connect_timeout = 10
+
+# Session whose connection pool is shared by concurrent calls, retrying with exponential backoff.
+# Any request retries failed connections, as nothing was sent. Only GET (stored query endpoints)
+# retries transient server statuses, and nothing retries read errors, so queries that write,
+# such as interpreted gsql POSTs, never run twice.
+def make_session(retries = 3, backoff_factor = 0.5, pool_size = 16):
+    retry_opts = {
+        'total': retries,
+        'connect': retries,
+        'read': 0,
+        'status': retries,
+        'backoff_factor': backoff_factor,
+        'status_forcelist': retry_statuses,
+        'raise_on_status': False
+    }
+    try:
+        retry = Retry(allowed_methods=frozenset(['GET']), **retry_opts)
+    except TypeError:
+        retry = Retry(method_whitelist=frozenset(['GET']), **retry_opts)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# requests (connect, read) timeout: a number or None only bounds the read, connecting waits up to connect_timeout
+def request_timeout(timeout):
+    return timeout if isinstance(timeout, tuple) else (connect_timeout, timeout)
+
+# Union per-call frames, dropping rows returned by several calls: rows sharing keys, or when None, identical rows
+# Edges compare whole rows, as TigerGraph multi-edges share their endpoints and type
+def union_frames(dfs, keys=None):
+    df = pd.concat(dfs, ignore_index=True, sort=False)
+    subset = list(df.columns) if keys is None else [k for k in keys if k in df]
+    if len(subset) == 0 or len(df) == 0:
+        return df
+    try:
+        duplicated = df.duplicated(subset=subset)
+    except TypeError:
+        # Unhashable attribute values, such as lists
+        duplicated = df[subset].astype(str).duplicated()
+    return df[~duplicated].reset_index(drop=True)
+
+# Node table for edges, typing each node by its first non-null from_type, else to_type
+def edges_to_nodes_df(edges_df):
+    ids = pd.concat([edges_df['from_id'], edges_df['to_id']], ignore_index=True)
+    types = pd.concat(
+        [
+            edges_df[col] if col in edges_df else pd.Series([None] * len(edges_df), dtype='object')
+            for col in ['from_type', 'to_type']
+        ],
+        ignore_index=True)
+    return pd.DataFrame({'node_id': ids, 'type': types})\
+        .groupby('node_id', sort=False, dropna=True)['type'].first()\
+        .reset_index()
+
 class Tigeristry(object):
     """Tigergraph bindings class
 
@@ -47,7 +309,10 @@ class Tigeristry(object):
         db = None,
         user = 'tigergraph',
         pwd = 'tigergraph',
-        verbose = False
+        verbose = False,
+        timeout = None,
+        retries = 3,
+        backoff_factor = 0.5
     ):
 
         self.tiger_config = {
@@ -58,8 +323,12 @@ class Tigeristry(object):
             'db': db,
             'user': user,
             'pwd': pwd,
-            'verbose': verbose
+            'verbose': verbose,
+            'timeout': timeout,
+            'retries': retries,
+            'backoff_factor': backoff_factor
         }
+        self.session = make_session(retries, backoff_factor)
 
         self.__log('TG config: ' + str({k: v for k, v in self.tiger_config.items() if k not in ['pwd']}))
              
@@ -80,79 +349,69 @@ class Tigeristry(object):
         return json['results']
     
     # str * ?dict * ?str => json graph
-    def __gsql_endpoint(self, method_name, args = {}, db = None, dry_run = False):
+    def __gsql_endpoint(self, method_name, args = {}, bindings = {}, db = None, dry_run = False):
 
         db = self.tiger_config['db'] if db is None else db
         if db is None:
             raise Exception("Must specify db in Tigeristry constructor or .__call()")
 
         base_url = self.__base_url('api')
-        url = base_url + '/query/' + db + '/' + method_name
+        url = base_url + '/query/' + quote(db) + '/' + quote(method_name)
         if len(args.items()) > 0:
-            url = url + '?' + '&'.join( [str(k) + '=' + str(v) for k, v in args.items()] )
+            # Lists become repeated keys, as for SET/BAG parameters
+            url = url + '?' + urlencode(args, doseq=True)
         self.__log(url)
 
         if dry_run:            
             return url
 
-        resp = requests.get(url)
+        resp = self.session.get(url, stream=not (import_ijson() is None), timeout=request_timeout(self.tiger_config['timeout']))
         self.__log(resp)
-        json = resp.json()
+        json = self.__response_json(resp, bindings)
 
         return self.__verify_and_unwrap_json_result(json)
 
-    def __json_to_graphistry(self, graphistry, json, bindings):        
+    def __json_to_frames(self, json, bindings):
         edges_df = pd.DataFrame({'from_id': [], 'to_id': []})
         edge_key = bindings['edges']
-        edges = [x for x in json if edge_key in x]      
+        edges = [x for x in json if edge_key in x]
         if len(edges) > 0 and (edge_key in edges[0]):
-            edges = edges[0][edge_key]
-            edges_df = pd.DataFrame(edges)
-            try:
-                edges_df = edges_df.drop(columns=['attributes'])
-                attrs = [x['attributes'] for x in edges]
-                edges_df = pd.merge( edges_df, pd.DataFrame(attrs), left_index=True, right_index=True )
-            except:
-                self.__log('Failed to extract edge attrs')
-            g = graphistry.bind(source='from_id', destination='to_id').edges(edges_df)
-        
-        nodes_df = pd.DataFrame({'type': [], 'node_id': []})
+            edges_df = records_to_df(edges[0][edge_key])
+
         node_key = bindings['nodes']
         nodes = [x for x in json if node_key in x]
         if len(nodes) > 0 and (node_key in nodes[0]):
-            nodes = nodes[0][node_key]
-            nodes_df = pd.DataFrame(nodes)
-            try:
-                nodes_df = nodes_df.drop(columns=['attributes'])
-                attrs = [x['attributes'] for x in nodes]
-                nodes_df = pd.merge( nodes_df, pd.DataFrame(attrs), left_index=True, right_index=True )
-            except:
-                self.__log('Failed to extract node attrs')
-        else:        
-            nodes_df = pd.DataFrame({'node_id': edges_df['from_id'].append(edges_df['to_id'])}) \
-              .drop_duplicates().reset_index(drop=True)           
-            from_types = nodes_df.merge(edges_df[['from_id', 'from_type']].rename(columns={'from_id': 'node_id', 'from_type': 'type'}), on='node_id', how='left')
-            to_types = nodes_df.merge(edges_df[['to_id', 'to_type']].rename(columns={'to_id': 'node_id', 'to_type': 'type'}), on='node_id', how='left')
-            nodes_df = nodes_df.merge(
-                pd.DataFrame({'type': 
-                              from_types.merge(to_types, left_index=True, right_index=True)\
-                                .apply(
-                                  lambda row: row['type_x'] if not pd.isna(row['type_x']) else row['type_y'],
-                                  axis=1)}),
-                left_index=True, right_index=True)              
-        g = g.bind(node='node_id').nodes(nodes_df)
-        return g
-  
-    def __gsql(self, query, dry_run = False):
+            nodes_df = records_to_df(nodes[0][node_key])
+        else:
+            nodes_df = edges_to_nodes_df(edges_df)
+        return (edges_df, nodes_df)
+
+    def __json_to_graphistry(self, graphistry, json, bindings):
+        (edges_df, nodes_df) = self.__json_to_frames(json, bindings)
+        return graphistry\
+            .bind(source='from_id', destination='to_id', node='node_id')\
+            .edges(edges_df)\
+            .nodes(nodes_df)
+
+    def __gsql(self, query, bindings = {}, dry_run = False):
         base_url = self.__base_url('web')
         url = base_url + '/gsqlserver/interpreted_query'
         self.__log(url)
         if dry_run == True:
             return url
-        response = requests.post(url, data=query)
-        json = response.json()
+        response = self.session.post(url, data=query, stream=not (import_ijson() is None), timeout=request_timeout(self.tiger_config['timeout']))
+        json = self.__response_json(response, bindings)
         return self.__verify_and_unwrap_json_result(json)
 
+    # Stream-parse only the bound edge/node lists when ijson is available
+    def __response_json(self, resp, bindings):
+        # Retries exhausted on a transient failure
+        if resp.status_code == 429 or resp.status_code >= 500:
+            resp.raise_for_status()
+        if import_ijson() is None or len(bindings) == 0:
+            return resp.json()
+        return stream_json_results(resp.iter_content(chunk_size=1 << 20), [bindings['edges'], bindings['nodes']])
+
 
     # --------------------------------------------------
 
@@ -161,39 +420,72 @@ class Tigeristry(object):
         
         self.__check_initialized(graphistry)
 
-        json = self.__gsql_endpoint(method_name, args, db, dry_run)
+        bindings = merge_dicts(
+            {
+              'edges': '@@edgeList',
+              'nodes': '@@nodeList'
+            },
+            bindings
+        )
+
+        json = self.__gsql_endpoint(method_name, args, bindings, db, dry_run)
 
         if dry_run == True:
             url = json
             return url
 
+        return self.__json_to_graphistry(graphistry, json, bindings)
+
+    # Tigeristry * Plotter * [string | (string, dict)] * ?dict * ?string * ?int => Plotter
+    def gsql_endpoint_many(self, graphistry, calls, bindings = {}, db = None, max_workers = None):
+
+        self.__check_initialized(graphistry)
+
         bindings = merge_dicts(
             {
               'edges': '@@edgeList',
               'nodes': '@@nodeList'
             },
             bindings
-        )   
+        )
 
-        return self.__json_to_graphistry(graphistry, json, bindings)
+        calls = [(call, {}) if isinstance(call, str) else (call[0], call[1]) for call in calls]
+        if len(calls) == 0:
+            raise Exception("gsql_endpoint_many requires at least one endpoint call")
+
+        def run(call):
+            (method_name, args) = call
+            json = self.__gsql_endpoint(method_name, args, bindings, db)
+            return self.__json_to_frames(json, bindings)
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max_workers or len(calls)) as executor:
+            frames = list(executor.map(run, calls))
+
+        edges_df = union_frames([f[0] for f in frames])
+        nodes_df = union_frames([f[1] for f in frames], ['node_id', 'v_type', 'v_id'])
+        return graphistry\
+            .bind(source='from_id', destination='to_id', node='node_id')\
+            .edges(edges_df)\
+            .nodes(nodes_df)
 
     # Tigeristry * Plotter * string * ?dict => Plotter
     def gsql(self, graphistry, query, bindings = {}, dry_run = False):
 
         self.__check_initialized(graphistry)
 
-        json = self.__gsql(query, dry_run)
-
-        if dry_run == True:
-            url = json
-            return url
-
         bindings = merge_dicts(
             {
               'edges': '@@edgeList',
               'nodes': '@@nodeList'
             },
             bindings
-        )      
+        )
+
+        json = self.__gsql(query, bindings, dry_run)
+
+        if dry_run == True:
+            url = json
+            return url
 
         return self.__json_to_graphistry(graphistry, json, bindings)
\ No newline at end of file
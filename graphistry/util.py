@@ -1,9 +1,9 @@
 def cmp(x, y):
     return (x > y) - (x < y)
 
-import hashlib, platform as p, random, string, sys, uuid, warnings
+import hashlib, platform as p, random, string, sys, threading, time, uuid, warnings
 
-from distutils.version import LooseVersion, StrictVersion
+from collections import OrderedDict
 
 def make_iframe(url, height):
     id = uuid.uuid4()
@@ -40,7 +40,19 @@ def random_string(length):
     return ''.join(gibberish)
 
 
+# Same as distutils.util.strtobool, which imports slowly and is deprecated
+def strtobool(val):
+    val = val.lower()
+    if val in ('y', 'yes', 't', 'true', 'on', '1'):
+        return 1
+    elif val in ('n', 'no', 'f', 'false', 'off', '0'):
+        return 0
+    else:
+        raise ValueError('invalid truth value %r' % (val,))
+
+
 def compare_versions(v1, v2):
+    from distutils.version import LooseVersion, StrictVersion
     try:
         return cmp(StrictVersion(v1), StrictVersion(v2))
     except ValueError:
@@ -80,3 +92,62 @@ def merge_two_dicts(a, b):
     c = a.copy()
     c.update(b)
     return c
+
+
+class LRUCache(object):
+    """Bounded in-memory map that evicts the least recently used entry once maxsize is exceeded.
+
+    Entries optionally expire ttl seconds after being put, as measured by timer.
+    Tracks hits/misses so callers can report cache effectiveness. Safe to share across threads."""
+
+    def __init__(self, maxsize=128, ttl=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._expires = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries and not self._expired(key)
+
+    def _expired(self, key):
+        return key in self._expires and self._expires[key] <= self.timer()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries and self._expired(key):
+                del self._entries[key]
+                del self._expires[key]
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if not (self.ttl is None):
+                self._expires[key] = self.timer() + self.ttl
+            while len(self._entries) > max(self.maxsize, 0):
+                (evicted, _) = self._entries.popitem(last=False)
+                self._expires.pop(evicted, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
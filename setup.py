@@ -45,25 +45,29 @@ setup(
     author='The Graphistry Team',
     author_email='pygraphistry@graphistry.com',
     setup_requires=['numpy', 'pytest-runner'],
-    install_requires=['numpy', 'pandas >= 0.17.0', 'pyarrow >= 0.15.0', 'requests', 'protobuf >= 2.6.0'],
+    install_requires=['numpy', 'pandas >= 0.17.0', 'pyarrow >= 7.0.0', 'requests', 'protobuf >= 2.6.0'],
     extras_require={
         'igraph': ['python-igraph'],
         'networkx': ['networkx'],
         'bolt': ['neo4j', 'neotime'],
         'nodexl': ['openpyxl', 'xlrd'],
+        'tigergraph': ['ijson'],
+        'progress': ['tqdm'],
+        'bench': ['pytest', 'pytest-benchmark'],
         'dev': [
-          'pytest', 'mock', 'ipython',
+          'pytest', 'pytest-benchmark', 'mock', 'ipython',
           'python-igraph', 'networkx==2.2', 'colorlover',
           'neo4j', 'neotime',
-          'openpyxl', 'xlrd'
+          'openpyxl', 'xlrd',
+          'ijson', 'tqdm'
         ],
-        'all': ['python-igraph', 'networkx', 'colorlover', 'neo4j', 'neotime']
+        'all': ['python-igraph', 'networkx', 'colorlover', 'neo4j', 'neotime', 'ijson', 'tqdm']
     },
     tests_require=
         ['pytest', 'mock', 'ipython', 
         'python-igraph', 'networkx==2.2', 'colorlover', 
         'neo4j', 'neotime',
-        'openpyxl', 'xlrd'],
+        'openpyxl', 'xlrd', 'ijson'],
     cmdclass=versioneer.get_cmdclass(),
     license='BSD',
     classifiers=[
@@ -73,7 +77,6 @@ setup(
         'Operating System :: OS Independent',
         'Intended Audience :: Science/Research',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Topic :: Scientific/Engineering :: Visualization',